@@ -1,3 +1,4 @@
+import asyncio
 import json
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Any, Optional, Union
@@ -115,8 +116,24 @@ class BaseAction(ABC, BaseModel):
     def execute(self, **kwargs):
         pass
 
-    def __call__(self, **kwargs):
-        # Retrieve the arguments from the belief or agent
+    async def aexecute(self, **kwargs):
+        """
+        Execute the action asynchronously. By default `execute` runs in a worker
+        thread so it does not block the event loop, actions with an asynchronous
+        implementation (e.g., an LLM call) should override this method.
+        """
+        return await asyncio.to_thread(self.execute, **kwargs)
+
+    def resolve_arguments(self, kwargs: dict) -> dict:
+        """
+        Retrieve the arguments of the action from the input or from the belief
+
+        Args:
+            kwargs (dict): The arguments provided by the agent
+
+        Returns:
+            dict: The arguments to execute the action with
+        """
         filtered_kwargs = {}
         for arg in self.args:
             if arg.source == "agent":
@@ -139,11 +156,15 @@ class BaseAction(ABC, BaseModel):
                 EventType.action, self.name, f"Action: {self.name} starts, Args: {filtered_kwargs}"
             )
 
+        return filtered_kwargs
 
-        # Execute the action
-        result = self.execute(**filtered_kwargs)
+    def save_result(self, result: Any):
+        """
+        Save the result of the action to the belief
 
-        # Save the result to the belief
+        Args:
+            result (Any): The result of the action
+        """
         self.belief: Belief = self.belief
         if self.belief:
             self.belief.set(self.output_key, result)
@@ -151,6 +172,26 @@ class BaseAction(ABC, BaseModel):
                 EventType.action_output, self.name, f"Action: {self.name} finishes, Observation: {result}"
             )
 
+    def __call__(self, **kwargs):
+        filtered_kwargs = self.resolve_arguments(kwargs)
+
+        # Execute the action
+        result = self.execute(**filtered_kwargs)
+
+        self.save_result(result)
+        return result
+
+    async def acall(self, **kwargs):
+        """
+        Asynchronous counterpart of calling the action, the action is executed with
+        `aexecute`
+        """
+        filtered_kwargs = self.resolve_arguments(kwargs)
+
+        # Execute the action
+        result = await self.aexecute(**filtered_kwargs)
+
+        self.save_result(result)
         return result
 
     def __str__(self):
@@ -47,7 +47,7 @@ class SynthesizeOutput(BaseAction):
         if self.add_citation:
             self.description = SYNTHESIZE_DESCRIPTION_CITATION
 
-    def execute(self, task: str, context: str, history: str) -> str:
+    def create_prompt(self, task: str, context: str, history: str) -> str:
         prompt = self.description.format(
             task=task,
             context=context,
@@ -56,5 +56,14 @@ class SynthesizeOutput(BaseAction):
         )
 
         logger.debug("Prompt: {}", prompt)
+        return prompt
+
+    def execute(self, task: str, context: str, history: str) -> str:
+        prompt = self.create_prompt(task, context, history)
         result = self.llm.predict(prompt)
         return result
+
+    async def aexecute(self, task: str, context: str, history: str) -> str:
+        prompt = self.create_prompt(task, context, history)
+        result = await self.llm.apredict(prompt)
+        return result
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from loguru import logger
 from pydantic import BaseModel, ConfigDict
 
-from sherpa_ai.actions.base import BaseAction
+from sherpa_ai.actions.base import BaseAction, BaseRetrievalAction
 from sherpa_ai.events import EventType
 from sherpa_ai.memory import Belief, SharedMemory
 from sherpa_ai.output_parsers.base import BaseOutputProcessor
-from sherpa_ai.policies.base import BasePolicy
+from sherpa_ai.output_parsers.validation_cache import ValidationCache
+from sherpa_ai.output_parsers.validation_result import ValidationResult
+from sherpa_ai.policies.base import BasePolicy, PolicyOutput
 from sherpa_ai.verbose_loggers.base import BaseVerboseLogger
 from sherpa_ai.verbose_loggers.verbose_loggers import DummyVerboseLogger
 
@@ -30,6 +34,8 @@ class BaseAgent(ABC, BaseModel):
     validations: List[BaseOutputProcessor] = []
     feedback_agent_name: str = "critic"
     global_regen_max: int = 12
+    cache_validations: bool = True
+    concurrent_validations: bool = False
     llm: Any = None
 
     @abstractmethod
@@ -54,9 +60,24 @@ class BaseAgent(ABC, BaseModel):
 
         getattr(self.belief.state_machine, event)(**args)
 
-    def run(self):
+    async def asynthesize_output(self) -> str:
+        """
+        Synthesize the output asynchronously. By default `synthesize_output` runs in
+        a worker thread, agents synthesizing with an LLM should override this method
+        with its asynchronous API.
+        """
+        return await asyncio.to_thread(self.synthesize_output)
+
+    def start_run(self) -> int:
+        """
+        Prepare the belief of the agent for a run
+
+        Returns:
+            int: Number of tokenizer calls saved by the belief before the run
+        """
         self.verbose_logger.log(f"⏳{self.name} is thinking...")
         logger.debug(f"```⏳{self.name} is thinking...```")
+        num_token_counts_saved = self.belief.num_token_counts_saved
 
         if self.shared_memory is not None:
             self.shared_memory.observe(self.belief)
@@ -65,19 +86,40 @@ class BaseAgent(ABC, BaseModel):
             actions = self.actions if len(self.actions) > 0 else self.create_actions()
             self.belief.set_actions(actions)
 
+        return num_token_counts_saved
+
+    def finish_run(self, result: str, num_token_counts_saved: int) -> str:
+        """
+        Record the output of a run
+
+        Args:
+            result (str): The output of the agent
+            num_token_counts_saved (int): Number of tokenizer calls saved by the
+                belief before the run
+
+        Returns:
+            str: The output of the agent
+        """
+        logger.debug(f"```🤖{self.name} wrote: {result}```")
+        logger.debug(
+            "Tokenizer calls saved: "
+            f"{self.belief.num_token_counts_saved - num_token_counts_saved}"
+        )
+
+        if self.shared_memory is not None:
+            self.shared_memory.add(EventType.result, self.name, result)
+        return result
+
+    def run(self):
+        num_token_counts_saved = self.start_run()
+
         for i in range(self.num_runs):
             if len(self.belief.get_actions()) == 0:
                 break
             try:
                 result = self.policy.select_action(self.belief)
             except Exception as e:
-                self.belief.update_internal(
-                    EventType.action_output,
-                    self.feedback_agent_name,
-                    f"Error in selecting action: {e}",
-                )
-                logger.error("Error in selecting action")
-                logger.error(e)
+                self.on_selection_error(e)
                 continue
             logger.debug(f"Action selected: {result}")
 
@@ -85,41 +127,294 @@ class BaseAgent(ABC, BaseModel):
                 # this means no action is selected
                 continue
 
-            self.verbose_logger.log(
-                f"```🤖{self.name} is executing```"
-                f"```{result.action.name}\n Input: {result.args}...```"
+            for batch in self.batch_policy_outputs(result):
+                if len(batch) == 1:
+                    self.act_and_log(batch[0])
+                else:
+                    self.act_concurrently(batch)
+
+        result = (
+            self.validate_output()
+            if len(self.validations) > 0
+            else self.synthesize_output()
+        )
+
+        return self.finish_run(result, num_token_counts_saved)
+
+    async def arun(self):
+        """
+        Asynchronous counterpart of `run`. The action is selected with
+        `aselect_action` of the policy, executed with `aact` and the output is
+        synthesized with `asynthesize_output`, so many agents can run concurrently
+        on a single event loop. Observing the shared memory, which may query a
+        vector database, and the validations are run in a worker thread.
+
+        Returns:
+            str: The output of the agent
+        """
+        num_token_counts_saved = await asyncio.to_thread(self.start_run)
+
+        for i in range(self.num_runs):
+            if len(self.belief.get_actions()) == 0:
+                break
+            try:
+                result = await self.policy.aselect_action(self.belief)
+            except Exception as e:
+                self.on_selection_error(e)
+                continue
+            logger.debug(f"Action selected: {result}")
+
+            if result is None:
+                # this means no action is selected
+                continue
+
+            for batch in self.batch_policy_outputs(result):
+                if len(batch) == 1:
+                    await self.aact_and_log(batch[0])
+                else:
+                    await self.aact_concurrently(batch)
+
+        if len(self.validations) > 0:
+            result = await asyncio.to_thread(self.validate_output)
+        else:
+            result = await self.asynthesize_output()
+
+        return self.finish_run(result, num_token_counts_saved)
+
+    def batch_policy_outputs(
+        self, result: Union[PolicyOutput, List[PolicyOutput]]
+    ) -> List[List[PolicyOutput]]:
+        """
+        Split the actions selected by the policy into batches executed one after
+        the other. Consecutive retrieval actions are independent of each other and
+        form a batch executed concurrently, every other action is a batch of its own.
+
+        Args:
+            result (Union[PolicyOutput, List[PolicyOutput]]): The output of the
+                policy
+
+        Returns:
+            List[List[PolicyOutput]]: The batches of actions, in order
+        """
+        policy_outputs = result if isinstance(result, list) else [result]
+
+        batches = []
+        for policy_output in policy_outputs:
+            if (
+                isinstance(policy_output.action, BaseRetrievalAction)
+                and len(batches) > 0
+                and isinstance(batches[-1][0].action, BaseRetrievalAction)
+            ):
+                batches[-1].append(policy_output)
+            else:
+                batches.append([policy_output])
+        return batches
+
+    def act_and_log(self, result: PolicyOutput):
+        self.log_action_start(result)
+
+        try:
+            action_output = self.act(result.action, result.args)
+        except Exception as e:
+            self.on_action_error(result, e)
+            return
+
+        self.log_action_output(result, action_output)
+
+    async def aact_and_log(self, result: PolicyOutput):
+        self.log_action_start(result)
+
+        try:
+            action_output = await self.aact(result.action, result.args)
+        except Exception as e:
+            self.on_action_error(result, e)
+            return
+
+        self.log_action_output(result, action_output)
+
+    def prepare_concurrent_actions(
+        self, batch: List[PolicyOutput]
+    ) -> Dict[int, List[Tuple[PolicyOutput, dict]]]:
+        """
+        Resolve the arguments of a batch of actions executed concurrently and group
+        the calls by action. The calls of the same action run one after the other,
+        as an action keeps the resources of its last call.
+
+        Args:
+            batch (List[PolicyOutput]): The actions selected by the policy
+
+        Returns:
+            Dict[int, List[Tuple[PolicyOutput, dict]]]: The calls with their
+            arguments, grouped by the identity of the action
+        """
+        groups = {}
+        for policy_output in batch:
+            self.log_action_start(policy_output)
+            try:
+                kwargs = policy_output.action.resolve_arguments(policy_output.args)
+            except Exception as e:
+                self.on_action_error(policy_output, e)
+                continue
+            groups.setdefault(id(policy_output.action), []).append(
+                (policy_output, kwargs)
             )
-            logger.debug(
-                f"🤖{self.name} is executing```" "``` {result.action.name}...```"
+        return groups
+
+    def execute_calls(
+        self, calls: List[Tuple[PolicyOutput, dict]]
+    ) -> List[Tuple[Any, Optional[Exception], Optional[list]]]:
+        """
+        Execute the calls of an action one after the other
+
+        Args:
+            calls (List[Tuple[PolicyOutput, dict]]): The calls with their arguments
+
+        Returns:
+            List[Tuple[Any, Optional[Exception], Optional[list]]]: For each call,
+            its output, the error raised if any and the resources of a retrieval
+            action
+        """
+        outcomes = []
+        for policy_output, kwargs in calls:
+            try:
+                action_output = policy_output.action.execute(**kwargs)
+            except Exception as e:
+                outcomes.append((None, e, None))
+                continue
+            outcomes.append(
+                (action_output, None, list(policy_output.action.resources))
             )
+        return outcomes
 
+    async def aexecute_calls(
+        self, calls: List[Tuple[PolicyOutput, dict]]
+    ) -> List[Tuple[Any, Optional[Exception], Optional[list]]]:
+        """
+        Asynchronous counterpart of `execute_calls`, the calls are executed with
+        `aexecute`
+        """
+        outcomes = []
+        for policy_output, kwargs in calls:
             try:
-                action_output = self.act(result.action, result.args)
+                action_output = await policy_output.action.aexecute(**kwargs)
             except Exception as e:
-                self.belief.update_internal(
-                    EventType.action_output,
-                    self.feedback_agent_name,
-                    f"Error in executing action: {result.action.name}. Error: {e}",
-                )
-                logger.exception(e)
+                outcomes.append((None, e, None))
+                continue
+            outcomes.append(
+                (action_output, None, list(policy_output.action.resources))
+            )
+        return outcomes
+
+    def act_concurrently(self, batch: List[PolicyOutput]):
+        """
+        Execute a batch of independent retrieval actions concurrently in a thread
+        pool. Only the execution overlaps: the belief is updated afterwards, in the
+        order the actions were selected, so the history and the resources do not
+        depend on which action finishes first.
+
+        Args:
+            batch (List[PolicyOutput]): The actions selected by the policy
+        """
+        groups = self.prepare_concurrent_actions(batch)
+        if len(groups) == 0:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            outcomes = list(executor.map(self.execute_calls, groups.values()))
+
+        self.merge_action_outcomes(batch, list(groups.values()), outcomes)
+
+    async def aact_concurrently(self, batch: List[PolicyOutput]):
+        """
+        Asynchronous counterpart of `act_concurrently`, the actions are executed
+        concurrently on the event loop
+        """
+        groups = self.prepare_concurrent_actions(batch)
+        if len(groups) == 0:
+            return
+
+        outcomes = await asyncio.gather(
+            *(self.aexecute_calls(calls) for calls in groups.values())
+        )
+
+        self.merge_action_outcomes(batch, list(groups.values()), outcomes)
+
+    def merge_action_outcomes(
+        self,
+        batch: List[PolicyOutput],
+        groups: List[List[Tuple[PolicyOutput, dict]]],
+        outcomes: List[List[Tuple[Any, Optional[Exception], Optional[list]]]],
+    ):
+        """
+        Record the outputs of actions executed concurrently in the order they were
+        selected. The resources of all the successful calls of a retrieval action
+        are merged in that order, without duplicates, so the citations can use
+        every document retrieved in the step.
+
+        Args:
+            batch (List[PolicyOutput]): The actions in the order they were selected
+            groups (List[List[Tuple[PolicyOutput, dict]]]): The calls grouped by
+                action, as returned by `prepare_concurrent_actions`
+            outcomes (List[List[Tuple[Any, Optional[Exception], Optional[list]]]]):
+                The outcomes of the calls of each group
+        """
+        order = {id(policy_output): i for i, policy_output in enumerate(batch)}
+        calls = []
+        for group, group_outcomes in zip(groups, outcomes):
+            calls.extend(zip(group, group_outcomes))
+        calls.sort(key=lambda call: order[id(call[0][0])])
+
+        merged_resources = {}
+        for (policy_output, _), (action_output, error, resources) in calls:
+            action = policy_output.action
+            if error is not None:
+                self.on_action_error(policy_output, error)
                 continue
 
-            action_output = self.belief.get(result.action.name, action_output)
+            action.save_result(action_output)
+            self.log_action_output(policy_output, action_output)
 
-            self.verbose_logger.log(f"```Action output: {action_output}```")
-            logger.debug(f"```Action output: {action_output}```")
+            if id(action) not in merged_resources:
+                merged_resources[id(action)] = (action, {})
+            action_resources = merged_resources[id(action)][1]
+            for resource in resources:
+                key = (resource.source, resource.content)
+                action_resources.setdefault(key, resource)
 
-        result = (
-            self.validate_output()
-            if len(self.validations) > 0
-            else self.synthesize_output()
+        for action, action_resources in merged_resources.values():
+            action.resources[:] = action_resources.values()
+
+    def on_selection_error(self, e: Exception):
+        self.belief.update_internal(
+            EventType.action_output,
+            self.feedback_agent_name,
+            f"Error in selecting action: {e}",
         )
+        logger.error("Error in selecting action")
+        logger.error(e)
+
+    def on_action_error(self, result: PolicyOutput, e: Exception):
+        self.belief.update_internal(
+            EventType.action_output,
+            self.feedback_agent_name,
+            f"Error in executing action: {result.action.name}. Error: {e}",
+        )
+        logger.exception(e)
 
-        logger.debug(f"```🤖{self.name} wrote: {result}```")
+    def log_action_start(self, result: PolicyOutput):
+        self.verbose_logger.log(
+            f"```🤖{self.name} is executing```"
+            f"```{result.action.name}\n Input: {result.args}...```"
+        )
+        logger.debug(
+            f"🤖{self.name} is executing```" "``` {result.action.name}...```"
+        )
 
-        if self.shared_memory is not None:
-            self.shared_memory.add(EventType.result, self.name, result)
-        return result
+    def log_action_output(self, result: PolicyOutput, action_output: Any):
+        action_output = self.belief.get(result.action.name, action_output)
+
+        self.verbose_logger.log(f"```Action output: {action_output}```")
+        logger.debug(f"```Action output: {action_output}```")
 
     # The validation_iterator function is responsible for iterating through each
     # instantiated validation in the 'self.validations' list.
@@ -136,7 +431,18 @@ class BaseAgent(ABC, BaseModel):
         all_pass,
         validation_is_scaped,
         result,
+        validation_cache: Optional[ValidationCache] = None,
     ):
+        if self.concurrent_validations:
+            return self.concurrent_validation_iterator(
+                validations,
+                global_regen_count,
+                all_pass,
+                validation_is_scaped,
+                result,
+                validation_cache,
+            )
+
         for i in range(len(validations)):
             validation = validations[i]
             logger.info(f"validation_running: {validation.__class__.__name__}")
@@ -145,8 +451,8 @@ class BaseAgent(ABC, BaseModel):
             # limit.
             if validation.count < self.validation_steps:
                 self.belief.update_internal(EventType.result, self.name, result)
-                validation_result = validation.process_output(
-                    text=result, belief=self.belief, llm=self.llm
+                validation_result = self.process_validation(
+                    validation, result, validation_cache
                 )
                 logger.info(f"validation_result: {validation_result}")
                 if not validation_result.is_valid:
@@ -178,6 +484,140 @@ class BaseAgent(ABC, BaseModel):
                 validation_is_scaped = True
         return global_regen_count, all_pass, validation_is_scaped, result
 
+    def concurrent_validation_iterator(
+        self,
+        validations,
+        global_regen_count,
+        all_pass,
+        validation_is_scaped,
+        result,
+        validation_cache: Optional[ValidationCache] = None,
+    ):
+        """
+        Run one round of validation with all the validations running concurrently
+        on the same output, used instead of `validation_iterator` when
+        `concurrent_validations` is set.
+
+        The feedback of all the failed validations is added to the belief and the
+        output is synthesized once, so the round takes a single regeneration
+        instead of one per failed validation. Takes and returns the same values as
+        `validation_iterator`.
+        """
+        active_validations = [
+            validation
+            for validation in validations
+            if validation.count < self.validation_steps
+        ]
+        # validations which reached the validation steps limit are skipped
+        if len(active_validations) < len(validations):
+            validation_is_scaped = True
+        if len(active_validations) == 0:
+            return global_regen_count, True, validation_is_scaped, result
+
+        self.belief.update_internal(EventType.result, self.name, result)
+        validation_results = self.process_validations_concurrently(
+            active_validations, result, validation_cache
+        )
+
+        failed_results = [
+            validation_result
+            for validation_result in validation_results
+            if not validation_result.is_valid
+        ]
+        if len(failed_results) == 0:
+            return (
+                global_regen_count,
+                True,
+                validation_is_scaped,
+                self.merge_validation_results(result, validation_results),
+            )
+
+        for validation_result in failed_results:
+            self.belief.update_internal(
+                EventType.feedback,
+                self.feedback_agent_name,
+                validation_result.feedback,
+            )
+        result = self.synthesize_output()
+        global_regen_count += 1
+        return global_regen_count, all_pass, validation_is_scaped, result
+
+    def process_validations_concurrently(
+        self,
+        validations: List[BaseOutputProcessor],
+        result: str,
+        validation_cache: Optional[ValidationCache] = None,
+    ) -> List[ValidationResult]:
+        """
+        Validate a candidate output with all the validations at once in a thread
+        pool, validations waiting on an LLM or on I/O overlap with the others
+
+        Args:
+            validations (List[BaseOutputProcessor]): The validators
+            result (str): The candidate output
+            validation_cache (ValidationCache, optional): Cache of the results of
+                the current validation process
+
+        Returns:
+            List[ValidationResult]: The result of each validation, in order
+        """
+        with ThreadPoolExecutor(max_workers=len(validations)) as executor:
+            return list(
+                executor.map(
+                    lambda validation: self.process_validation(
+                        validation, result, validation_cache
+                    ),
+                    validations,
+                )
+            )
+
+    def merge_validation_results(
+        self, result: str, validation_results: List[ValidationResult]
+    ) -> str:
+        """
+        Combine the outputs of validations which ran on the same text. Validations
+        such as `CitationValidation` rewrite the text, the last rewrite wins.
+
+        Args:
+            result (str): The text given to the validations
+            validation_results (List[ValidationResult]): Result of each validation
+
+        Returns:
+            str: The combined output
+        """
+        merged = result
+        for validation_result in validation_results:
+            if validation_result.is_valid and validation_result.result != result:
+                merged = validation_result.result
+        return merged
+
+    def process_validation(
+        self,
+        validation: BaseOutputProcessor,
+        result: str,
+        validation_cache: Optional[ValidationCache] = None,
+    ):
+        """
+        Validate a candidate output, through the validation cache if given
+
+        Args:
+            validation (BaseOutputProcessor): The validator
+            result (str): The candidate output
+            validation_cache (ValidationCache, optional): Cache of the results of
+                the current validation process
+
+        Returns:
+            ValidationResult: The result of the validation
+        """
+        if validation_cache is None:
+            return validation.process_output(
+                text=result, belief=self.belief, llm=self.llm
+            )
+
+        return validation_cache.process_output(
+            validation, text=result, belief=self.belief, llm=self.llm
+        )
+
     def validate_output(self):
         """
         Validate the synthesized output through a series of validation steps.
@@ -207,6 +647,7 @@ class BaseAgent(ABC, BaseModel):
             validation.reset_state()
 
         validations = self.validations
+        validation_cache = ValidationCache() if self.cache_validations else None
 
         # this loop will run until max regeneration reached or all validations have
         # failed
@@ -227,20 +668,34 @@ class BaseAgent(ABC, BaseModel):
                 validation_is_scaped=validation_is_scaped,
                 validations=validations,
                 result=result,
+                validation_cache=validation_cache,
             )
         # if all didn't pass or validation reached max regeneration run the validation
         # one more time but no regeneration.
         if validation_is_scaped or self.global_regen_max >= global_regen_count:
             failed_validations = []
 
-            for validation in validations:
-                validation_result = validation.process_output(
-                    text=result, belief=self.belief, llm=self.llm
+            if self.concurrent_validations and len(validations) > 0:
+                validation_results = self.process_validations_concurrently(
+                    validations, result, validation_cache
                 )
-                if not validation_result.is_valid:
-                    failed_validations.append(validation)
-                else:
-                    result = validation_result.result
+                failed_validations = [
+                    validation
+                    for validation, validation_result in zip(
+                        validations, validation_results
+                    )
+                    if not validation_result.is_valid
+                ]
+                result = self.merge_validation_results(result, validation_results)
+            else:
+                for validation in validations:
+                    validation_result = self.process_validation(
+                        validation, result, validation_cache
+                    )
+                    if not validation_result.is_valid:
+                        failed_validations.append(validation)
+                    else:
+                        result = validation_result.result
 
             result += "\n".join(
                 failed_validation.get_failure_message()
@@ -259,6 +714,13 @@ class BaseAgent(ABC, BaseModel):
                 for inst_val in validations
             )
 
+        if validation_cache is not None:
+            self.verbose_logger.log(
+                f"```Validation cache: {validation_cache.hits} hits, "
+                f"{validation_cache.misses} misses "
+                f"({validation_cache.hit_rate:.0%} hit rate)```"
+            )
+
         self.belief.update_internal(EventType.result, self.name, result)
         return result
 
@@ -267,3 +729,6 @@ class BaseAgent(ABC, BaseModel):
 
     def act(self, action, inputs):
         return action(**inputs)
+
+    async def aact(self, action, inputs):
+        return await action.acall(**inputs)
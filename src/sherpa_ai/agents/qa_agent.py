@@ -91,15 +91,27 @@ class QAAgent(BaseAgent):
             ),
         ]
 
-    def synthesize_output(self) -> str:
-        synthesize_action = SynthesizeOutput(
+    def create_synthesize_action(self) -> SynthesizeOutput:
+        return SynthesizeOutput(
             role_description=self.description,
             llm=self.llm,
             add_citation=self.citation_enabled,
         )
+
+    def synthesize_output(self) -> str:
+        synthesize_action = self.create_synthesize_action()
         result = synthesize_action.execute(
             self.belief.current_task.content,
             self.belief.get_context(self.llm.get_num_tokens),
             self.belief.get_internal_history(self.llm.get_num_tokens),
         )
         return result
+
+    async def asynthesize_output(self) -> str:
+        synthesize_action = self.create_synthesize_action()
+        result = await synthesize_action.aexecute(
+            self.belief.current_task.content,
+            self.belief.get_context(self.llm.get_num_tokens),
+            self.belief.get_internal_history(self.llm.get_num_tokens),
+        )
+        return result
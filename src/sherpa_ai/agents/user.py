@@ -1,3 +1,4 @@
+import asyncio
 from typing import List
 
 from loguru import logger
@@ -44,3 +45,9 @@ class UserAgent(BaseAgent):
         else:
             self.verbose_logger.log(message)
             return result
+
+    async def arun(self) -> str:
+        """
+        Redirect the task to a real person, waiting for the answer in a worker thread
+        """
+        return await asyncio.to_thread(self.run)
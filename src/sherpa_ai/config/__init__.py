@@ -52,6 +52,12 @@ FILE_TOKEN_LIMIT = environ.get("FILE_TOKEN_LIMIT") or 20000
 DB_NAME = environ.get("DB_NAME") or "token_counter.db"
 DB_URL = environ.get("DB_URL") or "sqlite:///token_counter.db"
 
+# Outbound HTTP requests, such as scraping links and calling search APIs
+HTTP_TIMEOUT = float(environ.get("HTTP_TIMEOUT") or 2.5)
+HTTP_MAX_RETRIES = int(environ.get("HTTP_MAX_RETRIES") or 2)
+HTTP_BACKOFF_FACTOR = float(environ.get("HTTP_BACKOFF_FACTOR") or 0.5)
+HTTP_MAX_CONCURRENCY = int(environ.get("HTTP_MAX_CONCURRENCY") or 32)
+
 # Slack integration
 SLACK_SIGNING_SECRET = environ.get("SLACK_SIGNING_SECRET")
 SLACK_OAUTH_TOKEN = environ.get("SLACK_OAUTH_TOKEN")
@@ -76,6 +82,15 @@ CHROMA_INDEX = environ.get("CHROMA_INDEX")
 
 # Serper.dev. Optional. Enables Google web search capability in Sherpa.
 SERPER_API_KEY = environ.get("SERPER_API_KEY")
+SERPER_API_URL = environ.get("SERPER_API_URL", "https://google.serper.dev")
+
+# Cache of the Google Search and Arxiv results. Optional. Results are cached in memory
+# for SEARCH_CACHE_TTL seconds (0 disables the cache), and in the database at
+# SEARCH_CACHE_DB_URL (e.g., sqlite:///search_cache.db) if it is set.
+SEARCH_CACHE_TTL = float(environ.get("SEARCH_CACHE_TTL") or 0)
+SEARCH_CACHE_MAX_ENTRIES = int(environ.get("SEARCH_CACHE_MAX_ENTRIES") or 1000)
+SEARCH_CACHE_DB_URL = environ.get("SEARCH_CACHE_DB_URL")
+SEARCH_CACHE_DB_MAX_ENTRIES = int(environ.get("SEARCH_CACHE_DB_MAX_ENTRIES") or 100000)
 
 # Github auth for extracting readme files from GitHub repositories. Optional.
 GITHUB_AUTH_TOKEN = environ.get("GITHUB_AUTH_TOKEN")
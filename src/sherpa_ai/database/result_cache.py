@@ -0,0 +1,372 @@
+"""
+Caches of the results of external searches, such as Google Search and Arxiv.
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import Column, Float, String, Text, create_engine, delete, func, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+import sherpa_ai.config as cfg
+
+
+Base = declarative_base()
+
+
+class CachedResult(Base):
+    """SQLAlchemy model of a cached result"""
+
+    __tablename__ = "result_cache"
+
+    key = Column(String, primary_key=True)
+    value = Column(Text)
+    expires_at = Column(Float, index=True)
+    last_used = Column(Float, index=True)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so that queries differing only in case or whitespace
+    share a cache entry
+    """
+    return " ".join(query.lower().split())
+
+
+def make_cache_key(
+    namespace: str, query: str, site: Optional[str] = None, top_k: Optional[int] = None
+) -> str:
+    """
+    Create the cache key of a search
+
+    Args:
+        namespace (str): The source of the results, such as "serper" or "arxiv"
+        query (str): The search query, normalized with `normalize_query`
+        site (str, optional): The site the search is restricted to
+        top_k (int, optional): The number of results requested
+
+    Returns:
+        str: The cache key
+    """
+    site = site.strip().lower().rstrip("/") if site else ""
+    return json.dumps([namespace, normalize_query(query), site, top_k])
+
+
+class BaseResultCache(ABC):
+    """
+    Base class of a cache of search results. Results expire `ttl` seconds after
+    they are stored.
+
+    Attributes:
+        ttl (float): Time to live of the results in seconds
+        hits (int): Number of lookups answered from the cache
+        misses (int): Number of lookups not found in the cache
+        evictions (int): Number of results evicted to respect the size limit
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def load_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Load an unexpired result with its expiry time in seconds since the epoch,
+        None if there is none
+        """
+        pass
+
+    @abstractmethod
+    def store(self, key: str, value: Any, expires_at: Optional[float] = None):
+        """
+        Store a result, expiring at `expires_at` if given, `ttl` seconds from now
+        otherwise
+        """
+        pass
+
+    def load(self, key: str) -> Optional[Any]:
+        """Load an unexpired result, None if there is none"""
+        entry = self.load_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_expiry(self, expires_at: Optional[float]) -> float:
+        return time.time() + self.ttl if expires_at is None else expires_at
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached result and record the hit or miss
+
+        Args:
+            key (str): The cache key, see `make_cache_key`
+
+        Returns:
+            Optional[Any]: The result, None if it is not cached or has expired
+        """
+        value = self.load(key)
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        logger.debug(f"Result cache: {self.format_metrics()}")
+        return value
+
+    def set(self, key: str, value: Any):
+        """
+        Cache a result. Results must not be None and should not be modified after
+        they are cached.
+
+        Args:
+            key (str): The cache key, see `make_cache_key`
+            value (Any): The result
+        """
+        self.store(key, value)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def format_metrics(self) -> str:
+        """Summarize the metrics in one line, logged after every lookup"""
+        return (
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+            f"{self.evictions} evictions"
+        )
+
+
+class MemoryResultCache(BaseResultCache):
+    """
+    In-memory cache evicting the least recently used results once more than
+    `max_entries` are stored.
+
+    Attributes:
+        max_entries (int): Maximum number of results stored
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1000):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self.results: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    def load_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self.lock:
+            cached = self.results.get(key)
+            if cached is None:
+                return None
+
+            expires_at, value = cached
+            if expires_at <= time.time():
+                del self.results[key]
+                return None
+
+            self.results.move_to_end(key)
+            return value, expires_at
+
+    def store(self, key: str, value: Any, expires_at: Optional[float] = None):
+        with self.lock:
+            self.results[key] = (self.get_expiry(expires_at), value)
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_entries:
+                self.results.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+
+
+class SQLResultCache(BaseResultCache):
+    """
+    Persistent cache in a SQL database, such as SQLite, evicting the least recently
+    used results once more than `max_entries` are stored. Results are stored as
+    JSON.
+
+    Attributes:
+        db_url (str): URL of the database
+        max_entries (int): Maximum number of results stored
+    """
+
+    def __init__(self, db_url: str, ttl: float, max_entries: int = 100000):
+        super().__init__(ttl)
+        self.db_url = db_url
+        self.max_entries = max_entries
+
+        connect_args = {}
+        if db_url.startswith("sqlite"):
+            # sessions are created per operation, possibly in different threads
+            connect_args["check_same_thread"] = False
+        self.engine = create_engine(db_url, connect_args=connect_args)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+    def load_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        now = time.time()
+        with self.Session() as session:
+            cached = session.get(CachedResult, key)
+            if cached is None:
+                return None
+
+            if cached.expires_at <= now:
+                session.delete(cached)
+                session.commit()
+                return None
+
+            cached.last_used = now
+            value = cached.value
+            expires_at = cached.expires_at
+            session.commit()
+
+        return json.loads(value), expires_at
+
+    def store(self, key: str, value: Any, expires_at: Optional[float] = None):
+        now = time.time()
+        with self.Session() as session:
+            session.merge(
+                CachedResult(
+                    key=key,
+                    value=json.dumps(value),
+                    expires_at=self.get_expiry(expires_at),
+                    last_used=now,
+                )
+            )
+            session.execute(delete(CachedResult).where(CachedResult.expires_at <= now))
+
+            num_results = session.scalar(select(func.count()).select_from(CachedResult))
+            num_evicted = num_results - self.max_entries
+            if num_evicted > 0:
+                evicted_keys = select(CachedResult.key).order_by(
+                    CachedResult.last_used
+                ).limit(num_evicted)
+                session.execute(
+                    delete(CachedResult).where(
+                        CachedResult.key.in_(evicted_keys.scalar_subquery())
+                    )
+                )
+                with self.lock:
+                    self.evictions += num_evicted
+            session.commit()
+
+    def clear(self):
+        with self.Session() as session:
+            session.execute(delete(CachedResult))
+            session.commit()
+
+
+class TieredResultCache(BaseResultCache):
+    """
+    Cache combining several caches, from the fastest to the slowest, such as a
+    `MemoryResultCache` in front of a `SQLResultCache`. A result is stored in all
+    the tiers, a result found in a slower tier is copied to the faster ones with
+    its original expiry time.
+
+    Lookups are counted once by the tiered cache, the hit and miss counters of the
+    tiers are left untouched. The metrics report the number of hits answered by
+    each tier.
+
+    Attributes:
+        tiers (List[BaseResultCache]): The caches, from the fastest to the slowest
+        tier_hits (List[int]): Number of hits answered by each tier
+    """
+
+    def __init__(self, tiers: List[BaseResultCache]):
+        super().__init__(max(tier.ttl for tier in tiers))
+        self.tiers = tiers
+        self.tier_hits = [0] * len(tiers)
+
+    def load_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        for i, tier in enumerate(self.tiers):
+            entry = tier.load_entry(key)
+            if entry is not None:
+                with self.lock:
+                    self.tier_hits[i] += 1
+                value, expires_at = entry
+                for faster_tier in self.tiers[:i]:
+                    faster_tier.store(key, value, expires_at)
+                return entry
+        return None
+
+    def store(self, key: str, value: Any, expires_at: Optional[float] = None):
+        # the tiers may have different ttls, they compute the expiry themselves
+        for tier in self.tiers:
+            tier.store(key, value, expires_at)
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = super().get_metrics()
+        metrics["evictions"] = sum(tier.evictions for tier in self.tiers)
+        metrics["tiers"] = [
+            {"hits": hits, "evictions": tier.evictions}
+            for tier, hits in zip(self.tiers, self.tier_hits)
+        ]
+        return metrics
+
+    def format_metrics(self) -> str:
+        tier_hits = ", ".join(str(hits) for hits in self.tier_hits)
+        return f"{super().format_metrics()}, hits by tier: {tier_hits}"
+
+
+_search_cache: Optional[BaseResultCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[BaseResultCache]:
+    """
+    Get the cache of search results shared by the search tools, configured by the
+    SEARCH_CACHE_* settings. Results are cached in memory, and in the database at
+    SEARCH_CACHE_DB_URL if it is set.
+
+    Returns:
+        Optional[BaseResultCache]: The cache, None if SEARCH_CACHE_TTL is not
+        positive
+    """
+    global _search_cache
+
+    if cfg.SEARCH_CACHE_TTL <= 0:
+        return None
+
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                tiers = [
+                    MemoryResultCache(
+                        cfg.SEARCH_CACHE_TTL, cfg.SEARCH_CACHE_MAX_ENTRIES
+                    )
+                ]
+                if cfg.SEARCH_CACHE_DB_URL:
+                    tiers.append(
+                        SQLResultCache(
+                            cfg.SEARCH_CACHE_DB_URL,
+                            cfg.SEARCH_CACHE_TTL,
+                            cfg.SEARCH_CACHE_DB_MAX_ENTRIES,
+                        )
+                    )
+                _search_cache = (
+                    tiers[0] if len(tiers) == 1 else TieredResultCache(tiers)
+                )
+                logger.info(f"Search results are cached for {cfg.SEARCH_CACHE_TTL}s")
+
+    return _search_cache
@@ -1,4 +1,9 @@
+import itertools
+import sys
+import threading
+import time
 from enum import Enum
+from typing import Callable, Optional
 
 
 class EventType(Enum):
@@ -11,11 +16,113 @@ class EventType(Enum):
     user_input = 7
 
 
+_event_ids = itertools.count()
+_event_ids_lock = threading.Lock()
+
+
+def _next_event_id() -> int:
+    with _event_ids_lock:
+        return next(_event_ids)
+
+
+def _reserve_event_id(event_id: int):
+    """
+    Make sure newly created events get ids larger than a restored event id
+    """
+    global _event_ids
+
+    with _event_ids_lock:
+        next_id = next(_event_ids)
+        _event_ids = itertools.count(max(next_id, event_id + 1))
+
+
 class Event:
-    def __init__(self, event_type: EventType, agent: str, content: str) -> None:
-        self.event_type = event_type
-        self.agent = agent
-        self.content = content
+    """
+    An event observed or generated by agents.
+
+    Events are immutable and slotted to keep the memory footprint of long sessions
+    small.
+
+    Attributes:
+        event_type (EventType): Type of the event
+        agent (str): Name of the agent creating the event, interned since the
+            same few names are shared by all events
+        content (str): Content of the event
+        event_id (int): Monotonic sequence id of the event
+        timestamp (float): Creation time of the event in seconds since the epoch
+    """
+
+    __slots__ = (
+        "event_type",
+        "agent",
+        "content",
+        "event_id",
+        "timestamp",
+        "_num_tokens",
+        "_token_counter",
+    )
+
+    def __init__(
+        self,
+        event_type: EventType,
+        agent: str,
+        content: str,
+        event_id: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        if event_id is None:
+            event_id = _next_event_id()
+        else:
+            _reserve_event_id(event_id)
+
+        set_attr = object.__setattr__
+        set_attr(self, "event_type", event_type)
+        set_attr(self, "agent", sys.intern(agent))
+        set_attr(self, "content", content)
+        set_attr(self, "event_id", event_id)
+        set_attr(self, "timestamp", time.time() if timestamp is None else timestamp)
+        set_attr(self, "_num_tokens", None)
+        set_attr(self, "_token_counter", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Event is immutable, cannot set attribute {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Event is immutable, cannot delete attribute {name}")
+
+    def __reduce__(self):
+        return (self.__class__.from_dict, (self.__dict__,))
+
+    def has_num_tokens(self, token_counter: Callable[[str], int]) -> bool:
+        """
+        Check if the number of tokens is already counted with the token counter
+
+        Args:
+            token_counter (Callable[[str], int]): Token counter
+
+        Returns:
+            bool: True if the count is cached, False otherwise
+        """
+        # bound methods are recreated on every access, so compare by equality
+        return self._num_tokens is not None and self._token_counter == token_counter
+
+    def get_num_tokens(self, token_counter: Callable[[str], int]) -> int:
+        """
+        Get the number of tokens in the content, the count is memoized for the
+        last token counter used
+
+        Args:
+            token_counter (Callable[[str], int]): Token counter
+
+        Returns:
+            int: Number of tokens in the content
+        """
+        if not self.has_num_tokens(token_counter):
+            # the memoized count is a cache, not part of the event itself
+            object.__setattr__(self, "_num_tokens", token_counter(self.content))
+            object.__setattr__(self, "_token_counter", token_counter)
+
+        return self._num_tokens
 
     def __str__(self) -> str:
         return f"{self.agent}: {self.event_type} - {self.content}"
@@ -26,6 +133,8 @@ class Event:
             "event_type": self.event_type,
             "agent": self.agent,
             "content": self.content,
+            "event_id": self.event_id,
+            "timestamp": self.timestamp,
         }
 
     @classmethod
@@ -34,4 +143,6 @@ class Event:
             event_type=data["event_type"],
             agent=data["agent"],
             content=data["content"],
+            event_id=data.get("event_id"),
+            timestamp=data.get("timestamp"),
         )
@@ -0,0 +1,155 @@
+"""
+HTTP client shared by the outbound requests of Sherpa, such as scraping web pages
+and calling search APIs.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import sherpa_ai.config as cfg
+
+
+# status codes of the responses worth retrying
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# status codes of the responses to requests the server did not process
+UNPROCESSED_STATUS_CODES = (429,)
+
+
+class HttpClient:
+    """
+    HTTP client keeping connections alive between requests.
+
+    All the requests go through a single session, its connections are pooled per
+    host, so the requests to the same host after the first one skip the TCP and
+    TLS handshakes. Idempotent requests, such as GET requests, are retried with
+    exponential backoff on failed connections and responses with a status code in
+    `RETRY_STATUS_CODES`. Other requests are only retried if they opt in with
+    `retry_unprocessed`, and only when the server did not process them: on failed
+    connections and responses with a status code in `UNPROCESSED_STATUS_CODES`.
+    The number of requests in flight is bounded, a request waits for a free slot
+    beyond `max_concurrency`.
+
+    Attributes:
+        timeout (float): Default timeout of a request in seconds, for connecting and
+            for each read
+        max_retries (int): Maximum number of retries of a request
+        backoff_factor (float): Retries wait `backoff_factor * 2 ** (retry - 1)`
+            seconds, respecting the Retry-After header of the response
+        pool_connections (int): Number of hosts whose connections are kept
+        pool_maxsize (int): Number of connections kept for each host
+        max_concurrency (int): Maximum number of requests in flight
+        session (requests.Session): The underlying session
+        unprocessed_session (requests.Session): The session of the requests opting
+            in with `retry_unprocessed`
+    """
+
+    def __init__(
+        self,
+        timeout: float = cfg.HTTP_TIMEOUT,
+        max_retries: int = cfg.HTTP_MAX_RETRIES,
+        backoff_factor: float = cfg.HTTP_BACKOFF_FACTOR,
+        pool_connections: int = 32,
+        pool_maxsize: int = 10,
+        max_concurrency: int = cfg.HTTP_MAX_CONCURRENCY,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_concurrency = max_concurrency
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        # only the idempotent methods of Retry.DEFAULT_ALLOWED_METHODS are retried
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            # the last response is returned, callers check its status code
+            raise_on_status=False,
+        )
+        self.session = self.create_session(retry)
+
+        # any method is safe to retry if the request was not processed, but not on
+        # read errors, the server may have processed the request then
+        unprocessed_retry = Retry(
+            total=max_retries,
+            read=0,
+            other=0,
+            backoff_factor=backoff_factor,
+            status_forcelist=UNPROCESSED_STATUS_CODES,
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        self.unprocessed_session = self.create_session(unprocessed_retry)
+
+    def create_session(self, retry: Retry) -> requests.Session:
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(
+        self, method: str, url: str, retry_unprocessed: bool = False, **kwargs
+    ) -> requests.Response:
+        """
+        Send a request, the body of the response is read before returning
+
+        Args:
+            method (str): The HTTP method
+            url (str): The URL
+            retry_unprocessed (bool): Whether to retry a non-idempotent request
+                the server did not process, on failed connections and responses
+                with a status code in `UNPROCESSED_STATUS_CODES`
+            **kwargs: Other arguments of `requests.Session.request`
+
+        Returns:
+            requests.Response: The response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        session = self.unprocessed_session if retry_unprocessed else self.session
+        with self.semaphore:
+            return session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    @contextmanager
+    def stream(self, method: str, url: str, **kwargs) -> Iterator[requests.Response]:
+        """
+        Send a request without reading the body of the response, which can be read
+        in chunks with `iter_content`. The connection is released when the context
+        exits, and it counts towards `max_concurrency` until then.
+
+        Args:
+            method (str): The HTTP method
+            url (str): The URL
+            **kwargs: Other arguments of `requests.Session.request`
+
+        Yields:
+            requests.Response: The response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        with self.semaphore:
+            response = self.session.request(method, url, stream=True, **kwargs)
+            try:
+                yield response
+            finally:
+                response.close()
+
+
+# shared by all the outbound requests
+http_client = HttpClient()
@@ -1,38 +1,165 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Callable, List, Optional
+from bisect import bisect_left
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple
+from weakref import WeakKeyDictionary
 
-import pydash
 from loguru import logger
 
 from sherpa_ai.actions.base import BaseAction, BaseRetrievalAction
 from sherpa_ai.events import Event, EventType
+from sherpa_ai.memory.belief_store import BeliefStore
 
 if TYPE_CHECKING:
     from sherpa_ai.memory.state_machine import SherpaStateMachine
 
 
+def count_words(text: str) -> int:
+    """
+    Default token counter counting the number of words in the text
+    """
+    return len(text.split())
+
+
+class ContextWindow:
+    """
+    Token-budgeted window over the newest context events of a belief.
+
+    The token count of each event is cached when the event is appended, together
+    with a running total, so the newest slice of events within the token budget
+    can be selected without re-tokenizing the whole history.
+
+    Attributes:
+        event_types (set): Types of the events included in the window
+        events (List[Event]): Events included in the window
+        cumulative_tokens (List[int]): Running total of tokens, the i-th entry is
+            the number of tokens in the first i events
+        token_counter (Callable[[str], int]): Token counter used for the cached
+            counts
+        count_tokens (Callable[[Event, Callable[[str], int]], int]): Function to
+            count the tokens of an event
+    """
+
+    def __init__(
+        self,
+        event_types: List[EventType],
+        count_tokens: Callable[[Event, Callable[[str], int]], int],
+    ):
+        self.event_types = set(event_types)
+        self.events: List[Event] = []
+        self.cumulative_tokens: List[int] = [0]
+        self.token_counter: Optional[Callable[[str], int]] = None
+        self.count_tokens = count_tokens
+
+    def append(self, event: Event):
+        """
+        Add an event to the window if it is one of the included types
+
+        Args:
+            event (Event): The event to be added
+        """
+        if event.event_type not in self.event_types:
+            return
+
+        self.events.append(event)
+        if self.token_counter is not None:
+            self.cumulative_tokens.append(
+                self.cumulative_tokens[-1]
+                + self.count_tokens(event, self.token_counter)
+            )
+
+    def recount(self, token_counter: Callable[[str], int]):
+        """
+        Recompute the running total of tokens with a new token counter
+
+        Args:
+            token_counter (Callable[[str], int]): Token counter
+        """
+        self.token_counter = token_counter
+        self.cumulative_tokens = [0]
+        for event in self.events:
+            self.cumulative_tokens.append(
+                self.cumulative_tokens[-1] + self.count_tokens(event, token_counter)
+            )
+
+    def get(self, token_counter: Callable[[str], int], max_tokens: int) -> str:
+        """
+        Get the newest events within the token budget
+
+        Events are included from the newest to the oldest, the event that makes the
+        total exceed `max_tokens` is the last one included.
+
+        Args:
+            token_counter (Callable[[str], int]): Token counter
+            max_tokens (int): Maximum number of tokens
+
+        Returns:
+            str: Content of the selected events separated by newlines
+        """
+        # bound methods are recreated on every access, so compare by equality
+        if self.token_counter != token_counter:
+            self.recount(token_counter)
+
+        # find the last position where the remaining events exceed the budget
+        target = self.cumulative_tokens[-1] - max_tokens
+        start = 0
+        if target > 0:
+            start = bisect_left(self.cumulative_tokens, target) - 1
+
+        return "".join(event.content + "\n" for event in self.events[start:])
+
+
 class Belief:
     """
     The belief of the agent. it contains
         1. events: the events observed by the agent, synchronized with the shared memory
         2. internal_events: the internal events generated by the agent through its reasoning process (actions)
+
+    The token counts of the events are memoized, `num_token_counts_saved` records
+    the number of tokenizer calls avoided by the memoization.
+
+    Events should be added through `update` and `update_internal` so the indexes
+    used for deduplication and filtering by type stay in sync.
     """
 
     def __init__(self):
         self.events: List[Event] = []
         self.internal_events: List[Event] = []
+        # ids of the observed events, restored copies of an event share its id
+        self.event_ids: set = set()
+        self.internal_events_by_type: Dict[EventType, List[Event]] = defaultdict(
+            list
+        )
+        # high-water mark of the events already observed in each shared memory
+        self.observed_positions: WeakKeyDictionary = WeakKeyDictionary()
         self.current_task: Event = None
         self.state_machine: SherpaStateMachine = None
+        self.actions_version = 0
         self.actions = []
-        self.dict: dict = {}
+        # cached rendering of the actions and the versions it was rendered from
+        self.action_description_cache: Optional[str] = None
+        self.action_description_key: Optional[tuple] = None
+        self.dict_store = BeliefStore()
+        # keys updated through `set` since the last checkpoint, in the order of
+        # their latest update, drained by the checkpointer
+        self.dict_updates: Dict[str, None] = {}
+        # whether the whole dict was replaced since the last checkpoint
+        self.dict_replaced = False
         self.max_tokens = 4000
+        self.num_token_counts_saved = 0
+        self.context_window = ContextWindow(
+            [EventType.task, EventType.result, EventType.user_input],
+            self.count_tokens,
+        )
 
     def update(self, observation: Event):
-        if observation in self.events:
+        if observation.event_id in self.event_ids:
             return
 
+        self.event_ids.add(observation.event_id)
         self.events.append(observation)
+        self.context_window.append(observation)
 
     def update_internal(
         self,
@@ -41,40 +168,66 @@ class Belief:
         content: str,
     ):
         event = Event(event_type=event_type, agent=agent, content=content)
+        self.add_internal_event(event)
+
+    def add_internal_event(self, event: Event):
         self.internal_events.append(event)
+        self.internal_events_by_type[event.event_type].append(event)
+
+    def get_history_version(
+        self, exclude_types: Optional[List[EventType]] = None
+    ) -> Tuple[int, int]:
+        """
+        Get a version of the events in the belief, which changes whenever an event
+        is added. Events are only appended, so the numbers of events identify the
+        history.
+
+        Args:
+            exclude_types (List[EventType], optional): Types of the internal events
+                whose addition does not change the version
+
+        Returns:
+            Tuple[int, int]: Numbers of observed and internal events
+        """
+        num_internal_events = len(self.internal_events)
+        for event_type in exclude_types or []:
+            num_internal_events -= len(self.internal_events_by_type.get(event_type, []))
+        return len(self.events), num_internal_events
 
     def get_by_type(self, event_type):
-        return [
-            event for event in self.internal_events if event.event_type == event_type
-        ]
+        return list(self.internal_events_by_type.get(event_type, []))
 
     def set_current_task(self, task: Event):
         self.current_task = task
 
+    def count_tokens(self, event: Event, token_counter: Callable[[str], int]) -> int:
+        """
+        Count the tokens of an event, reusing the memoized count if possible
+
+        Args:
+            event (Event): The event to be counted
+            token_counter (Callable[[str], int]): Token counter
+
+        Returns:
+            int: Number of tokens in the content of the event
+        """
+        if event.has_num_tokens(token_counter):
+            self.num_token_counts_saved += 1
+
+        return event.get_num_tokens(token_counter)
+
     def get_context(self, token_counter: Callable[[str], int]):
         """
         Get the context of the agent
 
         Args:
             token_counter: Token counter
-            max_tokens: Maximum number of tokens
 
         Returns:
-            str: Context of the agent
+            str: Context of the agent. Context is truncated if the number of tokens
+            exceeds `max_tokens`.
         """
-        context = ""
-        for event in reversed(self.events):
-            if event.event_type in [
-                EventType.task,
-                EventType.result,
-                EventType.user_input,
-            ]:
-                context = event.content + "\n" + context
-
-                if token_counter(context) > self.max_tokens:
-                    break
-
-        return context
+        return self.context_window.get(token_counter, self.max_tokens)
 
     def get_internal_history(self, token_counter: Callable[[str], int]):
         """
@@ -92,7 +245,7 @@ class Belief:
 
         for event in reversed(self.internal_events):
             results.append(event.content)
-            current_tokens += token_counter(event.content)
+            current_tokens += self.count_tokens(event, token_counter)
             if current_tokens > self.max_tokens:
                 break
 
@@ -117,10 +270,36 @@ class Belief:
             str: Internal history of the agent with event content separated by newlines.
             History is truncated if the number of tokens exceeds `max_tokens`.
         """
+        results, feedback = self.get_history_events_excluding_types(
+            exclude_types, token_counter, max_tokens
+        )
+        context = "\n".join(set(event.content for event in results)) + "\n".join(
+            set(event.content for event in feedback)
+        )
+        return context
+
+    def get_history_events_excluding_types(
+        self,
+        exclude_types: list[EventType],
+        token_counter: Optional[Callable[[str], int]] = None,
+        max_tokens=4000,
+    ) -> Tuple[List[Event], List[Event]]:
+        """
+        Get the internal events making up the history returned by
+        `get_histories_excluding_types`
+
+        Args:
+            exclude_types: List of events to be excluded
+            token_counter: Token counter
+            max_tokens: Maximum number of tokens
+
+        Returns:
+            List[Event]: Events other than feedback, oldest first
+            List[Event]: Feedback events, newest first
+        """
         if token_counter is None:
             # if no token counter is provided, use the default word counter
-            def token_counter(x):
-                return len(x.split())
+            token_counter = count_words
 
         results = []
         feedback = []
@@ -128,14 +307,15 @@ class Belief:
         for event in reversed(self.internal_events):
             if event.event_type not in exclude_types:
                 if event.event_type == EventType.feedback:
-                    feedback.append(event.content)
+                    feedback.append(event)
                 else:
-                    results.append(event.content)
-            current_tokens += token_counter(event.content)
+                    results.append(event)
+            current_tokens += self.count_tokens(event, token_counter)
             if current_tokens > max_tokens:
                 break
-        context = "\n".join(set(reversed(results))) + "\n".join(set(feedback))
-        return context
+
+        results.reverse()
+        return results, feedback
 
     def set_actions(self, actions: List[BaseAction]):
         if self.state_machine is not None:
@@ -152,9 +332,51 @@ class Belief:
             if isinstance(action, BaseRetrievalAction):
                 action.current_task = self.current_task.content
 
+    @property
+    def actions(self) -> List[BaseAction]:
+        return self._actions
+
+    @actions.setter
+    def actions(self, actions: List[BaseAction]):
+        self._actions = actions
+        self.actions_version += 1
+
     @property
     def action_description(self):
-        return "\n".join([str(action) for action in self.get_actions()])
+        return self.get_action_description()
+
+    def get_action_description(
+        self, actions: Optional[List[BaseAction]] = None
+    ) -> str:
+        """
+        Get the description of the actions for prompts, the description is cached
+        until the list of actions, the state of the state machine or the keys of
+        the belief dict change
+
+        Args:
+            actions (List[BaseAction], optional): The actions to describe, defaults
+                to the current actions of the belief
+
+        Returns:
+            str: Description of each action separated by newlines
+        """
+        if actions is None:
+            actions = self.get_actions()
+
+        key = (
+            # actions of a state machine are not stored in self.actions
+            self.actions_version if self.state_machine is None else None,
+            self.get_state(),
+            tuple(action.name for action in actions),
+            self.dict_store.keys_version,
+        )
+        if key != self.action_description_key:
+            self.action_description_cache = "\n".join(
+                [str(action) for action in actions]
+            )
+            self.action_description_key = key
+
+        return self.action_description_cache
 
     def get_state(self):
         if self.state_machine is None:
@@ -170,7 +392,7 @@ class Belief:
 
     def get_action(self, action_name) -> BaseAction:
         if self.state_machine is not None:
-            self.actions = self.state_machine.get_actions()
+            return self.state_machine.get_action(action_name)
 
         result = None
         for action in self.actions:
@@ -179,38 +401,54 @@ class Belief:
                 break
         return result
 
+    @property
+    def dict(self) -> Mapping[str, Any]:
+        """
+        Read-only view of the dict, nested dictionaries included. Writing to it
+        raises a TypeError, use `set` or assign a new dict instead.
+        """
+        return self.dict_store.to_read_only_dict()
+
+    @dict.setter
+    def dict(self, value: dict):
+        self.dict_store = BeliefStore(value)
+        self.dict_updates = {}
+        self.dict_replaced = True
+
     def get_dict(self):
         return self.dict
 
+    def get_dict_snapshot(self) -> BeliefStore:
+        """
+        Get a copy-on-write snapshot of the dict in O(1), the snapshot can be
+        modified, e.g. by validators or speculative actions, without affecting the
+        belief
+        """
+        return self.dict_store.snapshot()
+
     def get(self, key, default=None):
         """
         Get value from the dict, the key can be a dot separated string if the value is nested
         """
-        return pydash.get(self.dict, key, default)
+        return self.dict_store.get(key, default)
 
     def get_all_keys(self):
-        def get_all_keys(d, parent_key=""):
-            keys = []
-            for k, v in d.items():
-                full_key = parent_key + "." + k if parent_key else k
-                keys.append(full_key)
-                if isinstance(v, dict):
-                    keys.extend(get_all_keys(v, full_key))
-            return keys
-
-        return get_all_keys(self.dict)
+        return self.dict_store.get_all_keys()
 
     def has(self, key):
         """
         Check if the key exists in the dict
         """
-        return pydash.has(self.dict, key)
+        return self.dict_store.has(key)
 
     def set(self, key, value):
         """
         Set value in the dict, the key can be a dot separated string if the value is nested
         """
-        pydash.set_(self.dict, key, value)
+        self.dict_store.set(key, value)
+        # a key updated again moves to the end
+        self.dict_updates.pop(key, None)
+        self.dict_updates[key] = None
 
     @property
     def __dict__(self):
@@ -218,16 +456,16 @@ class Belief:
             "events": [event.__dict__ for event in self.events],
             "internal_events": [event.__dict__ for event in self.internal_events],
             "current_task": self.current_task.__dict__ if self.current_task else None,
-            "dict": self.dict,
+            "dict": self.dict_store.to_dict(),
         }
 
     @classmethod
     def from_dict(cls, data):
         belief = cls()
-        belief.events = [Event.from_dict(event) for event in data["events"]]
-        belief.internal_events = [
-            Event.from_dict(event) for event in data["internal_events"]
-        ]
+        for event in data["events"]:
+            belief.update(Event.from_dict(event))
+        for event in data["internal_events"]:
+            belief.add_internal_event(Event.from_dict(event))
         belief.current_task = (
             Event.from_dict(data["current_task"]) if data["current_task"] else None
         )
@@ -0,0 +1,210 @@
+"""
+Storage of the key-value pairs in the belief of an agent.
+"""
+
+import copy
+import itertools
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
+
+import pydash
+
+
+# versions are unique across stores, so a version identifies a set of keys
+_key_versions = itertools.count()
+
+
+class Node(dict):
+    """
+    Nested dictionary in a belief store, tagged with the store owning it
+    """
+
+    __slots__ = ("owner",)
+
+    def __init__(self, owner: object, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.owner = owner
+
+
+def to_plain_dict(node: dict) -> dict:
+    """Copy the nodes of a nested dictionary into plain dictionaries"""
+    return {
+        key: to_plain_dict(value) if isinstance(value, Node) else value
+        for key, value in node.items()
+    }
+
+
+def to_read_only_dict(node: dict) -> MappingProxyType:
+    """Copy the nodes of a nested dictionary into read-only views"""
+    return MappingProxyType(
+        {
+            key: to_read_only_dict(value) if isinstance(value, Node) else value
+            for key, value in node.items()
+        }
+    )
+
+
+class BeliefStore:
+    """
+    Nested dictionary addressed by dot separated keys.
+
+    Besides the nested dictionary, a flat index maps every dot separated key to its
+    value, so a lookup is a single dictionary access. The list of all keys is cached
+    until a key is added or removed.
+
+    `snapshot` creates a copy sharing all the data with the store in O(1). Nested
+    dictionaries are tagged with the store owning them, a store copies the shared
+    dictionaries on the path of a key when the key is first written to
+    (copy-on-write), so writes to a snapshot never affect the original and vice
+    versa. Nested dictionaries are returned by `get` as plain copies, so they cannot
+    be modified in place either. Other values, such as lists, are shared and should
+    not be modified in place.
+
+    Attributes:
+        root (Node): The nested dictionary
+        index (Dict[str, Any]): Value of every dot separated key
+        keys_version (int): Version of the set of keys, changes whenever a key is
+            added or removed
+    """
+
+    def __init__(self, data: Optional[dict] = None):
+        self.owner = object()
+        self.root = Node(self.owner)
+        self.index: Dict[str, Any] = {}
+        self.index_owned = True
+        self.keys: Optional[List[str]] = None
+        self.keys_version = next(_key_versions)
+
+        for key, value in (data or {}).items():
+            self.root[key] = self.import_value(value, key)
+
+    def import_value(self, value: Any, key: str) -> Any:
+        """
+        Convert nested dictionaries of a value into nodes owned by the store and
+        index them
+        """
+        if isinstance(value, dict):
+            value = Node(
+                self.owner,
+                {
+                    child_key: self.import_value(child, f"{key}.{child_key}")
+                    for child_key, child in value.items()
+                },
+            )
+        self.index[key] = value
+        return value
+
+    def remove_index(self, value: Any, key: str):
+        self.index.pop(key, None)
+        if isinstance(value, dict):
+            for child_key, child in value.items():
+                self.remove_index(child, f"{key}.{child_key}")
+
+    def own(self, node: Node) -> Node:
+        if node.owner is self.owner:
+            return node
+        return Node(self.owner, node)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.index:
+            value = self.index[key]
+            # the nodes may be shared with snapshots, never hand them out
+            return to_plain_dict(value) if isinstance(value, Node) else value
+
+        # keys not in the index may point into a list, e.g. "a.0"
+        return pydash.get(self.root, key, default)
+
+    def has(self, key: str) -> bool:
+        return key in self.index or pydash.has(self.root, key)
+
+    def set(self, key: str, value: Any):
+        parts = key.split(".")
+        node = self.root
+        for i, part in enumerate(parts[:-1]):
+            child = node.get(part)
+            if isinstance(child, list):
+                # keys pointing into a list, e.g. "a.0", are written by pydash on a
+                # copy of the list, which replaces the list in the store
+                list_key = ".".join(parts[: i + 1])
+                list_value = copy.deepcopy(child)
+                pydash.set_(list_value, ".".join(parts[i + 1 :]), value)
+                self.set(list_key, list_value)
+                return
+            if not isinstance(child, Node):
+                break
+            node = child
+
+        if not self.index_owned:
+            self.index = dict(self.index)
+            self.index_owned = True
+
+        self.root = node = self.own(self.root)
+        path = ""
+        keys_changed = False
+        for part in parts[:-1]:
+            path = f"{path}.{part}" if path else part
+            child = node.get(part)
+            if isinstance(child, Node):
+                child = self.own(child)
+            else:
+                # replace a missing or non-dictionary value with a dictionary
+                self.remove_index(child, path)
+                child = Node(self.owner)
+                keys_changed = True
+            node[part] = child
+            self.index[path] = child
+            node = child
+
+        last = parts[-1]
+        old_value = node.get(last)
+        if last not in node or isinstance(old_value, dict) or isinstance(value, dict):
+            keys_changed = True
+
+        self.remove_index(old_value, key)
+        node[last] = self.import_value(value, key)
+
+        if keys_changed:
+            self.keys = None
+            self.keys_version = next(_key_versions)
+
+    def get_all_keys(self) -> List[str]:
+        if self.keys is None:
+
+            def get_all_keys(d, parent_key=""):
+                keys = []
+                for k, v in d.items():
+                    full_key = parent_key + "." + k if parent_key else k
+                    keys.append(full_key)
+                    if isinstance(v, dict):
+                        keys.extend(get_all_keys(v, full_key))
+                return keys
+
+            self.keys = get_all_keys(self.root)
+
+        return list(self.keys)
+
+    def snapshot(self) -> "BeliefStore":
+        """
+        Create a copy-on-write copy of the store in O(1)
+
+        Returns:
+            BeliefStore: The snapshot
+        """
+        snapshot = BeliefStore()
+        snapshot.root = self.root
+        snapshot.index = self.index
+        snapshot.keys = self.keys
+        snapshot.keys_version = self.keys_version
+
+        # all the nodes are shared now, both stores copy them before writing
+        self.owner = object()
+        self.index_owned = False
+        snapshot.index_owned = False
+
+        return snapshot
+
+    def to_dict(self) -> dict:
+        return to_plain_dict(self.root)
+
+    def to_read_only_dict(self) -> MappingProxyType:
+        return to_read_only_dict(self.root)
@@ -0,0 +1,241 @@
+"""
+Incremental checkpoints of a shared memory and the beliefs of its agents.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from sherpa_ai.actions.planning import Plan, Step
+from sherpa_ai.events import Event
+from sherpa_ai.memory.belief import Belief
+from sherpa_ai.memory.shared_memory import SharedMemory
+
+
+if TYPE_CHECKING:
+    from sherpa_ai.agents import AgentPool
+    from sherpa_ai.agents.base import BaseAgent
+
+
+class BeliefCursor:
+    """
+    Position of the last checkpoint in the logs of a belief
+    """
+
+    def __init__(self):
+        self.num_events = 0
+        self.num_internal_events = 0
+        self.current_task_id: Optional[int] = None
+
+
+class Checkpointer:
+    """
+    Create checkpoints containing only the changes since the previous checkpoint.
+
+    A checkpoint is a dict with a `type` of either `full` or `delta`. A full
+    checkpoint has the same content as `Orchestrator.save`. A delta checkpoint
+    contains the events appended to the shared memory and the beliefs, the keys
+    updated in the belief dicts and the plan, current step and current tasks if
+    they changed. The first checkpoint and every `compaction_interval`-th
+    checkpoint after it are full checkpoints, so a restore never replays more than
+    `compaction_interval` deltas. A belief whose whole dict was replaced since the
+    previous checkpoint is stored in full.
+
+    The updated keys recorded by a belief are drained by every checkpoint, so a
+    belief should be checkpointed by a single checkpointer.
+
+    Attributes:
+        compaction_interval (int): Number of checkpoints between full checkpoints
+    """
+
+    def __init__(self, compaction_interval: int = 10):
+        self.compaction_interval = compaction_interval
+        self.num_checkpoints = 0
+        self.num_events = 0
+        self.objective: Optional[str] = None
+        self.plan: Optional[dict] = None
+        self.current_step: Optional[dict] = None
+        self.belief_cursors: Dict[str, BeliefCursor] = {}
+
+    def reset(self):
+        """
+        Forget the previous checkpoints, the next checkpoint is a full one
+        """
+        self.num_checkpoints = 0
+        self.belief_cursors = {}
+
+    def checkpoint(self, shared_memory: SharedMemory, agents: List[BaseAgent]) -> dict:
+        """
+        Create a checkpoint of the shared memory and the beliefs of the agents
+
+        Args:
+            shared_memory (SharedMemory): The shared memory to be checkpointed
+            agents (List[BaseAgent]): The agents whose beliefs are checkpointed
+
+        Returns:
+            dict: The checkpoint
+        """
+        is_full = self.num_checkpoints % self.compaction_interval == 0
+        self.num_checkpoints += 1
+
+        if is_full:
+            self.belief_cursors = {}
+
+        result = {
+            "type": "full" if is_full else "delta",
+            "shared_memory": self.checkpoint_shared_memory(shared_memory, is_full),
+            "agent_belief": {
+                agent.name: self.checkpoint_belief(agent.name, agent.belief, is_full)
+                for agent in agents
+            },
+        }
+
+        return result
+
+    def checkpoint_shared_memory(self, shared_memory: SharedMemory, is_full: bool):
+        if is_full:
+            self.num_events = len(shared_memory.events)
+            data = shared_memory.__dict__
+            self.objective = data["objective"]
+            self.plan = data["plan"]
+            self.current_step = data["current_step"]
+            return data
+
+        new_events = shared_memory.events[self.num_events :]
+        data = {"events": [event.__dict__ for event in new_events]}
+        self.num_events = len(shared_memory.events)
+
+        if shared_memory.objective != self.objective:
+            self.objective = data["objective"] = shared_memory.objective
+
+        # plans are small compared to the event logs, compare them directly
+        plan = shared_memory.plan.__dict__ if shared_memory.plan else None
+        if plan != self.plan:
+            self.plan = data["plan"] = plan
+
+        current_step = (
+            shared_memory.current_step.__dict__ if shared_memory.current_step else None
+        )
+        if current_step != self.current_step:
+            self.current_step = data["current_step"] = current_step
+
+        return data
+
+    def checkpoint_belief(self, name: str, belief: Belief, is_full: bool):
+        is_new = name not in self.belief_cursors
+        if is_new:
+            self.belief_cursors[name] = BeliefCursor()
+        cursor = self.belief_cursors[name]
+
+        current_task_id = belief.current_task.event_id if belief.current_task else None
+
+        if is_full or is_new or belief.dict_replaced:
+            # beliefs added after the last full checkpoint, or whose dict was
+            # replaced, are stored in full
+            data = belief.__dict__
+            data["dict"] = copy.deepcopy(data["dict"])
+        else:
+            data = {
+                "events": [
+                    event.__dict__ for event in belief.events[cursor.num_events :]
+                ],
+                "internal_events": [
+                    event.__dict__
+                    for event in belief.internal_events[cursor.num_internal_events :]
+                ],
+                "dict_updates": self.get_dict_updates(belief, belief.dict_updates),
+            }
+            if current_task_id != cursor.current_task_id:
+                data["current_task"] = (
+                    belief.current_task.__dict__ if belief.current_task else None
+                )
+
+        cursor.num_events = len(belief.events)
+        cursor.num_internal_events = len(belief.internal_events)
+        belief.dict_updates = {}
+        belief.dict_replaced = False
+        cursor.current_task_id = current_task_id
+
+        return data
+
+    def get_dict_updates(
+        self, belief: Belief, keys: Iterable[str]
+    ) -> List[Tuple[str, Any]]:
+        # the keys are in the order of their latest update
+        return [
+            (key, copy.deepcopy(belief.get(key)))
+            for key in keys
+            # the key may have been replaced by a later update of its parent
+            if belief.has(key)
+        ]
+
+
+def apply_belief_delta(belief: Belief, data: dict):
+    for event in data["events"]:
+        belief.update(Event.from_dict(event))
+    for event in data["internal_events"]:
+        belief.add_internal_event(Event.from_dict(event))
+    for key, value in data["dict_updates"]:
+        belief.set(key, value)
+    if "current_task" in data:
+        belief.current_task = (
+            Event.from_dict(data["current_task"]) if data["current_task"] else None
+        )
+
+
+def apply_shared_memory_delta(shared_memory: SharedMemory, data: dict):
+    for event in data["events"]:
+        shared_memory.add_event(Event.from_dict(event))
+    if "objective" in data:
+        shared_memory.objective = data["objective"]
+    if "plan" in data:
+        shared_memory.plan = Plan.from_dict(data["plan"]) if data["plan"] else None
+    if "current_step" in data:
+        shared_memory.current_step = (
+            Step.from_dict(data["current_step"]) if data["current_step"] else None
+        )
+
+
+def restore_checkpoints(
+    checkpoints: Iterable[dict], agent_pool: AgentPool
+) -> Tuple[SharedMemory, Dict[str, Belief]]:
+    """
+    Restore the shared memory and the beliefs from a sequence of checkpoints
+
+    The checkpoints are consumed one at a time, so they can be read lazily, e.g.
+    from a generator over a file.
+
+    Args:
+        checkpoints (Iterable[dict]): Checkpoints in the order they were created,
+            starting with a full checkpoint
+        agent_pool (AgentPool): The agent pool of the restored shared memory
+
+    Returns:
+        SharedMemory: The restored shared memory
+        Dict[str, Belief]: The restored beliefs by agent name
+    """
+    shared_memory = None
+    beliefs: Dict[str, Belief] = {}
+
+    for checkpoint in checkpoints:
+        if checkpoint["type"] == "full":
+            shared_memory = SharedMemory.from_dict(
+                checkpoint["shared_memory"], agent_pool
+            )
+            beliefs = {}
+        elif shared_memory is None:
+            raise ValueError("Checkpoints must start with a full checkpoint")
+        else:
+            apply_shared_memory_delta(shared_memory, checkpoint["shared_memory"])
+
+        for name, data in checkpoint["agent_belief"].items():
+            if "dict" in data:
+                beliefs[name] = Belief.from_dict(data)
+            else:
+                apply_belief_delta(beliefs[name], data)
+
+    if shared_memory is None:
+        raise ValueError("No checkpoint to restore")
+
+    return shared_memory, beliefs
@@ -0,0 +1,318 @@
+"""
+Storage backends for the events of a shared memory.
+
+A store behaves like an append-only sequence of events, so it can be used
+wherever the list of events of the shared memory was used.
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from abc import abstractmethod
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import List, Optional, Union
+
+from loguru import logger
+
+from sherpa_ai.events import Event, EventType
+
+
+class BaseEventStore(Sequence):
+    """
+    Base class for an append-only store of events.
+
+    Subclasses implement `append`, `__len__` and `__getitem__`, iteration and
+    `index` are derived from them.
+    """
+
+    @abstractmethod
+    def append(self, event: Event):
+        pass
+
+    def flush(self):
+        """
+        Make the appended events durable, the cost is proportional to the events
+        appended since the last flush
+        """
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class InMemoryEventStore(BaseEventStore):
+    """
+    Store keeping all the events in a list in memory.
+    """
+
+    def __init__(self, events: Optional[List[Event]] = None):
+        self.events: List[Event] = list(events) if events else []
+
+    def append(self, event: Event):
+        self.events.append(event)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __getitem__(self, index: Union[int, slice]):
+        return self.events[index]
+
+
+# length and crc32 of the payload
+RECORD_HEADER = struct.Struct(">II")
+
+
+def encode_event(event: Event) -> bytes:
+    data = event.__dict__
+    data["event_type"] = event.event_type.value
+    payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_event(payload: bytes) -> Event:
+    data = json.loads(payload)
+    data["event_type"] = EventType(data["event_type"])
+    return Event.from_dict(data)
+
+
+class FileEventStore(BaseEventStore):
+    """
+    Append-only event log stored in segment files in a directory.
+
+    Each event is written as a length-prefixed, checksummed JSON record. When a
+    segment exceeds `segment_size` bytes it is sealed: the offsets of its records
+    are written to an index file next to it and a new segment is started. Sealed
+    segments are memory-mapped for reads, so reopening a log only loads the record
+    offsets and events are decoded when they are accessed.
+
+    Appended records are kept in a write buffer until it exceeds `buffer_size`
+    bytes or the store is flushed, the events in the buffer are read from it
+    directly.
+
+    On opening, only the active (last) segment is scanned, a partially written
+    record left by a crash is truncated, so recovery scales with the events
+    appended since the last sealed segment.
+
+    Attributes:
+        directory (str): Directory containing the segment files
+        segment_size (int): Size in bytes after which a segment is sealed
+        sync (bool): Whether to fsync after every append instead of on `flush`
+        buffer_size (int): Size in bytes after which the write buffer is written
+            to the active segment
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 * 2**20,
+        sync: bool = False,
+        buffer_size: int = 64 * 2**10,
+    ):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.sync = sync
+        self.buffer_size = buffer_size
+
+        # offsets of the records in each segment
+        self.segment_offsets: List[array] = []
+        # index of the first event in each segment
+        self.segment_starts: List[int] = []
+        self.maps: List[Optional[mmap.mmap]] = []
+        self.num_events = 0
+        self.active_file = None
+        self.active_size = 0
+        # records appended to the active segment but not yet written to it
+        self.write_buffer = bytearray()
+
+        os.makedirs(directory, exist_ok=True)
+        self.open_segments()
+
+    def segment_path(self, segment: int, suffix: str = "log") -> str:
+        return os.path.join(self.directory, f"{segment:08d}.{suffix}")
+
+    def open_segments(self):
+        segments = sorted(
+            int(name[:-4])
+            for name in os.listdir(self.directory)
+            if name.endswith(".log")
+        )
+        if len(segments) == 0:
+            segments = [0]
+
+        for segment in segments[:-1]:
+            offsets = self.read_index(segment)
+            if offsets is None:
+                offsets, _ = self.scan_segment(segment)
+                self.write_index(segment, offsets)
+            self.add_segment(offsets)
+
+        # the active segment has no index, recover it from the records
+        active = segments[-1]
+        offsets, valid_size = self.scan_segment(active)
+        path = self.segment_path(active)
+        if os.path.exists(path) and os.path.getsize(path) > valid_size:
+            logger.warning(f"Truncating incomplete record at the end of {path}")
+            os.truncate(path, valid_size)
+
+        self.add_segment(offsets)
+        self.active_file = open(path, "ab")
+        self.active_size = valid_size
+
+    def add_segment(self, offsets: array):
+        self.segment_starts.append(self.num_events)
+        self.segment_offsets.append(offsets)
+        self.maps.append(None)
+        self.num_events += len(offsets)
+
+    def read_index(self, segment: int) -> Optional[array]:
+        path = self.segment_path(segment, "idx")
+        if not os.path.exists(path):
+            return None
+
+        offsets = array("Q")
+        with open(path, "rb") as f:
+            offsets.frombytes(f.read())
+        return offsets
+
+    def write_index(self, segment: int, offsets: array):
+        path = self.segment_path(segment, "idx")
+        with open(path + ".tmp", "wb") as f:
+            f.write(offsets.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def scan_segment(self, segment: int):
+        """
+        Read the offsets of the valid records in a segment
+
+        Returns:
+            array: Offsets of the valid records
+            int: Size of the segment up to the end of the last valid record
+        """
+        offsets = array("Q")
+        path = self.segment_path(segment)
+        if not os.path.exists(path):
+            return offsets, 0
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        position = 0
+        while position + RECORD_HEADER.size <= len(data):
+            length, checksum = RECORD_HEADER.unpack_from(data, position)
+            start = position + RECORD_HEADER.size
+            payload = data[start : start + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            offsets.append(position)
+            position = start + length
+
+        return offsets, position
+
+    def get_map(self, segment: int, size: int) -> mmap.mmap:
+        current = self.maps[segment]
+        if current is None or len(current) < size:
+            # the active segment grows, remap it to cover the new records
+            if current is not None:
+                current.close()
+            with open(self.segment_path(segment), "rb") as f:
+                current = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.maps[segment] = current
+        return current
+
+    def read(self, index: int) -> Event:
+        # empty segments share their start with the next one, bisect_right skips them
+        segment = bisect_right(self.segment_starts, index) - 1
+        offset = self.segment_offsets[segment][index - self.segment_starts[segment]]
+
+        buffer_start = self.active_size - len(self.write_buffer)
+        if segment == len(self.segment_offsets) - 1 and offset >= buffer_start:
+            start = offset - buffer_start
+            length, _ = RECORD_HEADER.unpack_from(self.write_buffer, start)
+            start += RECORD_HEADER.size
+            return decode_event(bytes(self.write_buffer[start : start + length]))
+
+        data = self.get_map(segment, offset + RECORD_HEADER.size)
+        length, _ = RECORD_HEADER.unpack_from(data, offset)
+        if len(data) < offset + RECORD_HEADER.size + length:
+            data = self.get_map(segment, offset + RECORD_HEADER.size + length)
+
+        start = offset + RECORD_HEADER.size
+        return decode_event(data[start : start + length])
+
+    def append(self, event: Event):
+        record = encode_event(event)
+        self.write_buffer += record
+        if self.sync:
+            self.flush()
+        elif len(self.write_buffer) >= self.buffer_size:
+            self.write_records()
+
+        self.segment_offsets[-1].append(self.active_size)
+        self.active_size += len(record)
+        self.num_events += 1
+
+        if self.active_size >= self.segment_size:
+            self.seal()
+
+    def seal(self):
+        """
+        Seal the active segment and start a new one
+        """
+        self.flush()
+        self.active_file.close()
+
+        segment = len(self.segment_offsets) - 1
+        self.write_index(segment, self.segment_offsets[segment])
+
+        self.add_segment(array("Q"))
+        self.active_file = open(self.segment_path(segment + 1), "ab")
+        self.active_size = 0
+
+    def write_records(self):
+        """
+        Write the records in the write buffer to the active segment
+        """
+        self.active_file.write(self.write_buffer)
+        self.active_file.flush()
+        self.write_buffer = bytearray()
+
+    def flush(self):
+        if self.active_file is None or self.active_file.closed:
+            return
+
+        self.write_records()
+        os.fsync(self.active_file.fileno())
+
+    def close(self):
+        self.flush()
+        if self.active_file is not None:
+            self.active_file.close()
+        for current in self.maps:
+            if current is not None:
+                current.close()
+        self.maps = [None] * len(self.maps)
+
+    def __len__(self) -> int:
+        return self.num_events
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self.read(i) for i in range(*index.indices(self.num_events))]
+
+        if index < 0:
+            index += self.num_events
+        if index < 0 or index >= self.num_events:
+            raise IndexError("event index out of range")
+        return self.read(index)
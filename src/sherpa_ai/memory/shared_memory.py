@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, List, Optional
 
-from sherpa_ai.actions.planning import Plan
+from sherpa_ai.actions.planning import Plan, Step
 from sherpa_ai.events import Event, EventType
 from sherpa_ai.memory.belief import Belief
+from sherpa_ai.memory.event_store import BaseEventStore, InMemoryEventStore
 
 
 if TYPE_CHECKING:
@@ -12,33 +13,71 @@ if TYPE_CHECKING:
 
 
 class SharedMemory:
-    def __init__(self, objective: str, agent_pool: AgentPool = None):
+    """
+    Memory shared by the agents, containing the log of events and the plan.
+
+    Attributes:
+        objective (str): The objective of the agents
+        agent_pool (AgentPool): The pool of agents sharing the memory
+        events (BaseEventStore): The store of the events, events are kept in memory
+            by default. Use a `FileEventStore` to keep the events on disk so the
+            session can be replayed by another process.
+        plan (Plan): The current plan
+        current_step (Step): The current step of the plan
+    """
+
+    def __init__(
+        self,
+        objective: str,
+        agent_pool: AgentPool = None,
+        event_store: Optional[BaseEventStore] = None,
+    ):
         self.objective = objective
         self.agent_pool = agent_pool
-        self.events: List[Event] = []
+        self.events: BaseEventStore = (
+            event_store if event_store is not None else InMemoryEventStore()
+        )
         self.plan: Optional[Plan] = None
         self.current_step = None
+        self.latest_task: Optional[Event] = self.find_latest_task()
 
     def add_event(self, event: Event):
         self.events.append(event)
+        if event.event_type == EventType.task:
+            self.latest_task = event
+
+    def find_latest_task(self) -> Optional[Event]:
+        # only the end of a replayed log is read to find the latest task
+        for event in reversed(self.events):
+            if event.event_type == EventType.task:
+                return event
+        return None
 
     def add(self, event_type: EventType, agent: str, content: str):
         event = Event(event_type=event_type, agent=agent, content=content)
         self.add_event(event)
 
     def observe(self, belief: Belief):
-        tasks = self.get_by_type(EventType.task)
-        task = tasks[-1] if len(tasks) > 0 else None
+        belief.set_current_task(self.latest_task)
 
-        belief.set_current_task(task)
+        self.update_belief(belief, [EventType.task, EventType.result])
 
-        for event in self.events:
-            if (
-                event.event_type == EventType.task
-                or event.event_type == EventType.result
-            ):
+    def update_belief(self, belief: Belief, event_types: List[EventType]):
+        """
+        Update the belief with the events added since its last observation of this
+        shared memory
+
+        Args:
+            belief (Belief): The belief to be updated
+            event_types (List[EventType]): Types of the events to be observed
+        """
+        start = belief.observed_positions.get(self, 0)
+        for event in self.events[start:]:
+            if event.event_type in event_types:
                 belief.update(event)
 
+        belief.observed_positions[self] = len(self.events)
+
     def get_by_type(self, event_type):
         return [event for event in self.events if event.event_type == event_type]
 
@@ -52,11 +91,43 @@ class SharedMemory:
         }
 
     @classmethod
-    def from_dict(cls, data, agent_pool):
-        shared_memory = cls(objective=data["objective"], agent_pool=agent_pool)
-        shared_memory.events = [Event.from_dict(event) for event in data["events"]]
+    def from_dict(
+        cls, data, agent_pool, event_store: Optional[BaseEventStore] = None
+    ):
+        """
+        Restore a shared memory exported by `__dict__`
+
+        Args:
+            data (dict): The exported shared memory
+            agent_pool (AgentPool): The pool of agents sharing the memory
+            event_store (BaseEventStore, optional): The store of the events. A
+                store already holding the log of the session, such as a reopened
+                `FileEventStore`, only receives the exported events it is missing.
+
+        Returns:
+            SharedMemory: The restored shared memory
+        """
+        shared_memory = cls(
+            objective=data["objective"], agent_pool=agent_pool, event_store=event_store
+        )
+
+        num_stored = len(shared_memory.events)
+        num_shared = min(num_stored, len(data["events"]))
+        if num_shared > 0:
+            stored = shared_memory.events[num_shared - 1]
+            exported = data["events"][num_shared - 1]
+            if (stored.event_id, stored.timestamp) != (
+                exported.get("event_id"),
+                exported.get("timestamp"),
+            ):
+                raise ValueError(
+                    "The event store holds the events of a different session"
+                )
+
+        for event in data["events"][num_stored:]:
+            shared_memory.add_event(Event.from_dict(event))
         shared_memory.plan = Plan.from_dict(data["plan"]) if data["plan"] else None
         shared_memory.current_step = (
-            Plan.from_dict(data["current_step"]) if data["current_step"] else None
+            Step.from_dict(data["current_step"]) if data["current_step"] else None
         )
         return shared_memory
@@ -9,6 +9,7 @@ from sherpa_ai.connectors.base import BaseVectorDB
 from sherpa_ai.events import Event, EventType
 from sherpa_ai.memory import SharedMemory
 from sherpa_ai.memory.belief import Belief
+from sherpa_ai.memory.event_store import BaseEventStore, InMemoryEventStore
 
 
 class SharedMemoryWithVectorDB(SharedMemory):
@@ -27,19 +28,21 @@ class SharedMemoryWithVectorDB(SharedMemory):
         session_id: str,
         agent_pool: None,
         vectorStorage: BaseVectorDB = None,
+        event_store: Optional[BaseEventStore] = None,
     ):
         self.objective = objective
         self.agent_pool = agent_pool
-        self.events: List[Event] = []
+        self.events: BaseEventStore = (
+            event_store if event_store is not None else InMemoryEventStore()
+        )
         self.plan: Optional[Plan] = None
         self.current_step = None
+        self.latest_task: Optional[Event] = self.find_latest_task()
         self.session_id = session_id
         self.vectorStorage = vectorStorage
 
     def observe(self, belief: Belief):
-        tasks = super().get_by_type(EventType.task)
-
-        task = tasks[-1] if len(tasks) > 0 else None
+        task = self.latest_task
 
         # based on the current task search similarity on the context and add it as an
         # event type user_input which is going to be used as a context on the prompt
@@ -56,10 +59,6 @@ class SharedMemoryWithVectorDB(SharedMemory):
 
         belief.set_current_task(task)
 
-        for event in self.events:
-            if event.event_type in [
-                EventType.task,
-                EventType.result,
-                EventType.user_input,
-            ]:
-                belief.update(event)
+        self.update_belief(
+            belief, [EventType.task, EventType.result, EventType.user_input]
+        )
@@ -1,4 +1,4 @@
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import transitions as ts
 from loguru import logger
@@ -19,6 +19,28 @@ class Transition(ts.Transition):
         super().__init__(*args, **kwargs)
 
 
+class TransitionAction(DynamicAction):
+    """
+    Action wrapping a transition of the state machine
+
+    Attributes:
+        before_action (BaseAction): The action executed before the transition, its
+            usage is refreshed whenever this action is rendered
+        transition_usage (str): Description of the transition appended to the usage
+    """
+
+    before_action: Any = None
+    transition_usage: str = ""
+
+    def __str__(self):
+        if isinstance(self.before_action, BaseAction):
+            # refresh the usage or argument attributes of the action
+            _ = str(self.before_action)
+            self.usage = self.before_action.usage + self.transition_usage
+
+        return super().__str__()
+
+
 class SherpaStateMachine:
     """
     State machine for defining the behavior of an agent in sherpa
@@ -28,9 +50,10 @@ class SherpaStateMachine:
         explicit_transitions: set of triggers that are explicitly defined in the
             transitions
         sm: the state machine object from pytransitions
+        action_tables: the actions wrapping the explicit transitions from each state,
+            by trigger. Built once per state and reset by `update_transition`
     """
 
-    explicit_transitions: set = set()
     sm: ts.Machine = None
 
     def __init__(
@@ -56,6 +79,8 @@ class SherpaStateMachine:
             sm_cls (type): the state machine class to instantiate the state machine
             action_map (dict): mapping from action name to action object
         """
+        self.explicit_transitions: set = set()
+        self.action_tables: Dict[str, Dict[str, List[BaseAction]]] = {}
 
         for name, action in action_map.items():
             self.__setattr__(name, action)
@@ -94,6 +119,8 @@ class SherpaStateMachine:
             else:
                 logger.warning(f"Invalid transition {t}")
 
+        self.action_tables = {}
+
     def update_transition(
         self,
         trigger: str,
@@ -129,6 +156,8 @@ class SherpaStateMachine:
             before=action,
         )
 
+        self.action_tables = {}
+
     def get_actions(self, include_waiting: bool = False) -> list[BaseAction]:
         """
         Get the available transitions as list of actions based on the current state
@@ -146,14 +175,55 @@ class SherpaStateMachine:
         if not include_waiting and state_obj.is_waiting:
             return []
 
-        triggers = self.sm.get_triggers(state)
         actions = []
+        for trigger, trigger_actions in self.get_action_table(state).items():
+            if self.may_trigger(trigger):
+                actions.extend(trigger_actions)
 
-        for t in triggers:
-            if t not in self.explicit_transitions:
-                continue
+        return actions
+
+    def get_action(
+        self, name: str, include_waiting: bool = False
+    ) -> Optional[BaseAction]:
+        """
+        Get an available action by name based on the current state
+
+        Args:
+            name (str): the name of the action, i.e., the trigger of the transition
+            include_waiting (bool): whether to include transitions from the waiting states
 
-            if not self.may_trigger(t):
+        Returns:
+            BaseAction: the action, or None if it is not available from the current
+                state
+        """
+        state = self.state
+
+        if not include_waiting and self.sm.get_state(state).is_waiting:
+            return None
+
+        actions = self.get_action_table(state).get(name)
+        if not actions or not self.may_trigger(name):
+            return None
+
+        return actions[0]
+
+    def get_action_table(self, state: str) -> Dict[str, List[BaseAction]]:
+        """
+        Get the actions wrapping the explicit transitions from a state, by trigger.
+        The actions are created the first time the state is visited.
+
+        Args:
+            state (str): the name of the state
+
+        Returns:
+            dict: mapping from trigger to the actions of its transitions
+        """
+        if state in self.action_tables:
+            return self.action_tables[state]
+
+        table = {}
+        for t in self.sm.get_triggers(state):
+            if t not in self.explicit_transitions:
                 continue
 
             event = self.sm.events.get(t)
@@ -161,9 +231,10 @@ class SherpaStateMachine:
                 if state.startswith(source):
                     transition = transitions[0]
                     action = self.transition_to_action(t, transition)
-                    actions.append(action)
+                    table.setdefault(t, []).append(action)
 
-        return actions
+        self.action_tables[state] = table
+        return table
 
     def is_transition_valid(self, transition: ts.Transition):
         """
@@ -203,6 +274,7 @@ class SherpaStateMachine:
 
         usage = trigger
         args = {}
+        before_action = None
         if len(transition.before) > 0:
             action = transition.before[0]
             if isinstance(action, str):
@@ -215,12 +287,23 @@ class SherpaStateMachine:
                 usage = action.usage
                 args = action.args
                 action.name = trigger
+                before_action = action
 
         name = trigger
 
         # Append the transition to the usage
-        usage += f" Transit the state from {transition.source} to {transition.dest}"
+        transition_usage = (
+            f" Transit the state from {transition.source} to {transition.dest}"
+        )
+        usage += transition_usage
 
-        action = DynamicAction(name=name, args=args, usage=usage, action=wrapper_action)
+        action = TransitionAction(
+            name=name,
+            args=args,
+            usage=usage,
+            action=wrapper_action,
+            before_action=before_action,
+            transition_usage=transition_usage,
+        )
 
         return action
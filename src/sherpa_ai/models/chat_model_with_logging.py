@@ -1,6 +1,6 @@
 import json
 import typing
-from typing import Any, Coroutine, List, Optional
+from typing import Any, List, Optional
 
 from langchain_core.callbacks import ( 
     AsyncCallbackManagerForLLMRun,
@@ -27,6 +27,22 @@ class ChatModelWithLogging(BaseChatModel):
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> ChatResult:
+        result = self.llm._generate(messages, stop, run_manager, **kwargs)
+        self.log_generation(messages, result)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result = await self.llm._agenerate(messages, stop, run_manager, **kwargs)
+        self.log_generation(messages, result)
+        return result
+
+    def log_generation(self, messages: List[BaseMessage], result: ChatResult):
         # get the name of the language model. For models like OpenAI, this is the model
         # name (e.g., gpt-3.5-turbo). for other LLMs, this is the type of the LLM
         llm_name = (
@@ -38,7 +54,6 @@ class ChatModelWithLogging(BaseChatModel):
             input_text.append(
                 {"text": message.content.replace("\n", "\\n"), "agent": message.type}
             )
-        result = self.llm._generate(messages, stop, run_manager, **kwargs)
         # only one generation for a LLM call
         generation = result.generations[0]
         log = {
@@ -48,13 +63,3 @@ class ChatModelWithLogging(BaseChatModel):
             "llm_name": llm_name,
         }
         self.logger.info(json.dumps(log))
-        return result
-
-    def _agenerate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> Coroutine[Any, Any, ChatResult]:
-        self.llm.agenerate(messages, stop, run_manager, **kwargs)
@@ -1,3 +1,4 @@
+import asyncio
 import typing
 from typing import Any, List, Optional
 
@@ -18,27 +19,18 @@ class SherpaBaseChatModel(BaseChatModel):
     user_id: typing.Optional[str] = None
     verbose_logger: BaseVerboseLogger = None
 
-    def _agenerate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ):
-        pass
-
     @property
     def _llm_type(self):
         return super()._llm_type
 
-    def _generate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> ChatResult:
-        response = super()._generate(messages, stop, run_manager, **kwargs)
+    def track_usage(self, messages: List[BaseMessage], response: ChatResult):
+        """
+        Record the tokens used by a generation for the user of the model
+
+        Args:
+            messages (List[BaseMessage]): The input messages
+            response (ChatResult): The generated response
+        """
         token_before = super().get_num_tokens_from_messages(messages)
         token_after = 0
         for result_message in response.generations:
@@ -49,6 +41,16 @@ class SherpaBaseChatModel(BaseChatModel):
             user_db.add_data(user_id=self.user_id, token=total_token)
             user_db.close_connection()
 
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        response = super()._generate(messages, stop, run_manager, **kwargs)
+        self.track_usage(messages, response)
+
         return response
 
 
@@ -56,27 +58,31 @@ class SherpaChatOpenAI(ChatOpenAI):
     user_id: typing.Optional[str] = None
     verbose_logger: BaseVerboseLogger = None
 
-    def _agenerate(
+    async def _agenerate(
         self,
         messages: List[BaseMessage],
         stop: Optional[List[str]] = None,
         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
         **kwargs: Any,
-    ):
-        pass
+    ) -> ChatResult:
+        response = await super()._agenerate(messages, stop, run_manager, **kwargs)
+        # counting the tokens and writing to the usage database are blocking
+        await asyncio.to_thread(self.track_usage, messages, response)
+
+        return response
 
     @property
     def _llm_type(self):
         return super()._llm_type
 
-    def _generate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> ChatResult:
-        response = super()._generate(messages, stop, run_manager, **kwargs)
+    def track_usage(self, messages: List[BaseMessage], response: ChatResult):
+        """
+        Record the tokens used by a generation for the user of the model
+
+        Args:
+            messages (List[BaseMessage]): The input messages
+            response (ChatResult): The generated response
+        """
         token_before = super().get_num_tokens_from_messages(messages)
         token_after = 0
         for result_message in response.generations:
@@ -87,4 +93,14 @@ class SherpaChatOpenAI(ChatOpenAI):
             user_db.add_data(user_id=self.user_id, token=total_token)
             user_db.close_connection()
 
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        response = super()._generate(messages, stop, run_manager, **kwargs)
+        self.track_usage(messages, response)
+
         return response
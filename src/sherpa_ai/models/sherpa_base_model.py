@@ -1,3 +1,4 @@
+import asyncio
 import typing
 from typing import Any, List, Optional
 
@@ -17,14 +18,18 @@ from sherpa_ai.database.user_usage_tracker import UserUsageTracker
 class SherpaOpenAI(ChatOpenAI):
     user_id: typing.Optional[str] = None
 
-    def _agenerate(
+    async def _agenerate(
         self,
         messages: List[BaseMessage],
         stop: Optional[List[str]] = None,
         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
         **kwargs: Any,
-    ):
-        pass
+    ) -> ChatResult:
+        response = await super()._agenerate(messages, stop, run_manager, **kwargs)
+        # writing to the usage database is blocking
+        await asyncio.to_thread(self.track_usage, response)
+
+        return response
 
     @property
     def _llm_type(self):
@@ -38,12 +43,20 @@ class SherpaOpenAI(ChatOpenAI):
         **kwargs: Any,
     ) -> ChatResult:
         response = super()._generate(prompts, stop, run_manager, **kwargs)
+        self.track_usage(response)
+
+        return response
+
+    def track_usage(self, response: ChatResult):
+        """
+        Record the tokens used by a generation for the user of the model
 
+        Args:
+            response (ChatResult): The generated response
+        """
         total_token = response.llm_output["token_usage"]["total_tokens"]
 
         if self.user_id:
             user_db = UserUsageTracker()
             user_db.add_data(user_id=self.user_id, token=total_token)
             user_db.close_connection()
-
-        return response
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from langchain_openai import ChatOpenAI 
 from pydantic import BaseModel 
@@ -8,12 +8,15 @@ from sherpa_ai.agents import AgentPool, Critic, MLEngineer, Physicist, Planner
 from sherpa_ai.agents.base import BaseAgent
 from sherpa_ai.events import EventType
 from sherpa_ai.memory import Belief, SharedMemory
+from sherpa_ai.memory.checkpoint import Checkpointer, restore_checkpoints
 
 
 class OrchestratorConfig(BaseModel):
     llm_name: str = "gpt-3.5-turbo"
     llm_temperature: float = 0.7
     critic_rounds: int = 3
+    # number of incremental checkpoints between full checkpoints
+    checkpoint_compaction_interval: int = 10
 
 
 class Orchestrator:
@@ -27,6 +30,7 @@ class Orchestrator:
         self.agent_pool = agent_pool
         self.shared_memory = SharedMemory(
             objective="", agent_pool=self.agent_pool)
+        self.checkpointer = Checkpointer(self.config.checkpoint_compaction_interval)
 
     def plan(self, task: str, planner: Planner, critic: Critic) -> Plan:
         # planner critic loop
@@ -107,6 +111,54 @@ class Orchestrator:
         orchestrator.agent_pool = agent_pool
         return orchestrator
 
+    def checkpoint(self, shared_memory: SharedMemory, agents: List[BaseAgent]) -> dict:
+        """
+        Save the changes of the shared memory and agents since the last checkpoint,
+        every `checkpoint_compaction_interval` checkpoints a full checkpoint is
+        created instead
+
+        Args:
+            shared_memory (SharedMemory): The shared memory to be saved
+            agents (List[BaseAgent]): The agents whose beliefs are saved
+
+        Returns:
+            dict: The checkpoint, all checkpoints should be kept in order to restore
+        """
+        return self.checkpointer.checkpoint(shared_memory, agents)
+
+    @classmethod
+    def restore_checkpoints(
+        cls,
+        checkpoints: Iterable[dict],
+        agent_pool: AgentPool,
+        config: Optional[OrchestratorConfig] = None,
+        checkpointer: Optional[Checkpointer] = None,
+    ):
+        """
+        Restore the shared memory and agents from checkpoints created by
+        `checkpoint`, the checkpoints can be an iterator reading them lazily
+
+        Args:
+            checkpoints (Iterable[dict]): The checkpoints in order, starting from a
+                full checkpoint
+            agent_pool (AgentPool): The agents to be restored
+            config (OrchestratorConfig, optional): The configuration of the restored
+                orchestrator, the default configuration if not given
+            checkpointer (Checkpointer, optional): The checkpointer of the restored
+                orchestrator, created from `config` if not given. It is reset, so
+                the next checkpoint is a full one.
+        """
+        shared_memory, agent_belief = restore_checkpoints(checkpoints, agent_pool)
+        for name, agent in agent_pool.agents.items():
+            agent.belief = agent_belief[name]
+
+        orchestrator = cls(config or OrchestratorConfig(), agent_pool)
+        orchestrator.shared_memory = shared_memory
+        if checkpointer is not None:
+            checkpointer.reset()
+            orchestrator.checkpointer = checkpointer
+        return orchestrator
+
     def continue_with_user_feedback(self, user_feedback) -> Optional[str]:
         current_step = self.shared_memory.current_step
 
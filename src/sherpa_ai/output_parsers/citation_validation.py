@@ -1,4 +1,13 @@
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
 import nltk
+import numpy as np
 from loguru import logger
 from nltk.tokenize import sent_tokenize, word_tokenize
 
@@ -12,6 +21,223 @@ from sherpa_ai.output_parsers.validation_result import ValidationResult
 nltk.download("punkt_tab")
 
 
+class ResourceIndex:
+    """
+    Lines of a resource prepared for matching against many sentences.
+
+    The content of the resource is split into lines and tokenized once, an
+    inverted index from tokens to lines gives the token overlap of a sentence
+    with every line without comparing the sentence to lines it shares no token
+    with.
+
+    Attributes:
+        lines (List[str]): Non-empty lines of the resource, split on "." and "\\n"
+        token_sets (List[Set[str]]): Tokens of each line
+        char_counts (List[Counter]): Number of occurrences of each character in
+            each line
+        lines_by_token (Dict[str, List[int]]): Indices of the lines containing each
+            token
+    """
+
+    def __init__(self, resource: ActionResource):
+        # TODO: verify that splitting each sentence on newlines improves citation results
+        self.lines = [
+            line
+            for resource_sentence in resource.content.split(".")
+            for line in resource_sentence.split("\n")
+            if len(line) > 0
+        ]
+        self.token_sets: List[Set[str]] = [
+            set(word_tokenize(line)) for line in self.lines
+        ]
+        self.char_counts: List[Counter] = [Counter(line) for line in self.lines]
+
+        self.lines_by_token: Dict[str, List[int]] = {}
+        for line_index, tokens in enumerate(self.token_sets):
+            for token in tokens:
+                self.lines_by_token.setdefault(token, []).append(line_index)
+
+    def count_overlapping_tokens(self, tokens: Set[str]) -> Dict[int, int]:
+        """
+        Count the tokens each line shares with a set of tokens
+
+        Args:
+            tokens (Set[str]): Tokens of a sentence
+
+        Returns:
+            Dict[int, int]: Number of shared tokens by line index, lines sharing no
+            token are omitted
+        """
+        overlaps: Dict[int, int] = {}
+        for token in tokens:
+            for line_index in self.lines_by_token.get(token, []):
+                overlaps[line_index] = overlaps.get(line_index, 0) + 1
+        return overlaps
+
+    def max_jaccard_index(self, tokens: Set[str]) -> float:
+        """
+        Calculates the largest Jaccard index between a set of tokens and the
+        tokens of a line
+
+        Args:
+            tokens (Set[str]): Tokens of a sentence
+
+        Returns:
+            float: The largest Jaccard index, 0 if no line shares a token
+        """
+        max_index = 0.0
+        for line_index, intersection in self.count_overlapping_tokens(tokens).items():
+            union = len(tokens) + len(self.token_sets[line_index]) - intersection
+            max_index = max(max_index, intersection / union)
+        return max_index
+
+    def common_chars(self, line_index: int, char_counts: Counter) -> int:
+        """
+        Counts the characters a line has in common with a sentence, which bounds
+        their longest common subsequence
+
+        Args:
+            line_index (int): Index of the line
+            char_counts (Counter): Number of occurrences of each character in the
+                sentence
+
+        Returns:
+            int: Number of characters in common, counted with multiplicity
+        """
+        line_counts = self.char_counts[line_index]
+        return sum(
+            min(count, line_counts.get(char, 0)) for char, count in char_counts.items()
+        )
+
+
+def split_into_chunks(items: list, num_chunks: int) -> List[list]:
+    """
+    Splits a list into contiguous chunks of nearly equal size
+    """
+    chunk_size, remainder = divmod(len(items), num_chunks)
+    chunks = []
+    start = 0
+    for i in range(num_chunks):
+        end = start + chunk_size + (1 if i < remainder else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+class JaccardScorer:
+    """
+    Scores a sentence against the lines of many resources by their Jaccard index,
+    one resource at a time using the inverted index of the resource.
+
+    Attributes:
+        resource_indexes (List[ResourceIndex]): Indices of the resources
+    """
+
+    def __init__(self, resource_indexes: List[ResourceIndex]):
+        self.resource_indexes = resource_indexes
+
+    def max_jaccard_indexes(self, tokens: Set[str]) -> List[float]:
+        """
+        Calculates the largest Jaccard index between a set of tokens and the lines
+        of each resource
+
+        Args:
+            tokens (Set[str]): Tokens of a sentence
+
+        Returns:
+            List[float]: The largest Jaccard index of each resource
+        """
+        return [index.max_jaccard_index(tokens) for index in self.resource_indexes]
+
+
+class VectorizedJaccardScorer(JaccardScorer):
+    """
+    Scores a sentence against the lines of all resources at once with NumPy.
+
+    The token sets of all the lines are stored as a sparse binary matrix in
+    compressed column form: tokens are mapped to columns through a vocabulary and
+    each column holds the lines containing the token. The token overlap of a
+    sentence with every line is a single count over the columns of its tokens.
+
+    Attributes:
+        vocabulary (Dict[str, int]): Column of each token
+        column_starts (np.ndarray): Start of each column in `line_ids`
+        line_ids (np.ndarray): Lines containing each token, column after column
+        line_sizes (np.ndarray): Number of tokens of each line
+        resource_starts (np.ndarray): Index of the first line of each resource
+    """
+
+    def __init__(self, resource_indexes: List[ResourceIndex]):
+        super().__init__(resource_indexes)
+
+        self.vocabulary: Dict[str, int] = {}
+        columns: List[List[int]] = []
+        line_sizes = []
+        resource_starts = []
+        for resource_index in resource_indexes:
+            resource_starts.append(len(line_sizes))
+            for tokens in resource_index.token_sets:
+                line_id = len(line_sizes)
+                for token in tokens:
+                    column = self.vocabulary.setdefault(token, len(columns))
+                    if column == len(columns):
+                        columns.append([])
+                    columns[column].append(line_id)
+                line_sizes.append(len(tokens))
+
+        self.column_starts = np.cumsum([0] + [len(column) for column in columns])
+        self.line_ids = np.array(
+            [line_id for column in columns for line_id in column], dtype=np.int64
+        )
+        self.line_sizes = np.array(line_sizes, dtype=np.int64)
+        self.resource_starts = np.array(resource_starts, dtype=np.int64)
+
+    def jaccard_indexes(self, tokens: Set[str]) -> np.ndarray:
+        """
+        Calculates the Jaccard index between a set of tokens and every line
+
+        Args:
+            tokens (Set[str]): Tokens of a sentence
+
+        Returns:
+            np.ndarray: The Jaccard index of each line
+        """
+        columns = [
+            self.vocabulary[token] for token in tokens if token in self.vocabulary
+        ]
+        if len(columns) == 0:
+            return np.zeros(len(self.line_sizes))
+
+        starts = self.column_starts
+        line_ids = np.concatenate(
+            [self.line_ids[starts[column] : starts[column + 1]] for column in columns]
+        )
+        intersections = np.bincount(line_ids, minlength=len(self.line_sizes))
+        unions = len(tokens) + self.line_sizes - intersections
+        return np.divide(
+            intersections,
+            unions,
+            out=np.zeros(len(self.line_sizes)),
+            where=unions > 0,
+        )
+
+    def max_jaccard_indexes(self, tokens: Set[str]) -> List[float]:
+        max_indexes = np.zeros(len(self.resource_indexes))
+        if len(self.line_sizes) == 0:
+            return max_indexes.tolist()
+
+        # reduceat does not handle resources without lines, they keep 0
+        has_lines = np.diff(np.append(self.resource_starts, len(self.line_sizes))) > 0
+        max_indexes[has_lines] = np.maximum.reduceat(
+            self.jaccard_indexes(tokens), self.resource_starts[has_lines]
+        )
+        return max_indexes.tolist()
+
+
+# Backends scoring the Jaccard index of a sentence against the resources
+JACCARD_SCORERS = {"python": JaccardScorer, "numpy": VectorizedJaccardScorer}
+
+
 class CitationValidation(BaseOutputProcessor):
     """
     A class for adding citations to generated text based on a list of resources.
@@ -24,6 +250,15 @@ class CitationValidation(BaseOutputProcessor):
         sequence_threshold (float): Threshold for common longest subsequence / text. Default is 0.7.
         jaccard_threshold (float): Jaccard similarity threshold. Default is 0.7.
         token_overlap (float): Token overlap threshold. Default is 0.7.
+        similarity_backend (str): Backend scoring the Jaccard index of the sentences
+            against the resources, either "python" or "numpy". Default is "python".
+        parallel (bool): Whether to match the sentences against the resources in a
+            pool of processes. The pool is started on first use and reused until
+            `close` is called. Default is False.
+        num_processes (int): Number of processes of the pool. Default is the number
+            of CPUs.
+        min_parallel_sentences (int): Minimum number of sentences for the pool to be
+            used, shorter texts are processed in the current process. Default is 32.
 
     Typical usage example:
     ```python
@@ -33,11 +268,83 @@ class CitationValidation(BaseOutputProcessor):
     """
 
     def __init__(
-        self, sequence_threshold=0.7, jaccard_threshold=0.7, token_overlap=0.7
+        self,
+        sequence_threshold=0.7,
+        jaccard_threshold=0.7,
+        token_overlap=0.7,
+        similarity_backend="python",
+        parallel=False,
+        num_processes=None,
+        min_parallel_sentences=32,
     ):
+        if similarity_backend not in JACCARD_SCORERS:
+            raise ValueError(
+                f"Unknown similarity backend {similarity_backend}, expected one of "
+                f"{list(JACCARD_SCORERS)}"
+            )
+
+        self.similarity_backend = similarity_backend
+        self.parallel = parallel
+        self.num_processes = num_processes or os.cpu_count() or 1
+        self.min_parallel_sentences = min_parallel_sentences
         self.sequence_threshold = sequence_threshold
         self.jaccard_threshold = jaccard_threshold
         self.token_overlap = token_overlap
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.executor_lock = threading.Lock()
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        """
+        Get the pool of processes of the parallel mode, started on first use.
+
+        The processes are spawned rather than forked: validations may run in a
+        thread pool (see `BaseAgent.concurrent_validations`), and a process forked
+        while other threads hold locks can deadlock.
+        """
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.num_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self.executor
+
+    def close(self):
+        """
+        Shut down the pool of processes of the parallel mode, if it was started
+        """
+        with self.executor_lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+    def __del__(self):
+        executor = getattr(self, "executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the pool and its lock belong to the current process
+        state = self.__dict__.copy()
+        state["executor"] = None
+        del state["executor_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.executor_lock = threading.Lock()
+
+    def get_settings(self) -> Dict[str, Any]:
+        """
+        Get the settings used to match sentences, sent to the worker processes of
+        the parallel mode
+        """
+        return {
+            "sequence_threshold": self.sequence_threshold,
+            "jaccard_threshold": self.jaccard_threshold,
+            "token_overlap": self.token_overlap,
+            "similarity_backend": self.similarity_backend,
+        }
 
     def calculate_token_overlap(self, sentence1, sentence2) -> tuple:
         """
@@ -113,15 +420,44 @@ class CitationValidation(BaseOutputProcessor):
         Returns:
         - int: The length of the longest common subsequence between the two texts.
         """
-        dp = [[0 for i in range(len(text1) + 1)] for i in range(len(text2) + 1)]
+        if len(text1) == 0 or len(text2) == 0:
+            return 0
 
-        for i in range(1, len(text2) + 1):
-            for j in range(1, len(text1) + 1):
-                diagnoal = dp[i - 1][j - 1]
-                if text1[j - 1] == text2[i - 1]:
-                    diagnoal += 1
-                dp[i][j] = max(diagnoal, dp[i - 1][j], dp[i][j - 1])
-        return dp[-1][-1]
+        # Bit-parallel algorithm (Allison-Dix, Hyyro): bit j of `row` is cleared when
+        # the LCS grows at position j of text1, each character of text2 updates all
+        # the positions at once with a few integer operations
+        match_masks = {}
+        for j, char in enumerate(text1):
+            match_masks[char] = match_masks.get(char, 0) | (1 << j)
+
+        all_ones = (1 << len(text1)) - 1
+        row = all_ones
+        for char in text2:
+            matches = row & match_masks.get(char, 0)
+            row = ((row + matches) | (row - matches)) & all_ones
+
+        return len(text1) - bin(row).count("1")
+
+    def exceeds_sequence_threshold(self, sentence: str, resource_line: str) -> bool:
+        """
+        Checks if the longest common subsequence of a sentence and a resource line
+        covers more than `sequence_threshold` of the sentence.
+
+        The subsequence is never longer than the resource line, so the subsequence
+        is only computed when the resource line is long enough to pass.
+
+        Args:
+            sentence (str): The sentence to be cited.
+            resource_line (str): The line of a resource.
+
+        Returns:
+            bool: True if the subsequence exceeds the threshold, False otherwise.
+        """
+        if len(resource_line) / len(sentence) <= self.sequence_threshold:
+            return False
+
+        seq = self.longest_common_subsequence(sentence, resource_line)
+        return (seq / len(sentence)) > self.sequence_threshold
 
     def flatten_nested_list(self, nested_list: list[list[str]]) -> list[str]:
         """
@@ -197,10 +533,27 @@ class CitationValidation(BaseOutputProcessor):
 
         return self.add_citations(text, resources)
 
-    def add_citation_to_sentence(self, sentence: str, resources: list[ActionResource]):
+    def add_citation_to_sentence(
+        self,
+        sentence: str,
+        resources: list[ActionResource],
+        resource_indexes: Optional[list[ResourceIndex]] = None,
+        jaccard_scorer: Optional[JaccardScorer] = None,
+        matches: Optional[list[bool]] = None,
+    ):
         """
         Uses a list of resources to add citations to a sentence
 
+        Args:
+            sentence (str): The sentence to be cited
+            resources (list[ActionResource]): The resources to cite
+            resource_indexes (list[ResourceIndex], optional): Index of each
+                resource, built from the resources if not given
+            jaccard_scorer (JaccardScorer, optional): Scorer of the resource
+                indexes, created with the similarity backend if not given
+            matches (list[bool], optional): Whether each resource supports the
+                sentence, as returned by `match_sentence`. Computed if not given
+
         Returns:
             citation_ids: a list of citation identifiers
             citation_links: a list of citation links (URLs)
@@ -211,30 +564,154 @@ class CitationValidation(BaseOutputProcessor):
         if len(sentence) <= 5:
             return citation_ids, citation_links
 
-        for index, resource in enumerate(resources):
-            cited = False
-            resource_link = resource.source
-            resource_text = resource.content
-            resource_sentences = resource_text.split(".")
-            # TODO: verify that splitting each sentence on newlines improves citation results
-            nested_sentence_lines = [s.split("\n") for s in resource_sentences]
-            resource_lines = self.flatten_nested_list(nested_sentence_lines)
-
-            for resource_line in resource_lines:
-                if not cited and not (resource_link in citation_links):
-                    seq = self.longest_common_subsequence(sentence, resource_line)
-                    if (
-                        (seq / len(sentence)) > self.sequence_threshold
-                        or sentence in resource_line
-                        or self.jaccard_index(sentence, resource_line)
-                        > self.jaccard_threshold
-                    ):
-                        citation_links.append(resource_link)
-                        citation_ids.append(index + 1)
-                        cited = True
+        if matches is None:
+            matches = self.match_sentence(
+                sentence, resources, resource_indexes, jaccard_scorer
+            )
+
+        for index, (resource, matched) in enumerate(zip(resources, matches)):
+            # a link is cited once even if several resources share it
+            if matched and resource.source not in citation_links:
+                citation_links.append(resource.source)
+                citation_ids.append(index + 1)
 
         return citation_ids, citation_links
 
+    def match_sentence(
+        self,
+        sentence: str,
+        resources: list[ActionResource],
+        resource_indexes: Optional[list[ResourceIndex]] = None,
+        jaccard_scorer: Optional[JaccardScorer] = None,
+        tokens: Optional[Set[str]] = None,
+    ) -> list[bool]:
+        """
+        Checks which resources support a sentence
+
+        Args:
+            sentence (str): The sentence to be cited
+            resources (list[ActionResource]): The resources to cite
+            resource_indexes (list[ResourceIndex], optional): Index of each
+                resource, built from the resources if not given
+            jaccard_scorer (JaccardScorer, optional): Scorer of the resource
+                indexes, created with the similarity backend if not given
+            tokens (Set[str], optional): Tokens of the sentence, tokenized if not
+                given
+
+        Returns:
+            list[bool]: Whether each resource supports the sentence
+        """
+        if resource_indexes is None:
+            resource_indexes = [ResourceIndex(resource) for resource in resources]
+        if jaccard_scorer is None:
+            jaccard_scorer = JACCARD_SCORERS[self.similarity_backend](resource_indexes)
+        if tokens is None:
+            tokens = set(word_tokenize(sentence))
+
+        max_jaccard_indexes = jaccard_scorer.max_jaccard_indexes(tokens)
+        char_counts = Counter(sentence)
+        return [
+            self.sentence_matches_resource(
+                sentence, max_jaccard_index, char_counts, resource_index
+            )
+            for resource_index, max_jaccard_index in zip(
+                resource_indexes, max_jaccard_indexes
+            )
+        ]
+
+    def match_sentences_in_parallel(
+        self, sentences: list[str], resources: list[ActionResource]
+    ) -> list[list[bool]]:
+        """
+        Checks which resources support each sentence in a pool of processes.
+
+        The sentences are tokenized and the resources indexed in the current
+        process. The sentences and the resource indexes are split into chunks,
+        every pair of chunks is matched by `match_sentences` in a worker and the
+        results are merged back in the original order, so the citations are the
+        same as in a single process.
+
+        Args:
+            sentences (list[str]): The sentences to be cited
+            resources (list[ActionResource]): The resources to cite
+
+        Returns:
+            list[list[bool]]: Whether each resource supports each sentence
+        """
+        # split the resources only when there are too few sentences to keep
+        # all the processes busy
+        num_sentence_chunks = min(len(sentences), self.num_processes)
+        num_resource_chunks = max(
+            1, min(len(resources), self.num_processes // num_sentence_chunks)
+        )
+        tokenized_sentences = [
+            (sentence, set(word_tokenize(sentence))) for sentence in sentences
+        ]
+        resource_indexes = [ResourceIndex(resource) for resource in resources]
+        sentence_chunks = split_into_chunks(tokenized_sentences, num_sentence_chunks)
+        index_chunks = split_into_chunks(resource_indexes, num_resource_chunks)
+
+        executor = self.get_executor()
+        settings = self.get_settings()
+        futures = [
+            [
+                executor.submit(match_sentences, settings, sentences, indexes)
+                for indexes in index_chunks
+            ]
+            for sentences in sentence_chunks
+        ]
+
+        matches = []
+        for row in futures:
+            chunk_matches = [future.result() for future in row]
+            # join the matches of the resource chunks of each sentence
+            matches.extend(
+                list(itertools.chain.from_iterable(sentence_matches))
+                for sentence_matches in zip(*chunk_matches)
+            )
+
+        return matches
+
+    def sentence_matches_resource(
+        self,
+        sentence: str,
+        max_jaccard_index: float,
+        char_counts: Counter,
+        resource_index: ResourceIndex,
+    ) -> bool:
+        """
+        Checks if any line of a resource supports a sentence, either by their
+        longest common subsequence, by containing the sentence or by their Jaccard
+        index
+
+        Args:
+            sentence (str): The sentence to be cited
+            max_jaccard_index (float): The largest Jaccard index between the
+                sentence and the lines of the resource
+            char_counts (Counter): Number of occurrences of each character in the
+                sentence
+            resource_index (ResourceIndex): Index of the resource
+
+        Returns:
+            bool: True if a line of the resource supports the sentence
+        """
+        # the cheap checks run first, the subsequence is only computed for lines
+        # sharing enough characters with the sentence to pass
+        if max_jaccard_index > self.jaccard_threshold:
+            return True
+
+        if any(sentence in line for line in resource_index.lines):
+            return True
+
+        for line_index, line in enumerate(resource_index.lines):
+            common_chars = resource_index.common_chars(line_index, char_counts)
+            if common_chars / len(sentence) <= self.sequence_threshold:
+                continue
+            if self.exceeds_sequence_threshold(sentence, line):
+                return True
+
+        return False
+
     def format_sentence_with_citations(self, sentence, ids, links):
         """
         Appends citations to sentence
@@ -255,18 +732,43 @@ class CitationValidation(BaseOutputProcessor):
         paragraph = [p for p in paragraph if len(p.strip()) > 0]
 
         paragraphs = [self.split_paragraph_into_sentences(s) for s in paragraph]
+        paragraphs = [
+            [sentence.strip() for sentence in paragraph if len(sentence.strip()) > 0]
+            for paragraph in paragraphs
+        ]
+
+        # sentences too short to be cited are not matched
+        sentences = [
+            sentence
+            for paragraph in paragraphs
+            for sentence in paragraph
+            if len(sentence) > 5
+        ]
+        matches = {}
+        resource_indexes = None
+        jaccard_scorer = None
+        if self.parallel and len(sentences) >= self.min_parallel_sentences:
+            matches = dict(
+                zip(sentences, self.match_sentences_in_parallel(sentences, resources))
+            )
+        else:
+            # resources are split and tokenized once for all the sentences
+            resource_indexes = [ResourceIndex(resource) for resource in resources]
+            jaccard_scorer = JACCARD_SCORERS[self.similarity_backend](resource_indexes)
 
         new_paragraph = []
         for paragraph in paragraphs:
             new_sentences = []
 
             # for each sentence in each paragraph
-            for _, sentence in enumerate(paragraph):
-                sentence = sentence.strip()
-                if len(sentence) == 0:
-                    continue
-
-                ids, links = self.add_citation_to_sentence(sentence, resources)
+            for sentence in paragraph:
+                ids, links = self.add_citation_to_sentence(
+                    sentence,
+                    resources,
+                    resource_indexes,
+                    jaccard_scorer,
+                    matches.get(sentence),
+                )
                 formatted_sentence = self.format_sentence_with_citations(
                     sentence, ids, links
                 )
@@ -282,3 +784,32 @@ class CitationValidation(BaseOutputProcessor):
 
     def get_failure_message(self) -> str:
         return "Unable to add citations to the generated text. Please pay attention to the cited sources."
+
+
+def match_sentences(
+    settings: Dict[str, Any],
+    sentences: List[tuple],
+    resource_indexes: List[ResourceIndex],
+) -> List[List[bool]]:
+    """
+    Checks which resources support each sentence. Runs in the worker processes of
+    the parallel mode of `CitationValidation`, only the data needed for matching
+    is sent to them.
+
+    Args:
+        settings (Dict[str, Any]): The settings of the validation, see
+            `CitationValidation.get_settings`
+        sentences (List[tuple]): The sentences to be cited with their tokens
+        resource_indexes (List[ResourceIndex]): Indices of the resources to cite
+
+    Returns:
+        List[List[bool]]: Whether each resource supports each sentence
+    """
+    validation = CitationValidation(**settings)
+    jaccard_scorer = JACCARD_SCORERS[validation.similarity_backend](resource_indexes)
+    return [
+        validation.match_sentence(
+            sentence, [], resource_indexes, jaccard_scorer, tokens=tokens
+        )
+        for sentence, tokens in sentences
+    ]
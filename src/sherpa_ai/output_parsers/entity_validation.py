@@ -1,11 +1,15 @@
 from enum import Enum
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 from langchain_core.language_models import BaseLanguageModel 
 
 from sherpa_ai.events import EventType
 from sherpa_ai.memory import Belief
 from sherpa_ai.output_parsers.base import BaseOutputProcessor
+from sherpa_ai.output_parsers.extraction import (
+    ExtractionService,
+    default_extraction_service,
+)
 from sherpa_ai.output_parsers.validation_result import ValidationResult
 from sherpa_ai.utils import (
     extract_entities,
@@ -35,13 +39,22 @@ class EntityValidation(BaseOutputProcessor):
     - get_failure_message() -> str:
         Returns a failure message to be displayed when the validation fails.
 
+    Attributes:
+        extraction_service (ExtractionService): Service extracting the entities of
+            the source events, shared by all validators by default
+
     """
 
+    def __init__(self, extraction_service: Optional[ExtractionService] = None):
+        self.extraction_service = extraction_service or default_extraction_service
+
     def process_output(
         self, text: str, belief: Belief, llm: BaseLanguageModel = None, **kwargs
     ) -> ValidationResult:
         """
         Verifies that entities within `text` exist in the `belief` source text.
+        The entities of each source event are extracted separately, so an entity
+        never spans two events.
         Args:
             text: The text to be processed
             belief: The belief object of the agent that generated the output
@@ -56,11 +69,30 @@ class EntityValidation(BaseOutputProcessor):
             Otherwise, validation is valid.
         """
 
-        source = belief.get_histories_excluding_types(
-            exclude_types=[EventType.feedback, EventType.result, EventType.action],
+        exclude_types = [EventType.feedback, EventType.result, EventType.action]
+        results, feedback = belief.get_history_events_excluding_types(
+            exclude_types=exclude_types
         )
+
+        # entities of the events are cached, only new events and the text are
+        # processed. Events with the same content appear once in the source.
+        source_events = list({event.content: event for event in results}.values())
+        source_events += list({event.content: event for event in feedback}.values())
+        source = "\n".join(event.content for event in source_events)
+        source_entity = [
+            entity
+            for extraction in self.extraction_service.extract_events(source_events)
+            for entity in extraction.entities
+        ]
+        check_entity = self.extraction_service.extract_text(text).entities
+
         entity_exist_in_source, error_message = self.check_entities_match(
-            text, source, self.similarity_picker(self.count), llm
+            text,
+            source,
+            self.similarity_picker(self.count),
+            llm,
+            source_entity=source_entity,
+            check_entity=check_entity,
         )
         if entity_exist_in_source:
             return ValidationResult(
@@ -101,6 +133,8 @@ class EntityValidation(BaseOutputProcessor):
         source: str,
         stage: TextSimilarityMethod,
         llm: BaseLanguageModel,
+        source_entity: Optional[List[str]] = None,
+        check_entity: Optional[List[str]] = None,
     ):
         """
         Check if entities extracted from a question are present in an answer.
@@ -109,14 +143,20 @@ class EntityValidation(BaseOutputProcessor):
         - result (str): Answer text.
         - source (str): Question text.
         - stage (int): Stage of the check (0, 1, or 2).
+        - source_entity (List[str]): Entities of the question, extracted from
+            `source` if not given.
+        - check_entity (List[str]): Entities of the answer, extracted from `result`
+            if not given.
 
         Returns:
         dict: Result of the check containing
         """
 
         stage = stage.value
-        source_entity = extract_entities(source)
-        check_entity = extract_entities(result)
+        if source_entity is None:
+            source_entity = extract_entities(source)
+        if check_entity is None:
+            check_entity = extract_entities(result)
         if stage == 0:
             return text_similarity(
                 check_entity=check_entity, source_entity=source_entity
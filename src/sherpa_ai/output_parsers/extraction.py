@@ -0,0 +1,138 @@
+"""
+Extraction of the entities and numbers checked by the validators, cached per event.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple
+
+from sherpa_ai.events import Event
+from sherpa_ai.utils import (
+    extract_numbers_from_text,
+    get_entities_from_doc,
+    get_nlp,
+    get_numbers_from_doc,
+    normalize_numeric_text,
+)
+
+
+class Extraction(NamedTuple):
+    """
+    Entities and numbers extracted from a text
+
+    Attributes:
+        entities (List[str]): Entities as returned by `extract_entities`
+        numbers (List[str]): Numbers as returned by `combined_number_extractor`
+    """
+
+    entities: List[str]
+    numbers: List[str]
+
+
+class ExtractionService:
+    """
+    Extract entities and numbers from texts, caching the result of every event.
+
+    Texts are processed in batches with `nlp.pipe`. The extraction of an event is
+    stored by its content the first time the content is seen, so validating
+    against the same history again only processes the events added since. The
+    content is the key rather than the event id, as ids are only unique within a
+    process and are restored as is by `Event.from_dict`. The least recently used
+    extractions are dropped once more than `max_events` are stored.
+
+    Each event is processed on its own. Unlike extracting from the whole history
+    joined into one text, an entity or a number never spans two events, e.g. an
+    event ending with "two" followed by one starting with "hundred" does not yield
+    200.
+
+    Attributes:
+        batch_size (int): Number of texts processed by spaCy at once
+        max_events (int): Maximum number of event contents whose extraction is
+            stored
+        num_texts_processed (int): Number of texts processed by spaCy so far
+    """
+
+    def __init__(self, batch_size: int = 64, max_events: int = 10000):
+        self.batch_size = batch_size
+        self.max_events = max_events
+        self.extractions: OrderedDict[str, Extraction] = OrderedDict()
+        self.num_texts_processed = 0
+        self.lock = threading.Lock()
+
+    def extract_texts(self, texts: List[str]) -> List[Extraction]:
+        """
+        Extract the entities and numbers of texts without caching
+
+        Args:
+            texts (List[str]): The texts to be processed
+
+        Returns:
+            List[Extraction]: The extraction of each text
+        """
+        if len(texts) == 0:
+            return []
+
+        nlp = get_nlp()
+        entity_docs = nlp.pipe(texts, batch_size=self.batch_size)
+        # numeric entities are recognized in the normalized text, as in
+        # extract_numeric_entities
+        number_docs = nlp.pipe(
+            (normalize_numeric_text(text) for text in texts),
+            batch_size=self.batch_size,
+        )
+
+        results = []
+        for text, entity_doc, number_doc in zip(texts, entity_docs, number_docs):
+            numbers = set(extract_numbers_from_text(text))
+            numbers.update(get_numbers_from_doc(number_doc))
+            results.append(
+                Extraction(
+                    entities=get_entities_from_doc(entity_doc), numbers=list(numbers)
+                )
+            )
+
+        with self.lock:
+            self.num_texts_processed += len(texts)
+
+        return results
+
+    def extract_text(self, text: str) -> Extraction:
+        return self.extract_texts([text])[0]
+
+    def extract_events(self, events: Iterable[Event]) -> List[Extraction]:
+        """
+        Extract the entities and numbers of events, only the contents not seen
+        before are processed
+
+        Args:
+            events (Iterable[Event]): The events to be processed
+
+        Returns:
+            List[Extraction]: The extraction of each event
+        """
+        contents = [event.content for event in events]
+        found: Dict[str, Extraction] = {}
+        with self.lock:
+            for content in contents:
+                extraction = self.extractions.get(content)
+                if extraction is not None:
+                    self.extractions.move_to_end(content)
+                    found[content] = extraction
+
+        # events with the same content are processed once
+        new_contents = list(
+            dict.fromkeys(content for content in contents if content not in found)
+        )
+        new_extractions = self.extract_texts(new_contents)
+        found.update(zip(new_contents, new_extractions))
+
+        with self.lock:
+            self.extractions.update(zip(new_contents, new_extractions))
+            while len(self.extractions) > self.max_events:
+                self.extractions.popitem(last=False)
+
+        return [found[content] for content in contents]
+
+
+# shared by all validators unless one is given a service of its own
+default_extraction_service = ExtractionService()
@@ -1,10 +1,14 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
 from sherpa_ai.events import EventType
 from sherpa_ai.memory import Belief
 from sherpa_ai.output_parsers.base import BaseOutputProcessor
+from sherpa_ai.output_parsers.extraction import (
+    ExtractionService,
+    default_extraction_service,
+)
 from sherpa_ai.output_parsers.validation_result import ValidationResult
-from sherpa_ai.utils import verify_numbers_against_source
+from sherpa_ai.utils import verify_numbers
 
 
 class NumberValidation(BaseOutputProcessor):
@@ -18,11 +22,20 @@ class NumberValidation(BaseOutputProcessor):
     result = number_validator.process_output("The document contains important numbers: 123, 456.")
     ```
 
+    Attributes:
+        extraction_service (ExtractionService): Service extracting the numbers of the
+            source events, shared by all validators by default
+
     """
 
+    def __init__(self, extraction_service: Optional[ExtractionService] = None):
+        self.extraction_service = extraction_service or default_extraction_service
+
     def process_output(self, text: str, belief: Belief, **kwargs) -> ValidationResult:
         """
         Verifies that all numbers within `text` exist in the `belief` source text.
+        The numbers of each source event are extracted separately, so a number
+        never spans two events.
 
         Args:
             text: The text to be analyzed
@@ -33,12 +46,20 @@ class NumberValidation(BaseOutputProcessor):
             validation is invalid and contains a feedback string.
             Otherwise validation is valid.
         """
-        source = belief.get_histories_excluding_types(
+        results, feedback = belief.get_history_events_excluding_types(
             exclude_types=[EventType.feedback, EventType.result],
         )
 
-        numbers_exist_in_source, error_message = verify_numbers_against_source(
-            text, source
+        # numbers of the events are cached, only new events and the text are processed
+        source_numbers = set()
+        for extraction in self.extraction_service.extract_events(results + feedback):
+            source_numbers.update(extraction.numbers)
+        candidate_numbers = (
+            set(self.extraction_service.extract_text(text).numbers) if text else set()
+        )
+
+        numbers_exist_in_source, error_message = verify_numbers(
+            candidate_numbers, source_numbers
         )
 
         if numbers_exist_in_source:
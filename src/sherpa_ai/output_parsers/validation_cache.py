@@ -0,0 +1,80 @@
+import threading
+from typing import Any, Dict, Tuple
+
+from sherpa_ai.events import EventType
+from sherpa_ai.memory import Belief
+from sherpa_ai.output_parsers.base import BaseOutputProcessor
+from sherpa_ai.output_parsers.validation_result import ValidationResult
+
+
+class ValidationCache:
+    """
+    Memoizes validation results within a validation process.
+
+    A result is reused when the same validator validates the same text against an
+    unchanged belief. The key combines the identity of the validator, its failure
+    count (validators such as `EntityValidation` change their method with it), the
+    text and the version of the belief history, so a new event in the belief
+    invalidates all earlier results. The result events are left out of the
+    version: the agent records the candidate output as a result event before each
+    validation, and the candidate output is already part of the key.
+
+    Attributes:
+        hits (int): Number of validations answered from the cache
+        misses (int): Number of validations actually run
+    """
+
+    def __init__(self):
+        self.results: Dict[Tuple, Tuple[BaseOutputProcessor, ValidationResult]] = {}
+        self.hits = 0
+        self.misses = 0
+        # validations may run concurrently, see `BaseAgent.concurrent_validations`
+        self.lock = threading.Lock()
+
+    def process_output(
+        self, validation: BaseOutputProcessor, text: str, belief: Belief, **kwargs: Any
+    ) -> ValidationResult:
+        """
+        Validate a text, reusing the result of an identical earlier validation
+
+        Args:
+            validation (BaseOutputProcessor): The validator
+            text (str): The text to be validated
+            belief (Belief): Belief of the agent that generated `text`
+            **kwargs: Other arguments of the validator
+
+        Returns:
+            ValidationResult: The result of the validation
+        """
+        # the text is hashed by the dictionary, its equality rules out collisions
+        key = (
+            id(validation),
+            validation.count,
+            text,
+            belief.get_history_version(exclude_types=[EventType.result]),
+        )
+        # the validator is stored with its result, so its id is not reused while
+        # the result is cached
+        with self.lock:
+            cached = self.results.get(key)
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if cached is not None:
+            result = cached[1]
+            if not result.is_valid:
+                # replay the failure count kept by the validator
+                validation.count += 1
+            return result
+
+        result = validation.process_output(text=text, belief=belief, **kwargs)
+        with self.lock:
+            self.results[key] = (validation, result)
+        return result
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
@@ -32,7 +32,7 @@ class AgentFeedbackPolicy(ReactPolicy):
     agent_feedback_description: str = AGENT_FEEDBACK_DESCRIPTION
     agent: BaseAgent
 
-    def select_action(self, belief: Belief, **kwargs):
+    def create_feedback_prompt(self, belief: Belief) -> str:
         actions = belief.actions
 
         task = belief.current_task.content
@@ -41,9 +41,12 @@ class AgentFeedbackPolicy(ReactPolicy):
             [f"{i+1}. {action.name}" for i, action in enumerate(actions)]
         )
 
-        agent_feedback_prompt = self.agent_feedback_description.format(
+        return self.agent_feedback_description.format(
             task=task, context=context, options=options
         )
+
+    def select_action(self, belief: Belief, **kwargs):
+        agent_feedback_prompt = self.create_feedback_prompt(belief)
         question = self.llm.predict(agent_feedback_prompt)
         logger.info(f"Question to the user: {question}")
         self.agent.shared_memory.add_event(Event(EventType.task, "Agent", question))
@@ -51,3 +54,13 @@ class AgentFeedbackPolicy(ReactPolicy):
 
         belief.update(Event(EventType.user_input, "Agent", result))
         return super().select_action(belief, **kwargs)
+
+    async def aselect_action(self, belief: Belief, **kwargs):
+        agent_feedback_prompt = self.create_feedback_prompt(belief)
+        question = await self.llm.apredict(agent_feedback_prompt)
+        logger.info(f"Question to the user: {question}")
+        self.agent.shared_memory.add_event(Event(EventType.task, "Agent", question))
+        result = await self.agent.arun()
+
+        belief.update(Event(EventType.user_input, "Agent", result))
+        return await super().aselect_action(belief, **kwargs)
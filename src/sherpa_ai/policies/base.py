@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, List, Optional, Union
 
 from pydantic import BaseModel
 
@@ -27,12 +28,28 @@ class PolicyOutput(BaseModel):
 
 class BasePolicy(ABC, BaseModel):
     """
-    The base class for a policy to select an action from the belief
+    The base class for a policy to select an action from the belief. A policy may
+    select several independent actions at once by returning a list of
+    `PolicyOutput`, the agent executes them concurrently.
     """
 
     @abstractmethod
-    def select_action(self, belief: Belief, **kwargs) -> Optional[PolicyOutput]:
+    def select_action(
+        self, belief: Belief, **kwargs
+    ) -> Optional[Union[PolicyOutput, List[PolicyOutput]]]:
         pass
 
-    def __call__(self, belief: Belief, **kwargs) -> Optional[PolicyOutput]:
+    async def aselect_action(
+        self, belief: Belief, **kwargs
+    ) -> Optional[Union[PolicyOutput, List[PolicyOutput]]]:
+        """
+        Select an action asynchronously. By default `select_action` runs in a worker
+        thread, policies calling an LLM should override this method with its
+        asynchronous API.
+        """
+        return await asyncio.to_thread(self.select_action, belief, **kwargs)
+
+    def __call__(
+        self, belief: Belief, **kwargs
+    ) -> Optional[Union[PolicyOutput, List[PolicyOutput]]]:
         return self.select_action(belief, **kwargs)
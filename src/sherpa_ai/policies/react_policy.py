@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from typing import TYPE_CHECKING, Any, Optional, Tuple
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple, Union
 
 from loguru import logger
 
@@ -36,6 +36,8 @@ Follow the described format strictly.
 
 """  # noqa: E501
 
+MULTI_ACTION_INSTRUCTION = "You can select up to {max_actions} actions at once. Only select several actions if they do not depend on each other's results, they are executed at the same time."  # noqa: E501
+
 
 class ReactPolicy(BasePolicy):
     """
@@ -49,6 +51,11 @@ class ReactPolicy(BasePolicy):
         llm (BaseLanguageModel): The large language model used to generate text
         description (str): Description to select the action from the belief
         response_format (dict): The response format for the policy in JSON format
+        max_actions (int): Maximum number of actions selected at once. If larger than
+            1, the LLM can select several independent actions in one round trip and
+            a list of `PolicyOutput` is returned. (default: 1)
+        multi_action_response_format (dict): The response format in JSON format
+            when several actions can be selected
     """
 
     role_description: str
@@ -63,6 +70,15 @@ class ReactPolicy(BasePolicy):
             "args": {"arg name": "value"},
         },
     }
+    max_actions: int = 1
+    multi_action_response_format: dict = {
+        "commands": [
+            {
+                "name": "tool/command name you choose",
+                "args": {"arg name": "value"},
+            },
+        ],
+    }
 
     def transform_output(self, output_str: str) -> Tuple[str, dict]:
         """
@@ -85,6 +101,34 @@ class ReactPolicy(BasePolicy):
         args = command.get("args", {})
         return name, args
 
+    def transform_outputs(self, output_str: str) -> List[Tuple[str, dict]]:
+        """
+        Transform the output string into a list of actions and arguments, when
+        several actions can be selected
+
+        Args:
+            output_str: Output string
+
+        Returns:
+            List[Tuple[str, dict]]: Actions to be taken and their arguments
+        """
+        try:
+            output = json.loads(output_str)
+        except json.decoder.JSONDecodeError:
+            logger.error("Output is not a proper json format {}", output_str)
+            return [("Finished", None)]
+
+        # the LLM may still answer with a single command
+        commands = output["commands"] if "commands" in output else [output["command"]]
+        if len(commands) > self.max_actions:
+            logger.warning(
+                f"{len(commands)} actions selected, only the first "
+                f"{self.max_actions} are kept"
+            )
+            commands = commands[: self.max_actions]
+
+        return [(command["name"], command.get("args", {})) for command in commands]
+
     def is_selection_trivial(self, actions: list[BaseAction]) -> bool:
         """
         Check if the selection of the action is trivial. The selection is trivial if there
@@ -98,30 +142,32 @@ class ReactPolicy(BasePolicy):
         """
         return len(actions) == 1 and len(actions[0].args) == 0
 
-    def select_action(self, belief: Belief) -> Optional[PolicyOutput]:
+    def create_prompt(self, belief: Belief, actions: list[BaseAction]) -> str:
         """
-        Select an action from a list of possible actions based on the current state (belief)
+        Create the prompt to select an action from the current state (belief)
 
         Args:
             belief (Belief): The current state of the agent
+            actions (list[BaseAction]): The possible actions
 
         Returns:
-            Optional[PolicyOutput]: The selected action and arguments, or None if the selected
-            action is not found in the list of possible actions
+            str: The prompt for the LLM
         """
-        actions = belief.get_actions()
-
-        if self.is_selection_trivial(actions):
-            return PolicyOutput(action=actions[0], args={})
-
         task_description = belief.current_task.content
         task_context = belief.get_context(self.llm.get_num_tokens)
-        possible_actions = "\n".join([str(action) for action in actions])
+        possible_actions = belief.get_action_description(actions)
         history_of_previous_actions = belief.get_internal_history(
             self.llm.get_num_tokens
         )
 
-        response_format = json.dumps(self.response_format, indent=4)
+        output_instruction = self.output_instruction
+        response_format = self.response_format
+        if self.max_actions > 1:
+            output_instruction += "\n\n" + MULTI_ACTION_INSTRUCTION.format(
+                max_actions=self.max_actions
+            )
+            response_format = self.multi_action_response_format
+        response_format = json.dumps(response_format, indent=4)
 
         prompt = self.description.format(
             role_description=self.role_description,
@@ -129,18 +175,87 @@ class ReactPolicy(BasePolicy):
             possible_actions=possible_actions,
             history_of_previous_actions=history_of_previous_actions,
             task_context=task_context,
-            output_instruction=self.output_instruction,
+            output_instruction=output_instruction,
             response_format=response_format,
         )
         logger.debug(f"Prompt: {prompt}")
-        result = self.llm.predict(prompt)
+        return prompt
+
+    def parse_result(
+        self, belief: Belief, result: str
+    ) -> Union[PolicyOutput, List[PolicyOutput]]:
+        """
+        Get the selected action(s) and arguments from the output of the LLM
+
+        Args:
+            belief (Belief): The current state of the agent
+            result (str): The output of the LLM
+
+        Returns:
+            Union[PolicyOutput, List[PolicyOutput]]: The selected action and
+            arguments, a list of them if `max_actions` is larger than 1
+        """
         logger.debug(f"Result: {result}")
 
+        if self.max_actions > 1:
+            return [
+                PolicyOutput(action=self.find_action(belief, name), args=args)
+                for name, args in self.transform_outputs(result)
+            ]
+
         name, args = self.transform_output(result)
 
+        return PolicyOutput(action=self.find_action(belief, name), args=args)
+
+    def find_action(self, belief: Belief, name: str) -> BaseAction:
         action = belief.get_action(name)
 
         if action is None:
             raise ValueError(f"Action {name} not found in the list of possible actions")
 
-        return PolicyOutput(action=action, args=args)
+        return action
+
+    def select_action(
+        self, belief: Belief
+    ) -> Optional[Union[PolicyOutput, List[PolicyOutput]]]:
+        """
+        Select an action from a list of possible actions based on the current state (belief)
+
+        Args:
+            belief (Belief): The current state of the agent
+
+        Returns:
+            Optional[Union[PolicyOutput, List[PolicyOutput]]]: The selected action and
+            arguments, a list of them if `max_actions` is larger than 1
+        """
+        actions = belief.get_actions()
+
+        if self.is_selection_trivial(actions):
+            return PolicyOutput(action=actions[0], args={})
+
+        prompt = self.create_prompt(belief, actions)
+        result = self.llm.predict(prompt)
+        return self.parse_result(belief, result)
+
+    async def aselect_action(
+        self, belief: Belief
+    ) -> Optional[Union[PolicyOutput, List[PolicyOutput]]]:
+        """
+        Asynchronous counterpart of `select_action`, the LLM is called with its
+        asynchronous API
+
+        Args:
+            belief (Belief): The current state of the agent
+
+        Returns:
+            Optional[Union[PolicyOutput, List[PolicyOutput]]]: The selected action and
+            arguments, a list of them if `max_actions` is larger than 1
+        """
+        actions = belief.get_actions()
+
+        if self.is_selection_trivial(actions):
+            return PolicyOutput(action=actions[0], args={})
+
+        prompt = self.create_prompt(belief, actions)
+        result = await self.llm.apredict(prompt)
+        return self.parse_result(belief, result)
@@ -2,16 +2,13 @@ import base64
 import re
 
 import pinecone 
-import requests
 from dotenv import dotenv_values 
 from langchain_openai import OpenAIEmbeddings 
 from loguru import logger 
 
 import sherpa_ai.config as cfg
 from sherpa_ai.connectors.vectorstores import ConversationStore
-
-
-GITHUB_REQUEST_TIMEOUT = 2.5
+from sherpa_ai.http_client import http_client
 
 
 def get_owner_and_repo(url):
@@ -53,9 +50,7 @@ def extract_github_readme(repo_url):
             "X-GitHub-Api-Version": "2022-11-28",
         }
 
-        response = requests.get(
-            github_api_url, headers=headers, timeout=GITHUB_REQUEST_TIMEOUT
-        )
+        response = http_client.get(github_api_url, headers=headers)
 
         files = response.json()
         if type(files) is dict and files["message"].lower() == "bad credentials":
@@ -79,9 +74,7 @@ def extract_github_readme(repo_url):
             "X-GitHub-Api-Version": "2022-11-28",
         }
 
-        response = requests.get(
-            github_api_url, headers=headers, timeout=GITHUB_REQUEST_TIMEOUT
-        )
+        response = http_client.get(github_api_url, headers=headers)
         data = response.json()
         if "content" in data:
             content = base64.b64decode(data["content"]).decode("utf-8")
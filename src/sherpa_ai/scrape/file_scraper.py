@@ -1,8 +1,7 @@
 import os
 
-import requests
-
 import sherpa_ai.config as cfg
+from sherpa_ai.http_client import http_client
 from sherpa_ai.utils import (
     chunk_and_summarize_file,
     count_string_tokens,
@@ -11,7 +10,8 @@ from sherpa_ai.utils import (
 )
 
 
-DOWNLOAD_TIMEOUT = 2.5
+# size of the chunks written to disk while downloading a file
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 
 class QuestionWithFileHandler:
@@ -68,19 +68,25 @@ class QuestionWithFileHandler:
             "Authorization": f"Bearer {self.token}",
             "Accept": file["mimetype"],
         }
-        response = requests.get(
-            file["url_private_download"], headers=headers, timeout=DOWNLOAD_TIMEOUT
-        )
         destination = file["id"] + file["filetype"]
 
-        # Check if the request was successful (HTTP status code 200)
-        if response.status_code == 200:
+        with http_client.stream(
+            "GET", file["url_private_download"], headers=headers
+        ) as response:
+            # Check if the request was successful (HTTP status code 200)
+            if response.status_code != 200:
+                return {
+                    "status": "error",
+                    "message": f"Failed to download the file. HTTP status code: {response.status_code}",
+                }
+
             content_data = ""
             if file["filetype"] == "pdf":
-                # Open the local file and write the content of the downloaded file
+                # Write the downloaded file to a local file chunk by chunk
                 with open(destination, "wb") as temp_file:
-                    temp_file.write(response.content)
-                    content_data = extract_text_from_pdf(destination)
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        temp_file.write(chunk)
+                content_data = extract_text_from_pdf(destination)
                 os.remove(destination)
 
             elif file["filetype"] in ["txt", "md", "text", "markdown", "html", "xml"]:
@@ -92,12 +98,6 @@ class QuestionWithFileHandler:
                 }
             return {"status": "success", "data": content_data}
 
-        else:
-            return {
-                "status": "error",
-                "message": f"Failed to download the file. HTTP status code: {response.status_code}",
-            }
-
     def prompt_reconstruct(self, file_info, data=str):
         """
         Reconstructs the prompt with the file content.
@@ -1,9 +1,8 @@
 import re
 import urllib.parse
-from typing import Any, List, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Set, Tuple, Union
 
-import requests
-from langchain_community.utilities import GoogleSerperAPIWrapper
 from langchain_core.tools import BaseTool
 from langchain_core.vectorstores import VectorStoreRetriever
 from loguru import logger
@@ -11,6 +10,12 @@ from typing_extensions import Literal
 
 import sherpa_ai.config as cfg
 from sherpa_ai.config.task_config import AgentConfig
+from sherpa_ai.database.result_cache import (
+    BaseResultCache,
+    get_search_cache,
+    make_cache_key,
+)
+from sherpa_ai.http_client import http_client
 from sherpa_ai.scrape.extract_github_readme import extract_github_readme
 from sherpa_ai.utils import (
     chunk_and_summarize,
@@ -21,7 +26,12 @@ from sherpa_ai.utils import (
 )
 
 
-HTTP_GET_TIMEOUT = 2.5
+SEARCH_TIMEOUT = 10
+# search options of the Serper requests, the defaults of langchain's
+# GoogleSerperAPIWrapper used before
+SERPER_SEARCH_OPTIONS = {"gl": "us", "hl": "en", "num": 10}
+# maximum number of site-restricted queries run for a search
+MAX_SEARCH_DOMAINS = 5
 
 
 def get_tools(memory, config):
@@ -48,21 +58,16 @@ class SearchArxivTool(BaseTool):
         "Only use this tool when you need information in the scientific paper."
     )
 
+    # cache of the results, the shared search cache if None
+    result_cache: Optional[BaseResultCache] = None
+
     def _run(
         self, query: str, return_resources=False
     ) -> Union[str, Tuple[str, List[dict]]]:
         top_k = 10
 
         logger.debug(f"Search query: {query}")
-        query = urllib.parse.quote_plus(query)
-        url = (
-            "http://export.arxiv.org/api/query?search_query=all:"
-            + query.strip()
-            + "&start=0&max_results="
-            + str(top_k)
-        )
-        data = requests.get(url, timeout=HTTP_GET_TIMEOUT)
-        xml_content = data.text
+        xml_content = self.search(query, top_k)
 
         summary_pattern = r"<summary>(.*?)</summary>"
         summaries = re.findall(summary_pattern, xml_content, re.DOTALL)
@@ -95,6 +100,38 @@ class SearchArxivTool(BaseTool):
         else:
             return result
 
+    def search(self, query: str, top_k: int) -> str:
+        """
+        Get the Arxiv search results in XML, from the cache if possible
+
+        Args:
+            query (str): The search query
+            top_k (int): The number of results
+
+        Returns:
+            str: The search results in XML
+        """
+        cache = self.result_cache or get_search_cache()
+        if cache is not None:
+            key = make_cache_key("arxiv", query, top_k=top_k)
+            xml_content = cache.get(key)
+            if xml_content is not None:
+                logger.debug(f"Arxiv results of {query} found in the cache")
+                return xml_content
+
+        url = (
+            "http://export.arxiv.org/api/query?search_query=all:"
+            + urllib.parse.quote_plus(query).strip()
+            + "&start=0&max_results="
+            + str(top_k)
+        )
+        data = http_client.get(url)
+        xml_content = data.text
+
+        if cache is not None and data.ok:
+            cache.set(key, xml_content)
+        return xml_content
+
     def _arun(self, query: str) -> str:
         raise NotImplementedError("SearchArxivTool does not support async run")
 
@@ -103,6 +140,8 @@ class SearchTool(BaseTool):
     name = "Search"
     config = AgentConfig()
     top_k: int = 10
+    # cache of the results, the shared search cache if None
+    result_cache: Optional[BaseResultCache] = None
     description = (
         "Access the internet to search for the information. Only use this tool when "
         "you cannot find the information using internal search."
@@ -111,31 +150,41 @@ class SearchTool(BaseTool):
     def _run(self, query: str, return_resources=False) -> Union[str, List[dict]]:
         result = ""
         if self.config.search_domains:
-            query_list = [
-                self.formulate_site_search(query, str(i))
-                for i in self.config.search_domains
-            ]
-            if len(query_list) >= 5:
-                query_list = query_list[:5]
+            sites = [str(i) for i in self.config.search_domains]
+            if len(sites) >= MAX_SEARCH_DOMAINS:
+                sites = sites[:MAX_SEARCH_DOMAINS]
                 logger.warning("Only the first 5 URLs are taken into consideration.")
         else:
-            query_list = [query]
+            sites = [None]
         if self.config.invalid_domains:
             invalid_domain_string = ", ".join(self.config.invalid_domains)
             logger.warning(
                 f"The domain {invalid_domain_string} is invalid and is not taken into consideration."  # noqa: E501
             )
 
-        top_k = int(self.top_k / len(query_list))
+        top_k = int(self.top_k / len(sites))
         if return_resources:
             resources = []
 
-        for query in query_list:
-            cur_result = self._run_single_query(query, top_k, return_resources)
+        # the queries are sent concurrently, the results are merged in the order of
+        # the queries and a link found by an earlier query is not repeated
+        if len(sites) == 1:
+            search_results_list = [self.search(query, sites[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(sites)) as executor:
+                search_results_list = list(
+                    executor.map(lambda site: self.search(query, site), sites)
+                )
+
+        seen_links = set()
+        for search_results in search_results_list:
+            cur_result = self.format_search_results(
+                search_results, top_k, return_resources, seen_links
+            )
 
             if return_resources:
                 resources += cur_result
-            else:
+            elif cur_result:
                 result += "\n" + cur_result
 
         if return_resources:
@@ -146,13 +195,91 @@ class SearchTool(BaseTool):
     def formulate_site_search(self, query: str, site: str) -> str:
         return query + " site:" + site
 
+    def search(self, query: str, site: Optional[str] = None) -> dict:
+        """
+        Get the Google Search results of a query, from the cache if possible
+
+        Args:
+            query (str): The search query
+            site (str, optional): The site the search is restricted to
+
+        Returns:
+            dict: The search results
+        """
+        full_query = query if site is None else self.formulate_site_search(query, site)
+
+        cache = self.result_cache or get_search_cache()
+        if cache is None:
+            return self.serper_api_results(full_query)
+
+        key = make_cache_key("serper", query, site=site, top_k=self.top_k)
+        search_results = cache.get(key)
+        if search_results is None:
+            search_results = self.serper_api_results(full_query)
+            cache.set(key, search_results)
+        else:
+            logger.debug(f"Google Search results of {full_query} found in the cache")
+        return search_results
+
+    def serper_api_results(self, query: str) -> dict:
+        """
+        Send a query to the Google Search API of Serper
+
+        Args:
+            query (str): The search query
+
+        Returns:
+            dict: The search results
+        """
+        logger.debug(f"Search query: {query}")
+        headers = {
+            "X-API-KEY": cfg.SERPER_API_KEY or "",
+            "Content-Type": "application/json",
+        }
+        response = http_client.post(
+            f"{cfg.SERPER_API_URL}/search",
+            headers=headers,
+            json={"q": query, **SERPER_SEARCH_OPTIONS},
+            timeout=SEARCH_TIMEOUT,
+            retry_unprocessed=True,
+        )
+        response.raise_for_status()
+        search_results = response.json()
+        logger.debug(f"Google Search Result: {search_results}")
+        return search_results
+
     def _run_single_query(
         self, query: str, top_k: int, return_resources=False
     ) -> Union[str, List[dict]]:
-        logger.debug(f"Search query: {query}")
-        google_serper = GoogleSerperAPIWrapper()
-        search_results = google_serper._google_serper_api_results(query)
-        logger.debug(f"Google Search Result: {search_results}")
+        search_results = self.search(query)
+        return self.format_search_results(search_results, top_k, return_resources)
+
+    def format_search_results(
+        self,
+        search_results: dict,
+        top_k: int,
+        return_resources=False,
+        seen_links: Optional[Set[str]] = None,
+    ) -> Union[str, List[dict]]:
+        """
+        Format the results of a search query
+
+        Args:
+            search_results (dict): The results returned by Serper
+            top_k (int): Maximum number of results used
+            return_resources (bool): Whether to return the resources for citation
+                instead of the text
+            seen_links (Set[str], optional): Links of the results of the previous
+                queries of the search, organic results with these links are
+                skipped, an answer box is always kept. The links of the results are
+                added to it.
+
+        Returns:
+            Union[str, List[dict]]: The text of the results, or the resources if
+            `return_resources` is True
+        """
+        if seen_links is None:
+            seen_links = set()
 
         # case 1: answerBox in the result dictionary
         if search_results.get("answerBox", False):
@@ -165,6 +292,9 @@ class SearchTool(BaseTool):
                 answer = answer_box.get("snippetHighlighted")
             title = search_results["organic"][0]["title"]
             link = search_results["organic"][0]["link"]
+            # the answer is kept even if an earlier query found the same link, it is
+            # extracted from the page for this query
+            seen_links.add(link)
 
             response = "Answer: " + answer
             meta = [{"Document": answer, "Source": link}]
@@ -213,6 +343,9 @@ class SearchTool(BaseTool):
         resources = []
         for i in range(len(search_results["organic"][:top_k])):
             r = search_results["organic"][i]
+            if r["link"] in seen_links:
+                continue
+            seen_links.add(r["link"])
             single_result = r["title"] + r["snippet"]
 
             # If the links are not considered explicitly, add it to the search result
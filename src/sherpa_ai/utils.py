@@ -1,9 +1,10 @@
 import json
 import re
-from typing import List, Optional, Union
+import threading
+from typing import List, Optional, Set, Tuple, Union
 from urllib.parse import urlparse
 
-import requests
+import numpy as np
 import spacy 
 import tiktoken 
 from bs4 import BeautifulSoup 
@@ -19,16 +20,38 @@ from langchain_text_splitters import (
     TokenTextSplitter,
 )
 from loguru import logger 
-from nltk.metrics import edit_distance, jaccard_distance 
+from nltk.metrics import jaccard_distance 
 from pypdf import PdfReader 
+from spacy.language import Language
+from spacy.tokens import Doc
 from word2number import w2n 
 
 import sherpa_ai.config as cfg
 from sherpa_ai.database.user_usage_tracker import UserUsageTracker
+from sherpa_ai.http_client import http_client
 from sherpa_ai.models.sherpa_base_model import SherpaOpenAI
 
 
-HTTP_GET_TIMEOUT = 2.5
+# This model requires running python -m spacy download en_core_web_sm first
+NLP_MODEL = "en_core_web_sm"
+# Entity and number extraction only use the named entities, the other components
+# are not loaded to save time and memory
+NLP_EXCLUDED_COMPONENTS = (
+    "parser",
+    "lemmatizer",
+    "tagger",
+    "attribute_ruler",
+    "senter",
+)
+
+NUMERIC_ENTITY_TYPES = ["DATE", "CARDINAL", "QUANTITY", "MONEY"]
+ENTITY_TYPES = ["NORP", "ORG", "GPE", "LOC"]
+
+_nlp_pipelines = {}
+_nlp_pipelines_lock = threading.Lock()
+
+_encodings = {}
+_encodings_lock = threading.Lock()
 
 
 def load_files(files: List[str]) -> List[Document]:
@@ -92,7 +115,7 @@ def get_link_from_slack_client_conversation(data):
 
 
 def scrape_with_url(url: str):
-    response = requests.get(url, timeout=HTTP_GET_TIMEOUT)
+    response = http_client.get(url)
     soup = BeautifulSoup(response.content, "html.parser")
     data = soup.get_text(strip=True)
     status = response.status_code
@@ -114,6 +137,55 @@ def rewrite_link_references(data: any, question: str):
     return result
 
 
+def get_nlp(
+    model: str = NLP_MODEL, exclude: Tuple[str, ...] = NLP_EXCLUDED_COMPONENTS
+) -> Language:
+    """
+    Get a spaCy pipeline shared by the whole process. The pipeline is loaded on
+    first use and reused afterwards.
+
+    Args:
+        model (str): Name of the spaCy model
+        exclude (Tuple[str, ...]): Components of the model not to be loaded
+
+    Returns:
+        Language: The spaCy pipeline
+    """
+    key = (model, tuple(exclude))
+    nlp = _nlp_pipelines.get(key)
+    if nlp is None:
+        with _nlp_pipelines_lock:
+            # another thread may have loaded the pipeline while waiting for the lock
+            nlp = _nlp_pipelines.get(key)
+            if nlp is None:
+                nlp = spacy.load(model, exclude=list(exclude))
+                _nlp_pipelines[key] = nlp
+
+    return nlp
+
+
+def get_encoding(model_name: str) -> tiktoken.Encoding:
+    """
+    Get the tiktoken encoding of a model, shared by the whole process. The
+    encoding is loaded on first use and reused afterwards.
+
+    Args:
+        model_name (str): The name of the model (e.g., "gpt-3.5-turbo")
+
+    Returns:
+        tiktoken.Encoding: The encoding used by the model
+    """
+    encoding = _encodings.get(model_name)
+    if encoding is None:
+        with _encodings_lock:
+            encoding = _encodings.get(model_name)
+            if encoding is None:
+                encoding = tiktoken.encoding_for_model(model_name)
+                _encodings[model_name] = encoding
+
+    return encoding
+
+
 def count_string_tokens(string: str, model_name: str) -> int:
     """
     Returns the number of tokens in a text string.
@@ -125,10 +197,26 @@ def count_string_tokens(string: str, model_name: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    encoding = tiktoken.encoding_for_model(model_name)
+    encoding = get_encoding(model_name)
     return len(encoding.encode(string))
 
 
+def count_strings_tokens(strings: List[str], model_name: str) -> List[int]:
+    """
+    Returns the number of tokens in each of many text strings. The strings are
+    encoded in a single call, in parallel by tiktoken.
+
+    Args:
+        strings (List[str]): The text strings.
+        model_name (str): The name of the encoding to use. (e.g., "gpt-3.5-turbo")
+
+    Returns:
+        List[int]: The number of tokens in each text string.
+    """
+    encoding = get_encoding(model_name)
+    return [len(tokens) for tokens in encoding.encode_batch(strings)]
+
+
 def chunk_and_summarize(text_data: str, question: str, link: str, llm):
     instruction = (
         "include any information that can be used to answer the "
@@ -288,8 +376,9 @@ def check_url(url):
 
     if urlparse(url).scheme in ["http", "https"]:
         try:
-            _ = requests.get(url, timeout=HTTP_GET_TIMEOUT)
-            return True
+            # the body is not needed, the connection is released without reading it
+            with http_client.stream("GET", url):
+                return True
         except Exception as e:
             logger.info(f"{e} - {url}")
             return False
@@ -331,32 +420,29 @@ def word_to_float(text):
         return {"success": False, "message": e}
 
 
-def extract_numeric_entities(
-    text: Optional[str],
-    entity_types: List[str] = ["DATE", "CARDINAL", "QUANTITY", "MONEY"],
-):
+def normalize_numeric_text(text: str) -> str:
     """
-    Extracts numeric entities from the given text using spaCy and converts textual
-    representations of numbers to floats using the word_to_float function.
+    Normalize a text before extracting its numeric entities
+    """
+    text = text.lower()
+    return re.sub(r"\s+", " ", text)
 
-    Parameters:
-    - text (str): The input text from which numeric entities will be extracted.
-    - entity_types (List[str]): A list of spaCy entity types to consider for extraction.
-                                Default is ["DATE", "CARDINAL", "QUANTITY", "MONEY"].
 
-    Returns:
-    List[str]: A list of numeric values extracted from the text.
+def get_numbers_from_doc(
+    doc: Doc,
+    entity_types: List[str] = NUMERIC_ENTITY_TYPES,
+) -> List[str]:
     """
+    Converts the numeric entities of a processed text to numbers.
 
-    if text is None:
-        return []
-
-    text = text.lower()
-    text = re.sub(r"\s+", " ", text)
+    Args:
+        doc (Doc): The text processed by a spaCy pipeline, normalized by
+            `normalize_numeric_text`
+        entity_types (List[str]): The spaCy entity types to consider
 
-    # This loading requires running python -m spacy download en_core_web_sm first
-    nlp = spacy.load("en_core_web_sm")
-    doc = nlp(text)
+    Returns:
+        List[str]: A list of numeric values extracted from the text.
+    """
     numbers = []
     filtered_entities = [
         ent.text for ent in doc.ents if ent.label_ in entity_types]
@@ -372,6 +458,31 @@ def extract_numeric_entities(
     return numbers
 
 
+def extract_numeric_entities(
+    text: Optional[str],
+    entity_types: List[str] = NUMERIC_ENTITY_TYPES,
+):
+    """
+    Extracts numeric entities from the given text using spaCy and converts textual
+    representations of numbers to floats using the word_to_float function.
+
+    Parameters:
+    - text (str): The input text from which numeric entities will be extracted.
+    - entity_types (List[str]): A list of spaCy entity types to consider for extraction.
+                                Default is ["DATE", "CARDINAL", "QUANTITY", "MONEY"].
+
+    Returns:
+    List[str]: A list of numeric values extracted from the text.
+    """
+
+    if text is None:
+        return []
+
+    nlp = get_nlp()
+    doc = nlp(normalize_numeric_text(text))
+    return get_numbers_from_doc(doc, entity_types)
+
+
 def combined_number_extractor(text: str):
     """
     Extracts unique numeric values from the given text by combining results
@@ -397,6 +508,11 @@ def verify_numbers_against_source(
     candidate_numbers = set(combined_number_extractor(text_to_test))
     source_numbers = set(combined_number_extractor(source_text))
 
+    return verify_numbers(candidate_numbers, source_numbers)
+
+
+def verify_numbers(candidate_numbers: Set[str], source_numbers: Set[str]):
+    """Verifies that all candidate numbers exist in the source numbers. Returns True on success. Returns False and a feedback string on failure."""
     incorrect_candidates = candidate_numbers - source_numbers
 
     if len(incorrect_candidates) > 0:
@@ -425,6 +541,136 @@ def check_if_number_exist(result: str, source: str):
     return {"number_exists": True, "messages": message}
 
 
+def levenshtein_distance(text1: str, text2: str) -> int:
+    """
+    Calculate the Levenshtein distance between two strings, same as NLTK's
+    `edit_distance` with the default costs.
+
+    Uses the bit-parallel algorithm of Myers (in the formulation of Hyyro): one
+    column of the distance table is kept as bit vectors of vertical deltas and
+    updated for each character of `text2` with a few integer operations.
+
+    Args:
+    - text1 (str): First input string.
+    - text2 (str): Second input string.
+
+    Returns:
+    int: Minimum number of insertions, deletions and substitutions turning one
+    string into the other.
+    """
+    if len(text1) == 0:
+        return len(text2)
+    if len(text2) == 0:
+        return len(text1)
+
+    match_masks = {}
+    for i, char in enumerate(text1):
+        match_masks[char] = match_masks.get(char, 0) | (1 << i)
+
+    all_ones = (1 << len(text1)) - 1
+    last_bit = 1 << (len(text1) - 1)
+    positive = all_ones  # vertical deltas of +1
+    negative = 0  # vertical deltas of -1
+    distance = len(text1)
+    for char in text2:
+        matches = match_masks.get(char, 0)
+        vertical = matches | negative
+        horizontal = (((matches & positive) + positive) ^ positive) | matches
+        horizontal_positive = negative | (~(horizontal | positive) & all_ones)
+        horizontal_negative = positive & horizontal
+
+        if horizontal_positive & last_bit:
+            distance += 1
+        elif horizontal_negative & last_bit:
+            distance -= 1
+
+        horizontal_positive = ((horizontal_positive << 1) | 1) & all_ones
+        horizontal_negative = (horizontal_negative << 1) & all_ones
+        positive = horizontal_negative | (
+            ~(vertical | horizontal_positive) & all_ones
+        )
+        negative = horizontal_positive & vertical
+
+    return distance
+
+
+def match_entities(
+    source_entity: List[str],
+    check_entity: List[str],
+    threshold: float,
+    levenshtein_constant: float,
+) -> List[bool]:
+    """
+    Check which source entities are similar enough to any of the check entities,
+    using the combined metric of `string_comparison_with_jaccard_and_levenshtein`.
+
+    The Jaccard similarities of all the pairs are computed at once as a matrix
+    product over the characters of the entities. The Levenshtein distance is never
+    shorter than the difference in length, which bounds the combined metric, so the
+    distance is only computed for pairs whose bound reaches the threshold, in
+    decreasing order of the bound and only until a match is found.
+
+    Args:
+    - source_entity (List[str]): Entities to look for.
+    - check_entity (List[str]): Entities to search in.
+    - threshold (float): Minimum combined metric of a match.
+    - levenshtein_constant (float): Weight of the Levenshtein distance in the
+        combined metric.
+
+    Returns:
+    List[bool]: Whether each source entity matches a check entity.
+    """
+    if len(source_entity) == 0 or len(check_entity) == 0:
+        return [threshold <= 0] * len(source_entity)
+
+    all_chars = set("".join(source_entity + check_entity))
+    chars = {char: i for i, char in enumerate(all_chars)}
+
+    def char_matrix(entities):
+        matrix = np.zeros((len(entities), len(chars)), dtype=np.int64)
+        for row, entity in enumerate(entities):
+            matrix[row, [chars[char] for char in set(entity)]] = 1
+        return matrix
+
+    source_chars = char_matrix(source_entity)
+    check_chars = char_matrix(check_entity)
+    intersections = source_chars @ check_chars.T
+    unions = (
+        source_chars.sum(axis=1)[:, None] + check_chars.sum(axis=1)[None, :]
+    ) - intersections
+    # same operations as NLTK's jaccard_distance, so the values are identical
+    jaccard_sims = 1 - (unions - intersections) / unions
+
+    source_lengths = np.array([len(entity) for entity in source_entity])[:, None]
+    check_lengths = np.array([len(entity) for entity in check_entity])[None, :]
+    long_lengths = np.maximum(source_lengths, check_lengths)
+    min_distances = np.abs(source_lengths - check_lengths)
+    upper_bounds = (levenshtein_constant * (1 - min_distances / long_lengths)) + (
+        (1 - levenshtein_constant) * jaccard_sims
+    )
+
+    matches = []
+    for row, word1 in enumerate(source_entity):
+        matched = False
+        for column in np.argsort(-upper_bounds[row], kind="stable"):
+            if upper_bounds[row, column] < threshold:
+                break
+
+            word2 = check_entity[column]
+            normalized_levenshtein = 1 - (
+                levenshtein_distance(word1, word2) / long_lengths[row, column]
+            )
+            combined_metric = (levenshtein_constant * normalized_levenshtein) + (
+                (1 - levenshtein_constant) * jaccard_sims[row, column]
+            )
+            if combined_metric >= threshold:
+                matched = True
+                break
+        matches.append(matched)
+
+    return matches
+
+
 def string_comparison_with_jaccard_and_levenshtein(word1, word2, levenshtein_constant):
     """
     Calculate a combined similarity metric using Jaccard similarity and normalized Levenshtein distance.
@@ -441,7 +687,7 @@ def string_comparison_with_jaccard_and_levenshtein(word1, word2, levenshtein_con
     word1_set = set(word1)
     word2_set = set(word2)
 
-    lev_distance = edit_distance(word1, word2)
+    lev_distance = levenshtein_distance(word1, word2)
     jaccard_sim = 1 - jaccard_distance(word1_set, word2_set)
     long_len = max(len(word1), len(word2))
     # This will give a value between 0 and 1, where 0 represents identical words and 1 represents completely different words.
@@ -457,6 +703,22 @@ def string_comparison_with_jaccard_and_levenshtein(word1, word2, levenshtein_con
     return combined_metric
 
 
+def get_entities_from_doc(
+    doc: Doc, entity_types: List[str] = ENTITY_TYPES
+) -> List[str]:
+    """
+    Get the entities of specific types from a text processed by spaCy
+
+    Args:
+    - doc (Doc): Text processed by a spaCy pipeline.
+    - entity_types (List[str]): The spaCy entity types to consider.
+
+    Returns:
+    List[str]: List of extracted entities.
+    """
+    return [ent.text for ent in doc.ents if ent.label_ in entity_types]
+
+
 def extract_entities(text):
     """
     Extract entities of specific types
@@ -471,13 +733,9 @@ def extract_entities(text):
     List[str]: List of extracted entities.
     """
 
-    nlp = spacy.load("en_core_web_sm")
+    nlp = get_nlp()
     doc = nlp(text)
-    entity_types = ["NORP", "ORG", "GPE", "LOC"]
-    filtered_entities = [
-        ent.text for ent in doc.ents if ent.label_ in entity_types]
-
-    return filtered_entities
+    return get_entities_from_doc(doc)
 
 
 def json_from_text(text: str):
@@ -575,23 +833,16 @@ def text_similarity_by_metrics(check_entity: List[str], source_entity: List[str]
     # for each entity in the source entity list, check if it is similar to any entity in the check entity list
     # if similarity is below the threshold, add the entity to the error_entity list
     # else return True means all entities are similar
-    for source_entity_val in source_entity_lower:
-        metrics_value = 0
-        for check_entity_val in check_entity_lower:
-            word1 = source_entity_val
-            word2 = check_entity_val
-
-            # Calculate the combined similarity metric using Jaccard similarity and normalized Levenshtein distance
-            combined_similarity = string_comparison_with_jaccard_and_levenshtein(
-                word1=word1, word2=word2, levenshtein_constant=levenshtein_constant
-            )
-
-            if metrics_value < combined_similarity:
-                metrics_value = combined_similarity
-        if metrics_value < threshold:
-            # If the metrics value is below the threshold, add the entity to the error_entity list
-            index_of_entity = source_entity_lower.index(source_entity_val)
-            error_entity.append(source_entity[index_of_entity])
+    matches = match_entities(
+        source_entity_lower, check_entity_lower, threshold, levenshtein_constant
+    )
+    # duplicated entities are reported with the case of their first occurrence
+    first_indexes = {}
+    for index, entity in enumerate(source_entity_lower):
+        first_indexes.setdefault(entity, index)
+    for source_entity_val, matched in zip(source_entity_lower, matches):
+        if not matched:
+            error_entity.append(source_entity[first_indexes[source_entity_val]])
 
     if len(error_entity) > 0:
         # If there are error entities, create a message to address them in the final answer
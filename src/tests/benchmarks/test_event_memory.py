@@ -0,0 +1,52 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from sherpa_ai.events import Event, EventType
+
+
+NUM_EVENTS = 1_000_000
+
+
+class LegacyEvent:
+    """
+    Event layout before slots were introduced, kept for comparison
+    """
+
+    def __init__(self, event_type: EventType, agent: str, content: str) -> None:
+        self.event_type = event_type
+        self.agent = agent
+        self.content = content
+        self._num_tokens = None
+        self._token_counter = None
+
+
+def measure_memory(event_cls) -> int:
+    # contents are shared by both layouts, only the event objects are measured
+    contents = [f"content {i % 1000}" for i in range(1000)]
+
+    gc.collect()
+    tracemalloc.start()
+    events = [
+        # the agent name is built at runtime, as it is when read from the messages
+        event_cls(EventType.result, "".join(["agent", "_1"]), contents[i % 1000])
+        for i in range(NUM_EVENTS)
+    ]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del events
+    return size
+
+
+@pytest.mark.benchmark
+def test_event_memory():
+    legacy_size = measure_memory(LegacyEvent)
+    slotted_size = measure_memory(Event)
+
+    print(
+        f"\n{NUM_EVENTS} events: legacy {legacy_size / 2**20:.1f} MiB, "
+        f"slotted {slotted_size / 2**20:.1f} MiB"
+    )
+    assert slotted_size < legacy_size
@@ -0,0 +1,55 @@
+import time
+from unittest.mock import patch
+
+import pytest
+import spacy
+
+from sherpa_ai.events import EventType
+from sherpa_ai.memory import Belief
+from sherpa_ai.output_parsers.entity_validation import EntityValidation
+from sherpa_ai.output_parsers.number_validation import NumberValidation
+from sherpa_ai.utils import NLP_MODEL
+
+
+NUM_VALIDATIONS = 20
+
+
+def validate(belief: Belief, answer: str):
+    NumberValidation().process_output(answer, belief)
+    EntityValidation().process_output(answer, belief)
+
+
+def measure_latency(belief: Belief, answer: str) -> float:
+    start = time.perf_counter()
+    for _ in range(NUM_VALIDATIONS):
+        validate(belief, answer)
+    return (time.perf_counter() - start) / NUM_VALIDATIONS
+
+
+@pytest.mark.benchmark
+def test_validation_latency():
+    if not spacy.util.is_package(NLP_MODEL):
+        pytest.skip(f"spaCy model {NLP_MODEL} is not installed")
+
+    belief = Belief()
+    belief.update_internal(
+        EventType.action_output,
+        "search",
+        "The United Nations was founded in 1945 and has 193 member states.",
+    )
+    answer = "The UN was founded in 1945 by 51 countries."
+
+    # loading the model on every call, as the extraction functions used to
+    with patch(
+        "sherpa_ai.utils.get_nlp", side_effect=lambda: spacy.load(NLP_MODEL)
+    ):
+        legacy_latency = measure_latency(belief, answer)
+
+    validate(belief, answer)  # load the shared pipeline
+    shared_latency = measure_latency(belief, answer)
+
+    print(
+        f"\nPer validation: loading the model {legacy_latency * 1000:.1f} ms, "
+        f"shared pipeline {shared_latency * 1000:.1f} ms"
+    )
+    assert shared_latency < legacy_latency
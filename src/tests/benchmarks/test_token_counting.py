@@ -0,0 +1,45 @@
+import timeit
+
+import pytest
+import tiktoken
+
+from sherpa_ai.utils import count_string_tokens, count_strings_tokens
+
+
+MODEL_NAME = "gpt-3.5-turbo"
+NUM_STRINGS = 1000
+
+
+def legacy_count_string_tokens(string: str, model_name: str) -> int:
+    encoding = tiktoken.encoding_for_model(model_name)
+    return len(encoding.encode(string))
+
+
+@pytest.mark.benchmark
+def test_token_counting():
+    try:
+        count_string_tokens("warm up", MODEL_NAME)
+    except Exception as e:
+        pytest.skip(f"tiktoken encoding not available: {e}")
+
+    strings = [
+        f"Summary {i} of a scraped page about topic {i % 7}."
+        for i in range(NUM_STRINGS)
+    ]
+
+    legacy = timeit.timeit(
+        lambda: [legacy_count_string_tokens(s, MODEL_NAME) for s in strings], number=5
+    )
+    cached = timeit.timeit(
+        lambda: [count_string_tokens(s, MODEL_NAME) for s in strings], number=5
+    )
+    batch = timeit.timeit(lambda: count_strings_tokens(strings, MODEL_NAME), number=5)
+
+    print(
+        f"\n{NUM_STRINGS} strings: legacy {legacy / 5 * 1000:.2f} ms, "
+        f"cached {cached / 5 * 1000:.2f} ms, batch {batch / 5 * 1000:.2f} ms"
+    )
+    assert count_strings_tokens(strings, MODEL_NAME) == [
+        legacy_count_string_tokens(s, MODEL_NAME) for s in strings
+    ]
+    assert cached < legacy
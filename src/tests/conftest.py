@@ -1,5 +1,10 @@
+import json
 import os
 import socket
+import threading
+import time
+from contextlib import ExitStack
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import mock
 
 import pytest
@@ -12,6 +17,22 @@ def pytest_addoption(parser):
         default=False,
         help="run the test with actual external API calls",
     )
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="run the performance benchmarks",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+
+    skip_benchmark = pytest.mark.skip(reason="need --benchmark option to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
 
 
 @pytest.fixture
@@ -35,7 +56,7 @@ def guard(*args, **kwargs):
 
 
 @pytest.fixture(autouse=True)
-def mock_env(external_api):
+def mock_env(request, external_api):
     # if run with external_api, don't mock the environment
     if external_api:
         yield
@@ -45,10 +66,69 @@ def mock_env(external_api):
     os.environ["SERPER_API_KEY"] = "dummy"
     os.environ["OPENAI_API_KEY"] = "dummy"
 
-    with mock.patch(
-        "langchain_community.utilities.GoogleSerperAPIWrapper._google_serper_api_results"
-    ) as mock_search, mock.patch("sherpa_ai.utils.scrape_with_url") as mock_scrape:
-        mock_search.return_value = GOOGLE_SEARCH_MOCK
+    with ExitStack() as stack:
+        # tests using the stub Serper server send real requests to it
+        if "serper_server" not in request.fixturenames:
+            mock_search = stack.enter_context(
+                mock.patch("sherpa_ai.tools.SearchTool.serper_api_results")
+            )
+            mock_search.return_value = GOOGLE_SEARCH_MOCK
+        mock_scrape = stack.enter_context(mock.patch("sherpa_ai.utils.scrape_with_url"))
         # mock_socket.side_effect = guard
         mock_scrape.return_value = {"data": "", "status": 200}
         yield
+
+
+class StubSerperHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers["Content-Length"])
+        payload = json.loads(self.rfile.read(length))
+        query = payload["q"]
+        with server.lock:
+            server.payloads.append(payload)
+            server.queries.append(query)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        # give the concurrent requests time to overlap
+        time.sleep(server.delay)
+        body = json.dumps(server.responses.get(query, GOOGLE_SEARCH_MOCK)).encode()
+        with server.lock:
+            server.in_flight -= 1
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def serper_server():
+    """
+    Local stub of the Google Search API of Serper. The results of a query are set
+    in `server.responses` (default: GOOGLE_SEARCH_MOCK), the received queries are
+    recorded in `server.queries` and the full request bodies in `server.payloads`.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSerperHandler)
+    server.lock = threading.Lock()
+    server.responses = {}
+    server.queries = []
+    server.payloads = []
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.delay = 0.05
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    with mock.patch(
+        "sherpa_ai.config.SERPER_API_URL", f"http://127.0.0.1:{server.server_port}"
+    ):
+        yield server
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+from typing import Any
+
+from langchain_core.language_models import FakeListLLM
+
+from sherpa_ai.actions.base import BaseAction
+from sherpa_ai.agents import QAAgent
+from sherpa_ai.events import Event, EventType
+from sherpa_ai.memory import Belief, SharedMemory
+
+SELECTION = '{"command": {"name": "Search", "args": {"query": "sherpa"}}}'
+
+
+class CallTracker:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class FakeLLM(FakeListLLM):
+    """
+    Fake LLM counting its synchronous calls and the asynchronous calls in flight
+    """
+
+    tracker: Any = None
+    num_sync_calls: int = 0
+
+    def get_num_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs) -> str:
+        self.num_sync_calls += 1
+        return super()._call(prompt, stop, run_manager, **kwargs)
+
+    async def _acall(self, prompt, stop=None, run_manager=None, **kwargs) -> str:
+        if self.tracker is not None:
+            self.tracker.in_flight += 1
+            self.tracker.max_in_flight = max(
+                self.tracker.max_in_flight, self.tracker.in_flight
+            )
+            await asyncio.sleep(0.01)
+            self.tracker.in_flight -= 1
+        return await super()._acall(prompt, stop, run_manager, **kwargs)
+
+
+class Search(BaseAction):
+    name: str = "Search"
+    args: dict = {"query": "string"}
+    usage: str = "Search the web"
+
+    def execute(self, query: str) -> str:
+        return f"Results of {query}"
+
+
+def create_agent(tracker: CallTracker = None) -> QAAgent:
+    llm = FakeLLM(responses=[SELECTION, "Sherpa is a framework"], tracker=tracker)
+    belief = Belief()
+    belief.set_current_task(Event(EventType.task, "user", "What is sherpa?"))
+    return QAAgent(
+        llm=llm, belief=belief, actions=[Search(belief=belief)], num_runs=1
+    )
+
+
+def test_arun_matches_run():
+    agent = create_agent()
+    async_agent = create_agent()
+
+    result = agent.run()
+    async_result = asyncio.run(async_agent.arun())
+
+    assert async_result == result == "Sherpa is a framework"
+    assert [event.content for event in async_agent.belief.internal_events] == [
+        event.content for event in agent.belief.internal_events
+    ]
+    assert async_agent.belief.get("Search") == "Results of sherpa"
+    # the policy and the synthesis both use the asynchronous API of the LLM
+    assert async_agent.llm.num_sync_calls == 0
+    assert agent.llm.num_sync_calls == 2
+
+
+def test_arun_runs_agents_concurrently():
+    tracker = CallTracker()
+    agents = [create_agent(tracker) for _ in range(5)]
+
+    async def run_all():
+        return await asyncio.gather(*(agent.arun() for agent in agents))
+
+    results = asyncio.run(run_all())
+
+    assert results == ["Sherpa is a framework"] * 5
+    # the LLM calls of all the agents wait on the same event loop at once
+    assert tracker.max_in_flight == 5
+
+
+def test_arun_records_action_error():
+    agent = create_agent()
+    agent.llm.responses = [
+        '{"command": {"name": "Search", "args": {}}}',
+        "Sherpa is a framework",
+    ]
+
+    assert asyncio.run(agent.arun()) == "Sherpa is a framework"
+
+    errors = [
+        event.content
+        for event in agent.belief.internal_events
+        if event.agent == agent.feedback_agent_name
+    ]
+    assert errors == [
+        "Error in executing action: Search. Error: Missing argument from input: query"
+    ]
+
+
+class ThreadRecordingMemory(SharedMemory):
+    def observe(self, belief: Belief):
+        self.observe_thread = threading.get_ident()
+        super().observe(belief)
+
+
+def test_arun_observes_shared_memory_off_event_loop():
+    agent = create_agent()
+    agent.shared_memory = ThreadRecordingMemory(objective="")
+    agent.shared_memory.add(EventType.task, "user", "What is sherpa?")
+
+    async def run():
+        return threading.get_ident(), await agent.arun()
+
+    loop_thread, result = asyncio.run(run())
+
+    assert result == "Sherpa is a framework"
+    # observing may query a vector database, it must not block the event loop
+    assert agent.shared_memory.observe_thread != loop_thread
@@ -0,0 +1,163 @@
+import threading
+from typing import List, Optional
+from unittest import mock
+
+from sherpa_ai.actions.base import BaseAction, BaseRetrievalAction
+from sherpa_ai.agents.base import BaseAgent
+from sherpa_ai.events import Event, EventType
+from sherpa_ai.memory import Belief
+from sherpa_ai.output_parsers.base import BaseOutputProcessor
+from sherpa_ai.output_parsers.citation_validation import CitationValidation
+from sherpa_ai.output_parsers.validation_result import ValidationResult
+from sherpa_ai.verbose_loggers.verbose_loggers import StorageVerboseLogger
+
+
+class FixedOutputAgent(BaseAgent):
+    name: str = "fixed"
+    description: str = "Agent always writing the same answers"
+    outputs: List[str] = []
+
+    def create_actions(self) -> List[BaseAction]:
+        return []
+
+    def synthesize_output(self) -> str:
+        return self.outputs.pop(0) if len(self.outputs) > 1 else self.outputs[0]
+
+
+class CountingValidation(BaseOutputProcessor):
+    def __init__(
+        self,
+        valid_texts: List[str],
+        barrier: Optional[threading.Barrier] = None,
+        suffix: str = "",
+    ):
+        self.valid_texts = valid_texts
+        self.barrier = barrier
+        self.suffix = suffix
+        self.num_calls = 0
+
+    def process_output(self, text: str, belief: Belief, **kwargs) -> ValidationResult:
+        self.num_calls += 1
+        if self.barrier is not None:
+            # only passes when the validations run at the same time
+            self.barrier.wait()
+
+        if text.endswith(self.suffix):
+            text = text[: len(text) - len(self.suffix)]
+        if text in self.valid_texts:
+            # adds the suffix once, as citations are added
+            return ValidationResult(is_valid=True, result=text + self.suffix)
+
+        self.count += 1
+        return ValidationResult(
+            is_valid=False, result=text, feedback="invalid" + self.suffix
+        )
+
+    def get_failure_message(self) -> str:
+        return ""
+
+
+def test_validate_output_reuses_validation_results():
+    validations = [CountingValidation(["good"]), CountingValidation(["good"])]
+    verbose_logger = StorageVerboseLogger()
+    agent = FixedOutputAgent(
+        belief=Belief(),
+        outputs=["bad", "good"],
+        validations=validations,
+        validation_steps=2,
+        verbose_logger=verbose_logger,
+    )
+
+    assert agent.validate_output() == "good"
+
+    # the final pass validates the same text against the same history again
+    assert [validation.num_calls for validation in validations] == [2, 1]
+    assert "2 hits, 3 misses" in verbose_logger.storage[-1]
+    # the candidate output is recorded before every validation, as without cache
+    results = agent.belief.get_by_type(EventType.result)
+    assert [event.content for event in results] == ["bad", "good", "good", "good"]
+
+
+def test_validate_output_without_cache():
+    validations = [CountingValidation(["good"]), CountingValidation(["good"])]
+    agent = FixedOutputAgent(
+        belief=Belief(),
+        outputs=["bad", "good"],
+        validations=validations,
+        validation_steps=2,
+        cache_validations=False,
+    )
+
+    assert agent.validate_output() == "good"
+    assert [validation.num_calls for validation in validations] == [3, 2]
+    results = agent.belief.get_by_type(EventType.result)
+    assert [event.content for event in results] == ["bad", "good", "good", "good"]
+
+
+def test_validate_output_runs_validations_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    validations = [
+        CountingValidation(["good", "good [1](www.wiki.com)"], barrier),
+        CountingValidation(["good"], barrier, suffix=" [1](www.wiki.com)"),
+    ]
+    agent = FixedOutputAgent(
+        belief=Belief(),
+        outputs=["bad", "good"],
+        validations=validations,
+        validation_steps=2,
+        concurrent_validations=True,
+    )
+
+    assert agent.validate_output() == "good [1](www.wiki.com)"
+
+    # both failures are fed back in a single regeneration round
+    feedback = agent.belief.get_by_type(EventType.feedback)
+    assert [event.content for event in feedback] == [
+        "invalid",
+        "invalid [1](www.wiki.com)",
+    ]
+    assert [validation.count for validation in validations] == [1, 1]
+
+
+class Retrieval(BaseRetrievalAction):
+    name: str = "Retrieval"
+    args: dict = {"query": "string"}
+    usage: str = "Retrieve documents"
+
+    def search(self, query: str) -> list[dict]:
+        return []
+
+
+@mock.patch(
+    "sherpa_ai.output_parsers.citation_validation.sent_tokenize",
+    lambda text: [sentence.rstrip(".") + "." for sentence in text.split(". ")],
+)
+@mock.patch(
+    "sherpa_ai.output_parsers.citation_validation.word_tokenize", str.split
+)
+def test_concurrent_validations_with_parallel_citations():
+    belief = Belief()
+    belief.set_current_task(Event(EventType.task, "user", "What is Delaware?"))
+    retrieval = Retrieval(belief=belief)
+    retrieval.add_resources(
+        [{"Source": "www.wiki.com", "Document": "Delaware is a small state"}]
+    )
+    belief.set_actions([retrieval])
+    # the citation validation starts its processes from a worker thread
+    citation_validation = CitationValidation(
+        parallel=True, num_processes=2, min_parallel_sentences=1
+    )
+    agent = FixedOutputAgent(
+        belief=belief,
+        outputs=["Delaware is a small state."],
+        validations=[citation_validation, CountingValidation(["Delaware"])],
+        concurrent_validations=True,
+    )
+
+    try:
+        result = agent.validate_output()
+        assert citation_validation.executor is not None
+    finally:
+        citation_validation.close()
+
+    assert result.startswith("Delaware is a small state [1](www.wiki.com)")
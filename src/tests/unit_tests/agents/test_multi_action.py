@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+from typing import Optional
+
+from langchain_core.language_models import FakeListLLM
+
+from sherpa_ai.actions.base import BaseAction, BaseRetrievalAction
+from sherpa_ai.agents import QAAgent
+from sherpa_ai.events import Event, EventType
+from sherpa_ai.memory import Belief
+from sherpa_ai.policies import ReactPolicy
+from sherpa_ai.policies.base import PolicyOutput
+
+
+class FakeLLM(FakeListLLM):
+    def get_num_tokens(self, text: str) -> int:
+        return len(text.split())
+
+
+class FakeRetrieval(BaseRetrievalAction):
+    args: dict = {"query": "string"}
+    usage: str = "Retrieve documents"
+    barrier: Optional[threading.Barrier] = None
+    num_calls: int = 0
+
+    def search(self, query: str) -> list[dict]:
+        self.num_calls += 1
+        if self.barrier is not None and self.num_calls == 1:
+            # only passes when the first calls of the actions run at the same time
+            self.barrier.wait()
+        resources = [
+            {"Source": f"{self.name}/{query}", "Document": f"{self.name} on {query}"},
+            {"Source": "shared", "Document": "shared document"},
+        ]
+        self.add_resources(resources)
+        return resources
+
+
+class Note(BaseAction):
+    name: str = "Note"
+    args: dict = {"text": "string"}
+    usage: str = "Take a note"
+
+    def execute(self, text: str) -> str:
+        return text
+
+
+def commands(*commands) -> str:
+    return json.dumps(
+        {"commands": [{"name": name, "args": args} for name, args in commands]}
+    )
+
+
+def create_agent(selection: str, barrier: threading.Barrier = None) -> QAAgent:
+    llm = FakeLLM(responses=[selection, "answer"])
+    belief = Belief()
+    belief.set_current_task(Event(EventType.task, "user", "What is sherpa?"))
+    actions = [
+        FakeRetrieval(name="Google Search", belief=belief, barrier=barrier),
+        FakeRetrieval(name="Arxiv Search", belief=belief, barrier=barrier),
+        Note(belief=belief),
+    ]
+    policy = ReactPolicy(
+        role_description="", output_instruction="", llm=llm, max_actions=3
+    )
+    return QAAgent(
+        llm=llm, belief=belief, actions=actions, policy=policy, num_runs=1
+    )
+
+
+def test_react_policy_selects_multiple_actions():
+    agent = create_agent(
+        commands(("Google Search", {"query": "a"}), ("Arxiv Search", {"query": "b"}))
+    )
+    agent.belief.set_actions(agent.actions)
+
+    prompt = agent.policy.create_prompt(agent.belief, agent.actions)
+    result = agent.policy.select_action(agent.belief)
+
+    assert "up to 3 actions" in prompt
+    assert [(output.action.name, output.args) for output in result] == [
+        ("Google Search", {"query": "a"}),
+        ("Arxiv Search", {"query": "b"}),
+    ]
+
+
+def test_react_policy_keeps_at_most_max_actions():
+    policy = ReactPolicy(role_description="", output_instruction="", max_actions=2)
+
+    output = commands(("A", {}), ("B", {}), ("C", {}))
+
+    assert policy.transform_outputs(output) == [("A", {}), ("B", {})]
+    # a single command is accepted as well
+    assert policy.transform_outputs('{"command": {"name": "A"}}') == [("A", {})]
+
+
+def test_batch_policy_outputs():
+    agent = create_agent("")
+    google, arxiv, note = agent.actions
+    outputs = [
+        PolicyOutput(action=google, args={}),
+        PolicyOutput(action=arxiv, args={}),
+        PolicyOutput(action=note, args={}),
+        PolicyOutput(action=google, args={}),
+    ]
+
+    batches = agent.batch_policy_outputs(outputs)
+
+    assert batches == [outputs[:2], outputs[2:3], outputs[3:]]
+    assert agent.batch_policy_outputs(outputs[0]) == [outputs[:1]]
+
+
+def run_retrievals(use_async: bool) -> QAAgent:
+    selection = commands(
+        ("Google Search", {"query": "a"}),
+        ("Arxiv Search", {"query": "b"}),
+        ("Google Search", {"query": "c"}),
+    )
+    agent = create_agent(selection, barrier=threading.Barrier(2, timeout=5))
+
+    result = asyncio.run(agent.arun()) if use_async else agent.run()
+
+    assert result == "answer"
+    return agent
+
+
+def test_run_executes_retrievals_concurrently():
+    for use_async in [False, True]:
+        agent = run_retrievals(use_async)
+        google, arxiv, _ = agent.actions
+
+        # the belief is updated in the order the actions were selected
+        events = [
+            event.content
+            for event in agent.belief.internal_events
+            if event.event_type == EventType.action_output
+        ]
+        assert [event.split(",")[0] for event in events] == [
+            "Action: Google Search finishes",
+            "Action: Arxiv Search finishes",
+            "Action: Google Search finishes",
+        ]
+        # the resources of both calls of Google Search are kept, without duplicates
+        assert [resource.source for resource in google.resources] == [
+            "Google Search/a",
+            "shared",
+            "Google Search/c",
+        ]
+        assert [resource.source for resource in arxiv.resources] == [
+            "Arxiv Search/b",
+            "shared",
+        ]
+
+
+def test_run_records_errors_of_concurrent_actions():
+    selection = commands(
+        ("Google Search", {"query": "a"}),
+        ("Arxiv Search", {}),
+        ("Note", {"text": "note"}),
+    )
+    agent = create_agent(selection)
+
+    assert agent.run() == "answer"
+
+    events = [
+        (event.event_type, event.content.split(",")[0])
+        for event in agent.belief.internal_events
+        if event.event_type != EventType.action
+    ]
+    assert events == [
+        (
+            EventType.action_output,
+            "Error in executing action: Arxiv Search. Error: Missing argument from "
+            "input: query",
+        ),
+        (EventType.action_output, "Action: Google Search finishes"),
+        (EventType.action_output, "Action: Note finishes"),
+    ]
+    assert agent.belief.get("Note") == "note"
@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+import pytest
+
+from sherpa_ai.database.result_cache import (
+    MemoryResultCache,
+    SQLResultCache,
+    TieredResultCache,
+    make_cache_key,
+)
+
+
+@pytest.fixture
+def clock():
+    with patch("sherpa_ai.database.result_cache.time") as mock_time:
+        mock_time.time.return_value = 1000.0
+        yield mock_time.time
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'cache.db'}"
+
+
+def test_make_cache_key_normalizes_query():
+    key = make_cache_key("serper", "What is  Sherpa?", site="https://Sherpa.ai/")
+
+    assert key == make_cache_key("serper", " what is sherpa? ", site="https://sherpa.ai")
+    assert key != make_cache_key("serper", "What is Sherpa?")
+    assert key != make_cache_key("serper", "What is Sherpa?", "sherpa.ai", top_k=5)
+    assert key != make_cache_key("arxiv", "What is Sherpa?", site="https://sherpa.ai")
+
+
+@pytest.mark.parametrize("cache_type", ["memory", "sql"])
+def test_cache_expires_results(cache_type, clock, db_url):
+    if cache_type == "memory":
+        cache = MemoryResultCache(ttl=60)
+    else:
+        cache = SQLResultCache(db_url, ttl=60)
+
+    assert cache.get("query") is None
+    cache.set("query", {"organic": []})
+    clock.return_value += 59
+    assert cache.get("query") == {"organic": []}
+    clock.return_value += 1
+    assert cache.get("query") is None
+
+    assert cache.get_metrics() == {
+        "hits": 1,
+        "misses": 2,
+        "evictions": 0,
+        "hit_rate": 1 / 3,
+    }
+
+
+@pytest.mark.parametrize("cache_type", ["memory", "sql"])
+def test_cache_evicts_least_recently_used(cache_type, clock, db_url):
+    if cache_type == "memory":
+        cache = MemoryResultCache(ttl=60, max_entries=2)
+    else:
+        cache = SQLResultCache(db_url, ttl=60, max_entries=2)
+
+    for key in ["a", "b"]:
+        clock.return_value += 1
+        cache.set(key, key)
+    clock.return_value += 1
+    cache.get("a")  # "b" is the least recently used now
+    clock.return_value += 1
+    cache.set("c", "c")
+
+    assert [cache.get(key) for key in ["a", "b", "c"]] == ["a", None, "c"]
+    assert cache.evictions == 1
+
+
+def test_sql_cache_persists_results(db_url):
+    SQLResultCache(db_url, ttl=60).set("query", ["result"])
+
+    assert SQLResultCache(db_url, ttl=60).get("query") == ["result"]
+
+
+def test_tiered_cache_promotes_results(db_url):
+    memory = MemoryResultCache(ttl=60)
+    cache = TieredResultCache([memory, SQLResultCache(db_url, ttl=60)])
+    cache.set("query", "result")
+
+    # a new process only has the results on disk
+    memory.clear()
+    assert cache.get("query") == "result"
+    assert memory.load("query") == "result"
+    assert cache.get("query") == "result"
+    assert cache.get("missing") is None
+
+    metrics = cache.get_metrics()
+    # each lookup is counted once, by the tiered cache
+    assert (metrics["hits"], metrics["misses"]) == (2, 1)
+    assert [tier["hits"] for tier in metrics["tiers"]] == [1, 1]
+    assert [(tier.hits, tier.misses) for tier in cache.tiers] == [(0, 0), (0, 0)]
+
+
+def test_tiered_cache_keeps_expiry_of_promoted_results(clock, db_url):
+    memory = MemoryResultCache(ttl=60)
+    cache = TieredResultCache([memory, SQLResultCache(db_url, ttl=60)])
+    cache.set("query", "result")
+    memory.clear()
+
+    clock.return_value += 50
+    assert cache.get("query") == "result"
+    assert memory.load_entry("query") == ("result", 1060.0)
+    # the promoted result expires with the one on disk, not 60s after promotion
+    clock.return_value += 10
+    assert cache.get("query") is None
+
+
+def test_cache_logs_metrics():
+    cache = TieredResultCache([MemoryResultCache(ttl=60), MemoryResultCache(ttl=60)])
+    cache.set("query", "result")
+
+    with patch("sherpa_ai.database.result_cache.logger") as mock_logger:
+        cache.get("query")
+        cache.get("missing")
+
+    mock_logger.debug.assert_called_with(
+        "Result cache: 1 hits, 1 misses (50% hit rate), 0 evictions, "
+        "hits by tier: 1, 0"
+    )
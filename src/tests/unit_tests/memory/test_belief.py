@@ -0,0 +1,128 @@
+from unittest.mock import MagicMock
+
+from sherpa_ai.events import Event, EventType
+from sherpa_ai.memory.belief import Belief
+
+
+def word_counter(text: str) -> int:
+    return len(text.split())
+
+
+def test_get_context_keeps_newest_events_within_budget():
+    belief = Belief()
+    belief.max_tokens = 5
+
+    for i in range(5):
+        belief.update(Event(EventType.task, "agent", f"task {i}"))
+        belief.update(Event(EventType.action, "agent", f"action {i}"))
+
+    context = belief.get_context(word_counter)
+
+    # the event exceeding the budget is the last one included
+    assert context == "task 2\ntask 3\ntask 4\n"
+
+
+def test_get_context_without_truncation():
+    belief = Belief()
+
+    belief.update(Event(EventType.task, "agent", "task"))
+    belief.update(Event(EventType.result, "agent", "result"))
+    belief.update(Event(EventType.user_input, "agent", "input"))
+
+    assert belief.get_context(word_counter) == "task\nresult\ninput\n"
+
+
+def test_get_context_counts_each_event_once():
+    belief = Belief()
+    token_counter = MagicMock(side_effect=word_counter)
+
+    for i in range(10):
+        belief.update(Event(EventType.result, "agent", f"result {i}"))
+
+    belief.get_context(token_counter)
+    belief.get_context(token_counter)
+    assert token_counter.call_count == 10
+
+    belief.update(Event(EventType.result, "agent", "result 10"))
+    context = belief.get_context(token_counter)
+    assert token_counter.call_count == 11
+    assert context.endswith("result 10\n")
+
+
+def test_histories_reuse_memoized_token_counts():
+    belief = Belief()
+    token_counter = MagicMock(side_effect=word_counter)
+
+    for i in range(10):
+        belief.update_internal(EventType.action_output, "agent", f"output {i}")
+
+    belief.get_internal_history(token_counter)
+    belief.get_histories_excluding_types([EventType.feedback], token_counter)
+    belief.get_internal_history(token_counter)
+
+    assert token_counter.call_count == 10
+    assert belief.num_token_counts_saved == 20
+
+
+def test_token_counts_are_recomputed_for_another_counter():
+    event = Event(EventType.result, "agent", "three word content")
+
+    assert event.get_num_tokens(word_counter) == 3
+    assert event.has_num_tokens(word_counter)
+    assert not event.has_num_tokens(len)
+    assert event.get_num_tokens(len) == len("three word content")
+
+
+def test_update_ignores_observed_events():
+    belief = Belief()
+    event = Event(EventType.task, "agent", "task")
+
+    belief.update(event)
+    belief.update(event)
+    belief.update(Event(EventType.task, "agent", "task"))
+
+    assert len(belief.events) == 2
+    assert belief.get_context(word_counter) == "task\ntask\n"
+
+
+def test_get_by_type():
+    belief = Belief()
+
+    belief.update_internal(EventType.action, "agent", "action 1")
+    belief.update_internal(EventType.feedback, "agent", "feedback")
+    belief.update_internal(EventType.action, "agent", "action 2")
+
+    actions = belief.get_by_type(EventType.action)
+    assert [event.content for event in actions] == ["action 1", "action 2"]
+    assert belief.get_by_type(EventType.result) == []
+
+    # the returned list is a copy of the index
+    actions.clear()
+    assert len(belief.get_by_type(EventType.action)) == 2
+
+
+def test_action_description_is_cached():
+    belief = Belief()
+    action = MagicMock()
+    action.name = "action"
+    action.__str__.return_value = "description"
+    update_belief = MagicMock()
+    update_belief.name = "update_belief"
+    update_belief.__str__.return_value = "update description"
+
+    belief.actions = [action, update_belief]
+
+    assert belief.action_description == "description\nupdate description"
+    belief.get_action_description()
+    assert action.__str__.call_count == 1
+
+    # updating an existing key does not change the description
+    belief.set("key", "value")
+    belief.get_action_description()
+    belief.set("key", "new value")
+    belief.get_action_description()
+    assert action.__str__.call_count == 2
+
+    belief.actions = [action]
+    assert belief.get_action_description() == "description"
+    assert action.__str__.call_count == 3
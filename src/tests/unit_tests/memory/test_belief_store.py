@@ -0,0 +1,114 @@
+import pytest
+
+from sherpa_ai.memory.belief import Belief
+from sherpa_ai.memory.belief_store import BeliefStore
+
+
+def test_set_and_get_nested_keys():
+    store = BeliefStore()
+
+    store.set("a.b", "1")
+    store.set("a.d.e", "3")
+    store.set("q", [1, 2])
+
+    assert store.get("a.b") == "1"
+    assert store.get("a") == {"b": "1", "d": {"e": "3"}}
+    assert store.get("q.1") == 2
+    assert store.get("missing", "default") == "default"
+    assert store.has("a.d.e")
+    assert not store.has("a.x")
+    assert store.get_all_keys() == ["a", "a.b", "a.d", "a.d.e", "q"]
+
+    store.set("a.d", {"f": "4"})
+
+    assert not store.has("a.d.e")
+    assert store.get("a.d.f") == "4"
+    assert store.get_all_keys() == ["a", "a.b", "a.d", "a.d.f", "q"]
+
+
+def test_set_copies_dictionary_values():
+    value = {"b": 1}
+    store = BeliefStore({"a": value})
+
+    store.set("a.c", 2)
+
+    assert value == {"b": 1}
+    assert store.to_dict() == {"a": {"b": 1, "c": 2}}
+
+
+def test_snapshot_is_copy_on_write():
+    store = BeliefStore()
+    store.set("a.b", 1)
+    store.set("c.d", 2)
+    store.set("g.h", 5)
+
+    snapshot = store.snapshot()
+    snapshot.set("a.b", 10)
+    snapshot.set("e", 3)
+    store.set("c.d", 20)
+
+    assert store.to_dict() == {"a": {"b": 1}, "c": {"d": 20}, "g": {"h": 5}}
+    assert snapshot.to_dict() == {
+        "a": {"b": 10},
+        "c": {"d": 2},
+        "g": {"h": 5},
+        "e": 3,
+    }
+    assert store.get_all_keys() == ["a", "a.b", "c", "c.d", "g", "g.h"]
+    assert snapshot.get("c.d") == 2
+
+    # only the nodes on the written paths are copied
+    assert snapshot.root["c"] is not store.root["c"]
+    assert snapshot.root["g"] is store.root["g"]
+
+
+def test_get_returns_copy_of_nested_dictionary():
+    store = BeliefStore({"a": {"b": 1}})
+    snapshot = store.snapshot()
+
+    store.get("a")["z"] = 9
+    snapshot.get("a")["y"] = 8
+
+    assert store.to_dict() == {"a": {"b": 1}}
+    assert snapshot.to_dict() == {"a": {"b": 1}}
+
+
+def test_set_list_index():
+    value = [1, {"x": 2}]
+    store = BeliefStore({"a": value})
+    snapshot = store.snapshot()
+
+    store.set("a.0", 5)
+    store.set("a.1.x", 3)
+
+    assert store.to_dict() == {"a": [5, {"x": 3}]}
+    assert store.get("a.1.x") == 3
+    # the list is copied before it is written to
+    assert value == [1, {"x": 2}]
+    assert snapshot.to_dict() == {"a": [1, {"x": 2}]}
+
+
+def test_belief_dict_compatibility():
+    belief = Belief()
+    belief.set("a.b", "1")
+
+    restored = Belief.from_dict(belief.__dict__)
+
+    assert restored.get("a.b") == "1"
+    assert restored.get_dict() == {"a": {"b": "1"}}
+
+    snapshot = belief.get_dict_snapshot()
+    snapshot.set("a.b", "2")
+    assert belief.get("a.b") == "1"
+
+
+def test_belief_dict_is_read_only():
+    belief = Belief()
+    belief.set("a.b", "1")
+
+    with pytest.raises(TypeError):
+        belief.dict["c"] = "2"
+    with pytest.raises(TypeError):
+        belief.dict["a"]["b"] = "2"
+
+    assert belief.dict == {"a": {"b": "1"}}
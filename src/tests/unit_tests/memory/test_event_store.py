@@ -0,0 +1,142 @@
+import os
+
+import pytest
+
+from sherpa_ai.events import Event, EventType
+from sherpa_ai.memory import Belief, SharedMemory
+from sherpa_ai.memory.event_store import FileEventStore
+
+
+def add_events(store, num_events):
+    for i in range(num_events):
+        store.append(Event(EventType.result, "agent", f"result {i}"))
+
+
+def test_file_event_store_append_and_read(tmp_path):
+    with FileEventStore(str(tmp_path)) as store:
+        add_events(store, 5)
+
+        assert len(store) == 5
+        assert store[0].content == "result 0"
+        assert store[-1].content == "result 4"
+        assert [event.content for event in store[3:]] == ["result 3", "result 4"]
+        assert store[2].event_type == EventType.result
+
+
+def test_file_event_store_reopen_with_segments(tmp_path):
+    with FileEventStore(str(tmp_path), segment_size=200) as store:
+        add_events(store, 20)
+        event_ids = [event.event_id for event in store]
+
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".idx")]) > 1
+
+    with FileEventStore(str(tmp_path), segment_size=200) as store:
+        assert len(store) == 20
+        assert [event.event_id for event in store] == event_ids
+        assert [event.content for event in store] == [
+            f"result {i}" for i in range(20)
+        ]
+
+        store.append(Event(EventType.task, "agent", "task"))
+        assert store[20].content == "task"
+
+
+def test_file_event_store_recovers_from_partial_record(tmp_path):
+    with FileEventStore(str(tmp_path)) as store:
+        add_events(store, 3)
+
+    path = os.path.join(tmp_path, "00000000.log")
+    with open(path, "ab") as f:
+        # a record interrupted by a crash
+        f.write(b"\x00\x00\x01\x00partial")
+
+    with FileEventStore(str(tmp_path)) as store:
+        assert len(store) == 3
+        store.append(Event(EventType.task, "agent", "task"))
+
+    with FileEventStore(str(tmp_path)) as store:
+        assert [event.content for event in store][-2:] == ["result 2", "task"]
+
+
+def test_shared_memory_replays_file_event_store(tmp_path):
+    shared_memory = SharedMemory(
+        objective="objective", event_store=FileEventStore(str(tmp_path))
+    )
+    shared_memory.add(EventType.task, "planner", "task")
+    shared_memory.add(EventType.result, "agent", "result")
+    shared_memory.events.close()
+
+    replayed = SharedMemory(
+        objective="objective", event_store=FileEventStore(str(tmp_path))
+    )
+    belief = Belief()
+    replayed.observe(belief)
+
+    assert belief.current_task.content == "task"
+    assert [event.content for event in belief.events] == ["task", "result"]
+
+    # the dict export keeps working for file backed memories
+    restored = SharedMemory.from_dict(replayed.__dict__, None)
+    assert [event.content for event in restored.events] == ["task", "result"]
+    replayed.events.close()
+
+
+def test_file_event_store_reads_buffered_events(tmp_path):
+    with FileEventStore(str(tmp_path), buffer_size=400) as store:
+        add_events(store, 3)
+        # the records are still in the write buffer
+        assert os.path.getsize(os.path.join(tmp_path, "00000000.log")) == 0
+        assert [event.content for event in store] == [
+            "result 0",
+            "result 1",
+            "result 2",
+        ]
+
+        add_events(store, 4)
+        # some records are written to the segment, the latest are buffered
+        assert 0 < os.path.getsize(os.path.join(tmp_path, "00000000.log"))
+        assert len(store.write_buffer) > 0
+        assert [event.content for event in store][2:5] == [
+            "result 2",
+            "result 0",
+            "result 1",
+        ]
+        assert store[-1].content == "result 3"
+
+    with FileEventStore(str(tmp_path)) as store:
+        assert len(store) == 7
+
+
+def test_shared_memory_from_dict_skips_stored_events(tmp_path):
+    shared_memory = SharedMemory(
+        objective="objective", event_store=FileEventStore(str(tmp_path))
+    )
+    shared_memory.add(EventType.task, "planner", "task")
+    shared_memory.add(EventType.result, "agent", "result")
+    data = shared_memory.__dict__
+    shared_memory.events.close()
+
+    for _ in range(2):
+        restored = SharedMemory.from_dict(
+            data, None, event_store=FileEventStore(str(tmp_path))
+        )
+        restored.events.close()
+
+    with FileEventStore(str(tmp_path)) as store:
+        assert [event.content for event in store] == ["task", "result"]
+
+    # events missing from the store are appended
+    with FileEventStore(str(tmp_path)) as store:
+        data["events"].append(Event(EventType.result, "agent", "new").__dict__)
+        restored = SharedMemory.from_dict(data, None, event_store=store)
+        assert [event.content for event in store] == ["task", "result", "new"]
+
+
+def test_shared_memory_from_dict_rejects_other_session(tmp_path):
+    with FileEventStore(str(tmp_path)) as store:
+        add_events(store, 1)
+        other = SharedMemory(objective="objective")
+        other.add(EventType.task, "planner", "task")
+
+        with pytest.raises(ValueError):
+            SharedMemory.from_dict(other.__dict__, None, event_store=store)
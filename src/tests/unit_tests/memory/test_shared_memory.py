@@ -0,0 +1,61 @@
+from sherpa_ai.actions.planning import Step
+from sherpa_ai.events import Event, EventType
+from sherpa_ai.memory import Belief, SharedMemory
+
+
+def test_observe_applies_new_events_only():
+    shared_memory = SharedMemory(objective="")
+    belief = Belief()
+
+    shared_memory.add(EventType.task, "planner", "task 1")
+    shared_memory.add(EventType.planning, "planner", "plan")
+    shared_memory.observe(belief)
+
+    assert [event.content for event in belief.events] == ["task 1"]
+    assert belief.current_task.content == "task 1"
+    assert belief.observed_positions[shared_memory] == 2
+
+    shared_memory.add(EventType.result, "agent", "result 1")
+    shared_memory.add(EventType.task, "planner", "task 2")
+    shared_memory.observe(belief)
+
+    assert [event.content for event in belief.events] == [
+        "task 1",
+        "result 1",
+        "task 2",
+    ]
+    assert belief.current_task.content == "task 2"
+    assert belief.observed_positions[shared_memory] == 4
+
+
+def test_observe_tracks_each_shared_memory():
+    belief = Belief()
+    memory_1 = SharedMemory(objective="")
+    memory_2 = SharedMemory(objective="")
+
+    memory_1.add(EventType.task, "planner", "task 1")
+    memory_1.observe(belief)
+    memory_2.add(EventType.task, "planner", "task 2")
+    memory_2.observe(belief)
+
+    assert [event.content for event in belief.events] == ["task 1", "task 2"]
+
+
+def test_from_dict_restores_latest_task():
+    shared_memory = SharedMemory(objective="")
+    shared_memory.add_event(Event(EventType.task, "planner", "task 1"))
+    shared_memory.add_event(Event(EventType.task, "planner", "task 2"))
+
+    restored = SharedMemory.from_dict(shared_memory.__dict__, None)
+
+    assert restored.latest_task.content == "task 2"
+
+
+def test_from_dict_restores_current_step():
+    shared_memory = SharedMemory(objective="")
+    shared_memory.current_step = Step("agent", "task 1")
+
+    restored = SharedMemory.from_dict(shared_memory.__dict__, None)
+
+    assert isinstance(restored.current_step, Step)
+    assert str(restored.current_step) == "Agent: agent\nTask: task 1\n"
@@ -75,3 +75,29 @@ def test_beliefs(state_machine):
     actions = belief.get_actions()
 
     assert len(actions) == 0
+
+
+def test_actions_are_created_once_per_state(state_machine):
+    actions = state_machine.get_actions()
+
+    assert all(a is b for a, b in zip(state_machine.get_actions(), actions))
+    assert state_machine.get_action("A_to_B_2") is actions[1]
+    assert state_machine.get_action("B_to_C") is None
+
+    state_machine.update_transition("A_to_C", "A", "C")
+
+    actions = state_machine.get_actions()
+    assert [action.name for action in actions] == ["A_to_B_1", "A_to_B_2", "A_to_C"]
+
+
+def test_conditions_are_checked_on_every_call():
+    allowed = [True]
+
+    sm = SherpaStateMachine(states=["A", "B"], initial="A")
+    sm.update_transition("A_to_B", "A", "B", conditions=lambda: allowed[0])
+
+    assert len(sm.get_actions()) == 1
+
+    allowed[0] = False
+    assert len(sm.get_actions()) == 0
+    assert sm.get_action("A_to_B") is None
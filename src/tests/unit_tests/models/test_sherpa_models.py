@@ -0,0 +1,44 @@
+import asyncio
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from sherpa_ai.models import SherpaChatOpenAI, SherpaOpenAI
+
+
+def get_chat_result(*args, **kwargs) -> ChatResult:
+    return ChatResult(
+        generations=[ChatGeneration(message=AIMessage(content="Hello"))],
+        llm_output={"token_usage": {"total_tokens": 3}},
+    )
+
+
+async def aget_chat_result(*args, **kwargs) -> ChatResult:
+    return get_chat_result()
+
+
+def test_chat_model_agenerate_tracks_usage():
+    llm = SherpaChatOpenAI(api_key="test", user_id="user")
+    messages = [HumanMessage(content="Hi")]
+
+    with patch.object(ChatOpenAI, "_agenerate", aget_chat_result), patch.object(
+        SherpaChatOpenAI, "track_usage"
+    ) as track_usage:
+        result = asyncio.run(llm._agenerate(messages))
+
+    assert result.generations[0].text == "Hello"
+    track_usage.assert_called_once_with(messages, result)
+
+
+def test_agenerate_tracks_usage():
+    llm = SherpaOpenAI(api_key="test", user_id="user")
+
+    with patch.object(ChatOpenAI, "_agenerate", aget_chat_result), patch(
+        "sherpa_ai.models.sherpa_base_model.UserUsageTracker"
+    ) as tracker:
+        result = asyncio.run(llm.ainvoke("Hi"))
+
+    assert result.content == "Hello"
+    tracker.return_value.add_data.assert_called_once_with(user_id="user", token=3)
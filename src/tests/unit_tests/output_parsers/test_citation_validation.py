@@ -1,5 +1,8 @@
+import random
+from collections import Counter
 from unittest import mock
 
+import pytest
 from loguru import logger
 from pytest import mark
 
@@ -7,7 +10,13 @@ from sherpa_ai.actions.base import ActionResource
 from sherpa_ai.agents import QAAgent
 from sherpa_ai.events import EventType
 from sherpa_ai.memory import SharedMemory
-from sherpa_ai.output_parsers.citation_validation import CitationValidation
+from sherpa_ai.output_parsers.citation_validation import (
+    CitationValidation,
+    JaccardScorer,
+    ResourceIndex,
+    VectorizedJaccardScorer,
+    split_into_chunks,
+)
 from sherpa_ai.test_utils.llms import get_llm
 
 
@@ -29,6 +38,168 @@ def test_citation_validation():
     assert data_1.source in result.result
 
 
+def reference_longest_common_subsequence(text1: str, text2: str) -> int:
+    dp = [[0] * (len(text1) + 1) for _ in range(len(text2) + 1)]
+    for i in range(1, len(text2) + 1):
+        for j in range(1, len(text1) + 1):
+            diagonal = dp[i - 1][j - 1] + (text1[j - 1] == text2[i - 1])
+            dp[i][j] = max(diagonal, dp[i - 1][j], dp[i][j - 1])
+    return dp[-1][-1]
+
+
+def test_longest_common_subsequence_matches_dynamic_programming():
+    module = CitationValidation()
+    rng = random.Random(0)
+
+    assert module.longest_common_subsequence("", "abc") == 0
+    assert module.longest_common_subsequence("abcde", "ace") == 3
+    for _ in range(500):
+        text1 = "".join(rng.choice("ab cé") for _ in range(rng.randint(0, 80)))
+        text2 = "".join(rng.choice("ab cé") for _ in range(rng.randint(0, 80)))
+        assert module.longest_common_subsequence(
+            text1, text2
+        ) == reference_longest_common_subsequence(text1, text2)
+
+
+def test_exceeds_sequence_threshold_skips_short_lines():
+    module = CitationValidation(sequence_threshold=0.7)
+    sentence = "The quick brown fox jumps"
+
+    with mock.patch.object(
+        module, "longest_common_subsequence", wraps=module.longest_common_subsequence
+    ) as mock_lcs:
+        assert not module.exceeds_sequence_threshold(sentence, "The quick")
+        mock_lcs.assert_not_called()
+
+        assert module.exceeds_sequence_threshold(sentence, "The quick brown fox")
+        assert not module.exceeds_sequence_threshold(sentence, "x" * 30)
+        assert mock_lcs.call_count == 2
+
+
+@mock.patch(
+    "sherpa_ai.output_parsers.citation_validation.word_tokenize", str.split
+)
+def test_resource_index():
+    resource = ActionResource(
+        source="www.wiki.com", content="Delaware is a state.\nIt is small. Delaware"
+    )
+    index = ResourceIndex(resource)
+
+    assert index.lines == ["Delaware is a state", "It is small", " Delaware"]
+    assert index.lines_by_token["is"] == [0, 1]
+    assert index.count_overlapping_tokens({"Delaware", "is", "big"}) == {
+        0: 2,
+        1: 1,
+        2: 1,
+    }
+    assert index.max_jaccard_index({"It", "is", "small"}) == 1.0
+    assert index.max_jaccard_index({"unrelated"}) == 0.0
+    assert index.common_chars(1, Counter("Its mall!")) == 8
+
+
+@mock.patch(
+    "sherpa_ai.output_parsers.citation_validation.word_tokenize", str.split
+)
+def test_add_citation_to_sentence_reuses_resource_indexes():
+    resources = [
+        ActionResource(source="www.a.com", content="Delaware is a small state."),
+        ActionResource(source="www.b.com", content="Nothing related here."),
+        ActionResource(source="www.a.com", content="Delaware is a small state."),
+    ]
+    module = CitationValidation()
+    indexes = [ResourceIndex(resource) for resource in resources]
+
+    with mock.patch.object(ResourceIndex, "__init__") as mock_init:
+        ids, links = module.add_citation_to_sentence(
+            "Delaware is a small state", resources, indexes
+        )
+    mock_init.assert_not_called()
+
+    # the same link is cited once
+    assert ids == [1]
+    assert links == ["www.a.com"]
+
+
+@mock.patch(
+    "sherpa_ai.output_parsers.citation_validation.word_tokenize", str.split
+)
+def test_vectorized_jaccard_scorer_matches_python_scorer():
+    rng = random.Random(0)
+    words = ["state", "Delaware", "small", "is", "a", "the", "law", "senate"]
+
+    def random_text(num_lines):
+        return ".".join(
+            " ".join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+            for _ in range(num_lines)
+        )
+
+    # the second resource has no lines
+    contents = [random_text(20), "", random_text(1), random_text(50)]
+    indexes = [
+        ResourceIndex(ActionResource(source=str(i), content=content))
+        for i, content in enumerate(contents)
+    ]
+    python_scorer = JaccardScorer(indexes)
+    numpy_scorer = VectorizedJaccardScorer(indexes)
+
+    for _ in range(50):
+        tokens = set(random_text(1).split()) | {"unknown"}
+        assert numpy_scorer.max_jaccard_indexes(
+            tokens
+        ) == python_scorer.max_jaccard_indexes(tokens)
+
+
+def test_citation_validation_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        CitationValidation(similarity_backend="unknown")
+
+
+def test_split_into_chunks():
+    assert split_into_chunks(list(range(7)), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    assert split_into_chunks([1], 2) == [[1], []]
+
+
+@mock.patch(
+    "sherpa_ai.output_parsers.citation_validation.sent_tokenize",
+    lambda text: [sentence + "." for sentence in text.split(". ")],
+)
+@mock.patch(
+    "sherpa_ai.output_parsers.citation_validation.word_tokenize", str.split
+)
+def test_parallel_citations_match_sequential_citations():
+    rng = random.Random(0)
+    words = ["state", "Delaware", "small", "is", "a", "the", "law", "senate"]
+
+    def random_text(num_sentences):
+        return ". ".join(
+            " ".join(rng.choice(words) for _ in range(rng.randint(2, 8)))
+            for _ in range(num_sentences)
+        )
+
+    resources = [
+        ActionResource(source=f"www.wiki_{i % 4}.com", content=random_text(10))
+        for i in range(6)
+    ]
+    text = "\n".join(random_text(8) for _ in range(5))
+
+    sequential = CitationValidation(0.6, 0.6, 0.6).add_citations(text, resources)
+    validation = CitationValidation(
+        0.6, 0.6, 0.6, parallel=True, num_processes=3, min_parallel_sentences=1
+    )
+    try:
+        parallel = validation.add_citations(text, resources)
+        executor = validation.executor
+        # the pool is reused by later validations
+        assert validation.add_citations(text, resources) == parallel
+        assert validation.executor is executor
+    finally:
+        validation.close()
+
+    assert validation.executor is None
+    assert "](www.wiki_" in sequential.result
+    assert parallel.result == sequential.result
+
+
 @mark.skip("Placeholder for test we should implement")
 def test_citation_succeeds_for_longest_common_subsequence():
     pass
@@ -74,7 +245,7 @@ def test_task_agent_succeeds(get_llm, external_api):  # noqa: F811
         }
 
         with mock.patch(
-            "langchain_community.utilities.GoogleSerperAPIWrapper._google_serper_api_results"
+            "sherpa_ai.tools.SearchTool.serper_api_results"
         ) as mock_search:
             mock_search.return_value = GOOGLE_SEARCH_MOCK
             task_agent.run()
@@ -0,0 +1,138 @@
+from unittest.mock import patch
+
+import pytest
+import spacy
+
+from sherpa_ai.events import Event, EventType
+from sherpa_ai.memory import Belief
+from sherpa_ai.output_parsers.entity_validation import EntityValidation
+from sherpa_ai.output_parsers.extraction import ExtractionService
+from sherpa_ai.output_parsers.number_validation import NumberValidation
+
+
+@pytest.fixture
+def nlp():
+    # rule based entities, so the tests do not depend on a trained model
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [
+            {"label": "ORG", "pattern": "United Nations"},
+            {"label": "GPE", "pattern": "Canada"},
+            {"label": "CARDINAL", "pattern": "two hundred"},
+        ]
+    )
+    with patch("sherpa_ai.output_parsers.extraction.get_nlp", return_value=nlp):
+        yield nlp
+
+
+def test_extract_texts(nlp):
+    service = ExtractionService()
+
+    extraction = service.extract_text("The United Nations has two hundred staff, 193")
+
+    assert extraction.entities == ["United Nations"]
+    assert sorted(extraction.numbers) == ["193", "200"]
+
+
+def test_extract_events_processes_new_events_only(nlp):
+    service = ExtractionService(batch_size=2)
+    events = [
+        Event(EventType.action_output, "search", f"Canada has {i} provinces")
+        for i in range(5)
+    ]
+
+    first = service.extract_events(events[:3])
+    assert service.num_texts_processed == 3
+
+    second = service.extract_events(events)
+    assert service.num_texts_processed == 5
+    assert second[:3] == first
+    assert [extraction.numbers for extraction in second] == [
+        [str(i)] for i in range(5)
+    ]
+
+
+def test_extract_events_evicts_least_recently_used(nlp):
+    service = ExtractionService(max_events=2)
+    events = [Event(EventType.action_output, "search", str(i)) for i in range(3)]
+
+    service.extract_events(events[:2])
+    service.extract_events(events[:1])  # events[0] is used more recently
+    service.extract_events(events[2:])
+
+    assert list(service.extractions.keys()) == ["0", "2"]
+
+
+def test_extract_events_keyed_by_content(nlp):
+    service = ExtractionService()
+    event = Event(EventType.action_output, "search", "Canada has 10 provinces")
+    # restored events keep their ids, which may be reused by other events
+    restored = Event.from_dict({**event.__dict__, "content": "Canada has 13"})
+    duplicate = Event(EventType.action_output, "search", "Canada has 10 provinces")
+
+    extractions = service.extract_events([event, restored, duplicate])
+
+    assert restored.event_id == event.event_id
+    assert [extraction.numbers for extraction in extractions] == [
+        ["10"],
+        ["13"],
+        ["10"],
+    ]
+    assert service.num_texts_processed == 2
+
+
+def test_number_validation_extracts_events_separately(nlp):
+    service = ExtractionService()
+    number_validation = NumberValidation(extraction_service=service)
+    belief = Belief()
+    belief.update_internal(EventType.action_output, "search", "It costs two")
+    belief.update_internal(EventType.action_output, "search", "hundred people came")
+
+    # the history joined into one text would contain "two hundred"
+    result = number_validation.process_output("It costs 200", belief)
+
+    assert not result.is_valid
+
+
+def test_validation_processes_new_events_only(nlp):
+    service = ExtractionService()
+    number_validation = NumberValidation(extraction_service=service)
+    entity_validation = EntityValidation(extraction_service=service)
+    belief = Belief()
+    belief.update_internal(
+        EventType.action_output, "search", "The United Nations has 193 members"
+    )
+
+    assert number_validation.process_output("It has 193 members", belief).is_valid
+    assert entity_validation.process_output(
+        "The United Nations has members", belief
+    ).is_valid
+    # the history is processed once, each validated text once
+    assert service.num_texts_processed == 3
+
+    belief.update_internal(EventType.action_output, "search", "Canada joined in 1945")
+    result = number_validation.process_output("It has 194 members", belief)
+    assert not result.is_valid
+    assert service.num_texts_processed == 5
+
+    result = entity_validation.process_output("The United Nations has 193", belief)
+    assert not result.is_valid
+    assert "Canada" in result.feedback
+    assert service.num_texts_processed == 6
+
+
+def test_entity_validation_reads_history_once(nlp):
+    entity_validation = EntityValidation(extraction_service=ExtractionService())
+    belief = Belief()
+    belief.update_internal(EventType.action_output, "search", "Canada joined")
+
+    with patch.object(
+        belief,
+        "get_history_events_excluding_types",
+        wraps=belief.get_history_events_excluding_types,
+    ) as get_events:
+        result = entity_validation.process_output("Canada joined", belief)
+
+    assert result.is_valid
+    get_events.assert_called_once()
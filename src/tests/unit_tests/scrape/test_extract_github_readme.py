@@ -25,7 +25,9 @@ def mock_requests(external_api: bool):
         yield
         return
 
-    with mock.patch("requests.get") as mock_get, mock.patch(
+    with mock.patch(
+        "sherpa_ai.scrape.extract_github_readme.http_client.get"
+    ) as mock_get, mock.patch(
         "sherpa_ai.scrape.extract_github_readme.save_to_pine_cone"
     ):
         mock_get.side_effect = mock_request
@@ -0,0 +1,54 @@
+import pickle
+
+import pytest
+
+from sherpa_ai.events import Event, EventType
+
+
+def test_event_is_immutable():
+    event = Event(EventType.task, "agent", "content")
+
+    with pytest.raises(AttributeError):
+        event.content = "new content"
+
+    with pytest.raises(AttributeError):
+        event.extra = "extra"
+
+
+def test_event_ids_are_monotonic():
+    first = Event(EventType.task, "agent", "first")
+    second = Event(EventType.task, "agent", "second")
+
+    assert second.event_id > first.event_id
+    assert second.timestamp >= first.timestamp
+
+
+def test_agent_names_are_interned():
+    first = Event(EventType.task, "".join(["agent", "_1"]), "first")
+    second = Event(EventType.task, "".join(["agent", "_1"]), "second")
+
+    assert first.agent is second.agent
+
+
+def test_from_dict_round_trip():
+    event = Event(EventType.result, "agent", "content")
+
+    restored = Event.from_dict(event.__dict__)
+    assert restored.__dict__ == event.__dict__
+
+    copied = pickle.loads(pickle.dumps(event))
+    assert copied.__dict__ == event.__dict__
+
+    # events created after a restore never reuse the restored ids
+    data = dict(event.__dict__, event_id=event.event_id + 100)
+    Event.from_dict(data)
+    assert Event(EventType.task, "agent", "new").event_id > data["event_id"]
+
+
+def test_from_dict_without_id():
+    restored = Event.from_dict(
+        {"event_type": EventType.task, "agent": "agent", "content": "content"}
+    )
+
+    assert restored.content == "content"
+    assert restored.event_id is not None
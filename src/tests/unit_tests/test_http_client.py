@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sherpa_ai.http_client import HttpClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # keep the connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.num_requests += 1
+            server.ports.add(self.client_address[1])
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failing = server.num_failures > 0
+            server.num_failures -= 1
+
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        body = b"" if failing else server.body
+        self.send_response(server.failure_status if failing else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.num_requests = 0
+    server.num_failures = 0
+    server.failure_status = 503
+    server.ports = set()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.delay = 0
+    server.body = b"Hello, World!"
+    server.url = f"http://127.0.0.1:{server.server_port}/"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_reuse_connection(server):
+    client = HttpClient(backoff_factor=0)
+
+    responses = [client.get(server.url) for _ in range(3)]
+
+    assert [response.text for response in responses] == ["Hello, World!"] * 3
+    # all the requests are sent over the same connection
+    assert len(server.ports) == 1
+
+
+def test_request_retries_unavailable_server(server):
+    server.num_failures = 2
+    client = HttpClient(max_retries=2, backoff_factor=0)
+
+    response = client.get(server.url)
+
+    assert response.status_code == 200
+    assert server.num_requests == 3
+
+
+def test_request_returns_last_response_after_retries(server):
+    server.num_failures = 5
+    client = HttpClient(max_retries=1, backoff_factor=0)
+
+    response = client.get(server.url)
+
+    assert response.status_code == 503
+    assert server.num_requests == 2
+
+
+def test_post_request_is_not_retried(server):
+    server.num_failures = 1
+    client = HttpClient(max_retries=2, backoff_factor=0)
+
+    response = client.post(server.url)
+
+    assert response.status_code == 503
+    assert server.num_requests == 1
+
+
+@pytest.mark.parametrize("failure_status,num_requests", [(429, 2), (503, 1)])
+def test_post_request_retries_unprocessed_request(
+    server, failure_status, num_requests
+):
+    server.num_failures = 1
+    server.failure_status = failure_status
+    client = HttpClient(max_retries=2, backoff_factor=0)
+
+    client.post(server.url, retry_unprocessed=True)
+
+    # a request failing with 503 may have been processed
+    assert server.num_requests == num_requests
+
+
+def test_stream_reads_content_in_chunks(server):
+    server.body = b"a" * 10000
+    client = HttpClient(backoff_factor=0)
+
+    with client.stream("GET", server.url) as response:
+        chunks = list(response.iter_content(chunk_size=4096))
+
+    assert [len(chunk) for chunk in chunks] == [4096, 4096, 1808]
+
+
+def test_requests_in_flight_are_bounded(server):
+    server.delay = 0.05
+    client = HttpClient(backoff_factor=0, max_concurrency=2)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        responses = list(executor.map(lambda _: client.get(server.url), range(6)))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert server.max_in_flight == 2
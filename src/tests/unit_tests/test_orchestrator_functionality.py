@@ -27,3 +27,101 @@ def test_serialization_succeeds():
 
     new_physicist = new_or.agent_pool.agents[physicist.name]
     assert new_physicist.belief.get_by_type(EventType.task)[0].content == "belief"
+
+
+def test_incremental_checkpoints_succeed():
+    orchestrator = Orchestrator(OrchestratorConfig(checkpoint_compaction_interval=3))
+    shared_memory = orchestrator.shared_memory
+
+    physicist = Physicist(llm=MagicMock(), shared_memory=shared_memory)
+    orchestrator.add_agent(physicist)
+
+    checkpoints = []
+    for i in range(5):
+        shared_memory.add(EventType.task, "planner", f"task {i}")
+        shared_memory.observe(physicist.belief)
+        physicist.belief.update_internal(EventType.action, "belief", f"action {i}")
+        physicist.belief.set(f"step.{i}", i)
+        checkpoints.append(orchestrator.checkpoint(shared_memory, [physicist]))
+
+    assert [checkpoint["type"] for checkpoint in checkpoints] == [
+        "full",
+        "delta",
+        "delta",
+        "full",
+        "delta",
+    ]
+
+    # deltas only contain the changes since the previous checkpoint
+    delta = checkpoints[-1]
+    assert len(delta["shared_memory"]["events"]) == 1
+    assert delta["agent_belief"][physicist.name]["dict_updates"] == [("step.4", 4)]
+
+    new_or = Orchestrator.restore_checkpoints(iter(checkpoints), orchestrator.agent_pool)
+    new_belief = new_or.agent_pool.agents[physicist.name].belief
+
+    assert len(new_or.shared_memory.events) == 5
+    assert new_or.shared_memory.latest_task.content == "task 4"
+    assert [event.content for event in new_belief.events] == [
+        f"task {i}" for i in range(5)
+    ]
+    assert len(new_belief.get_by_type(EventType.action)) == 5
+    assert new_belief.current_task.content == "task 4"
+    assert new_belief.get("step") == {str(i): i for i in range(5)}
+
+
+def test_checkpoints_drain_dict_updates_and_store_replaced_dict():
+    orchestrator = Orchestrator(OrchestratorConfig())
+    physicist = Physicist(llm=MagicMock(), shared_memory=orchestrator.shared_memory)
+    orchestrator.add_agent(physicist)
+    belief = physicist.belief
+
+    belief.set("a", 1)
+    checkpoints = [orchestrator.checkpoint(orchestrator.shared_memory, [physicist])]
+    assert belief.dict_updates == {}
+
+    belief.set("b", 1)
+    belief.set("b", 2)
+    checkpoints.append(orchestrator.checkpoint(orchestrator.shared_memory, [physicist]))
+    assert checkpoints[-1]["agent_belief"][physicist.name]["dict_updates"] == [
+        ("b", 2)
+    ]
+    assert belief.dict_updates == {}
+
+    belief.dict = {"c": 3}
+    checkpoints.append(orchestrator.checkpoint(orchestrator.shared_memory, [physicist]))
+    assert checkpoints[-1]["type"] == "delta"
+    assert checkpoints[-1]["agent_belief"][physicist.name]["dict"] == {"c": 3}
+
+    belief.set("d", 4)
+    checkpoints.append(orchestrator.checkpoint(orchestrator.shared_memory, [physicist]))
+
+    new_or = Orchestrator.restore_checkpoints(iter(checkpoints), orchestrator.agent_pool)
+    new_belief = new_or.agent_pool.agents[physicist.name].belief
+    assert new_belief.dict == {"c": 3, "d": 4}
+
+
+def test_restore_checkpoints_keeps_config_and_checkpointer():
+    orchestrator = Orchestrator(OrchestratorConfig())
+    physicist = Physicist(llm=MagicMock(), shared_memory=orchestrator.shared_memory)
+    orchestrator.add_agent(physicist)
+    checkpoints = [
+        orchestrator.checkpoint(orchestrator.shared_memory, [physicist])
+        for _ in range(2)
+    ]
+
+    config = OrchestratorConfig(critic_rounds=1, checkpoint_compaction_interval=2)
+    new_or = Orchestrator.restore_checkpoints(
+        iter(checkpoints), orchestrator.agent_pool, config=config
+    )
+    assert new_or.config is config
+    assert new_or.checkpointer.compaction_interval == 2
+
+    checkpointer = orchestrator.checkpointer
+    new_or = Orchestrator.restore_checkpoints(
+        iter(checkpoints), orchestrator.agent_pool, checkpointer=checkpointer
+    )
+    assert new_or.checkpointer is checkpointer
+    # the checkpoints continue with a full one
+    new_checkpoint = new_or.checkpoint(new_or.shared_memory, [physicist])
+    assert new_checkpoint["type"] == "full"
@@ -1,16 +1,27 @@
-from unittest.mock import Mock, patch
+import random
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+import spacy
+import tiktoken
+from nltk.metrics import edit_distance
 
 from sherpa_ai.utils import (
     check_if_number_exist,
     check_url,
+    count_string_tokens,
+    count_strings_tokens,
     extract_entities,
     extract_numbers_from_text,
+    extract_numeric_entities,
     get_base_url,
+    get_nlp,
     get_links_from_string,
     json_from_text,
+    levenshtein_distance,
     log_formatter,
+    match_entities,
     rewrite_link_references,
     scrape_with_url,
     show_commands_only,
@@ -40,7 +51,7 @@ def test_scrape_with_url_handles_valid_html_content():
     mock_get = Mock()
     mock_get.return_value.status_code = 200
     mock_get.return_value.content = b"<html><body>Hello, World!</body></html>"
-    with patch("requests.get", mock_get):
+    with patch("sherpa_ai.utils.http_client.get", mock_get):
         result = scrape_with_url("http://example.com")
     assert result["status"] == 200
     assert result["data"] == "Hello, World!"
@@ -50,7 +61,7 @@ def test_scrape_with_url_handles_url_not_found():
     mock_get = Mock()
     mock_get.return_value.status_code = 404
     mock_get.return_value.content = b"Not Found"
-    with patch("requests.get", mock_get):
+    with patch("sherpa_ai.utils.http_client.get", mock_get):
         result = scrape_with_url("http://example.com")
     assert result["status"] == 404
     assert result["data"] == ""
@@ -359,6 +370,97 @@ def test_extract_entities_empty_string():
     assert result == []
 
 
+def test_nlp_pipeline_loaded_once():
+    blank_nlp = spacy.blank("en")
+    with patch.dict("sherpa_ai.utils._nlp_pipelines", clear=True), patch(
+        "spacy.load", return_value=blank_nlp
+    ) as mock_load:
+        assert extract_entities("The United Nations") == []
+        assert extract_numeric_entities("one hundred") == []
+        assert extract_entities("UN") == []
+
+    mock_load.assert_called_once()
+    assert "parser" in mock_load.call_args.kwargs["exclude"]
+    assert "ner" not in mock_load.call_args.kwargs["exclude"]
+
+
+def test_nlp_pipeline_shared_across_threads():
+    blank_nlp = spacy.blank("en")
+    with patch.dict("sherpa_ai.utils._nlp_pipelines", clear=True), patch(
+        "spacy.load", return_value=blank_nlp
+    ) as mock_load:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pipelines = list(executor.map(lambda _: get_nlp(), range(32)))
+
+    mock_load.assert_called_once()
+    assert all(nlp is blank_nlp for nlp in pipelines)
+
+
+@pytest.fixture
+def byte_encoding():
+    # encoding with one token per byte, so the tests do not download an encoding
+    encoding = tiktoken.Encoding(
+        name="bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    with patch.dict("sherpa_ai.utils._encodings", clear=True), patch(
+        "tiktoken.encoding_for_model", return_value=encoding
+    ) as mock_encoding_for_model:
+        yield mock_encoding_for_model
+
+
+def test_count_string_tokens_loads_encoding_once(byte_encoding):
+    assert count_string_tokens("hello", "gpt-3.5-turbo") == 5
+    assert count_string_tokens("hello world", "gpt-3.5-turbo") == 11
+
+    byte_encoding.assert_called_once_with("gpt-3.5-turbo")
+
+
+def test_count_strings_tokens(byte_encoding):
+    strings = ["hello", "", "hello world"]
+
+    assert count_strings_tokens(strings, "gpt-3.5-turbo") == [
+        count_string_tokens(string, "gpt-3.5-turbo") for string in strings
+    ]
+    byte_encoding.assert_called_once_with("gpt-3.5-turbo")
+
+
+def test_levenshtein_distance_matches_nltk():
+    rng = random.Random(0)
+    for _ in range(500):
+        word1 = "".join(rng.choice("ab cé") for _ in range(rng.randint(0, 70)))
+        word2 = "".join(rng.choice("ab cé") for _ in range(rng.randint(0, 70)))
+        assert levenshtein_distance(word1, word2) == edit_distance(word1, word2)
+
+
+def test_match_entities():
+    source_entity = ["united nations", "canada", "nato"]
+    check_entity = ["the united nation", "canadaa", "toronto"]
+
+    assert match_entities(source_entity, check_entity, 0.75, 0.5) == [
+        True,
+        True,
+        False,
+    ]
+    assert match_entities(source_entity, [], 0.75, 0.5) == [False] * 3
+    assert match_entities([], check_entity, 0.75, 0.5) == []
+
+
+def test_match_entities_computes_distances_until_match():
+    source_entity = ["canada"]
+    check_entity = ["toronto", "canada", "canadaa", "x" * 30]
+
+    with patch(
+        "sherpa_ai.utils.levenshtein_distance", wraps=levenshtein_distance
+    ) as mock_distance:
+        assert match_entities(source_entity, check_entity, 0.75, 0.5) == [True]
+
+    # the identical entity has the highest bound and matches first
+    mock_distance.assert_called_once_with("canada", "canada")
+
+
 def test_string_comparison_function():
     result1 = string_comparison_with_jaccard_and_levenshtein("hello", "hello", 0.5)
     assert result1 == 1.0
@@ -434,12 +536,14 @@ def test_check_url_raises_exception_for_unsupported_uri_scheme(bad_uri):
     ["http://something.com", "https://something.com"],
 )
 def test_check_url_returns_true_for_valid_http_url(good_uri):
-    with patch("requests.get", return_value=True):
+    with patch("sherpa_ai.utils.http_client.stream", MagicMock()):
         result = check_url(good_uri)
     assert result is True
 
 
 def test_check_url_returns_false_on_request_error():
-    with patch("requests.get", side_effect=Exception("problem")):
+    with patch(
+        "sherpa_ai.utils.http_client.stream", side_effect=Exception("problem")
+    ):
         result = check_url("https://anything")
     assert result is False
@@ -4,8 +4,9 @@ import pytest
 from loguru import logger
 
 from sherpa_ai.config import AgentConfig
+from sherpa_ai.database.result_cache import MemoryResultCache
 from sherpa_ai.output_parser import TaskAction
-from sherpa_ai.tools import SearchTool
+from sherpa_ai.tools import SearchArxivTool, SearchTool
 
 
 def test_formulate_search_query():
@@ -94,3 +95,108 @@ def test_search_query_includes_invalid_url(mock_logger):
     expected_error = f"The domain {invalid_domain} is invalid and is not taken into consideration."  # noqa: E501
 
     logger.warning.assert_called_with(expected_error)
+
+
+def organic(*links):
+    return {
+        "organic": [
+            {"title": f"{link} ", "snippet": f"About {link}", "link": link}
+            for link in links
+        ]
+    }
+
+
+def test_search_queries_domains_concurrently(serper_server):
+    site = "https://www.langchain.com, https://openai.com, https://www.google.com"
+    config = AgentConfig(gsite=site)
+    search_tool = SearchTool(config=config, top_k=6)
+    query = "What is an agent?"
+    serper_server.responses = {
+        f"{query} site:https://www.langchain.com": organic("a", "b"),
+        f"{query} site:https://openai.com": organic("b", "c"),
+        f"{query} site:https://www.google.com": organic("d"),
+    }
+
+    resources = search_tool._run(query, return_resources=True)
+
+    assert sorted(serper_server.queries) == sorted(serper_server.responses.keys())
+    assert serper_server.max_in_flight == 3
+    # merged in the order of the domains, without repeating a link
+    assert [resource["Source"] for resource in resources] == ["a", "b", "c", "d"]
+
+    result = search_tool._run(query)
+    assert [line for line in result.split("\n") if line.startswith("Link:")] == [
+        "Link:a",
+        "Link:b",
+        "Link:c",
+        "Link:d",
+    ]
+
+
+def test_search_keeps_answer_box_with_seen_link(serper_server):
+    config = AgentConfig(gsite="https://www.langchain.com, https://openai.com")
+    search_tool = SearchTool(config=config)
+    query = "What is an agent?"
+    serper_server.responses = {
+        f"{query} site:https://www.langchain.com": organic("a"),
+        f"{query} site:https://openai.com": {
+            "answerBox": {"answer": "An agent acts"},
+            **organic("a", "b"),
+        },
+    }
+
+    resources = search_tool._run(query, return_resources=True)
+
+    assert resources == [
+        {"Document": "Description: a About a", "Source": "a"},
+        {"Document": "An agent acts", "Source": "a"},
+    ]
+    assert "Answer: An agent acts\nLink:a" in search_tool._run(query)
+
+
+def test_search_without_domains(serper_server):
+    search_tool = SearchTool(config=AgentConfig())
+    serper_server.responses = {"What is an agent?": organic("a")}
+
+    result = search_tool._run("What is an agent?")
+
+    assert serper_server.queries == ["What is an agent?"]
+    assert result == "\na About a\nLink:a"
+
+
+def test_search_sends_serper_options(serper_server):
+    search_tool = SearchTool(config=AgentConfig())
+
+    search_tool._run("What is an agent?")
+
+    assert serper_server.payloads == [
+        {"q": "What is an agent?", "gl": "us", "hl": "en", "num": 10}
+    ]
+
+
+def test_search_results_are_cached(serper_server):
+    cache = MemoryResultCache(ttl=60)
+    config = AgentConfig(gsite="https://www.langchain.com, https://openai.com")
+    search_tool = SearchTool(config=config, result_cache=cache)
+
+    first = search_tool._run("What is an agent?")
+    second = search_tool._run("what is  an agent?")
+
+    assert second == first
+    assert len(serper_server.queries) == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_arxiv_results_are_cached():
+    cache = MemoryResultCache(ttl=60)
+    search_tool = SearchArxivTool(result_cache=cache)
+    xml = "<entry><id>1</id><title>Sherpa</title><summary>Agents</summary></entry>"
+
+    with patch("sherpa_ai.tools.http_client.get") as mock_get:
+        mock_get.return_value.text = xml
+        first = search_tool._run("agents", return_resources=True)
+        second = search_tool._run("Agents", return_resources=True)
+
+    assert second == first
+    assert first == [{"Document": "Title: Sherpa\nSummary: Agents", "Source": "1"}]
+    mock_get.assert_called_once()